@@ -0,0 +1,186 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+# Seconds a cached response counts as fresh, per MusicClient endpoint
+ENDPOINT_TTLS = {
+    "get_playlist": 10 * 60,
+    "get_album": 7 * 24 * 3600,
+    "get_artist": 24 * 3600,
+    "get_song": 6 * 3600,
+    "get_charts": 6 * 3600,
+    "get_explore": 6 * 3600,
+}
+# Stale entries older than this are not served at all
+MAX_STALE_AGE = 30 * 24 * 3600
+# Upper bound for the serialized size of all cached responses
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def patch_track_records(data, video_id, fields):
+    """Sets fields on every dict in data whose videoId is video_id; returns whether any changed."""
+    changed = False
+    if isinstance(data, dict):
+        if data.get("videoId") == video_id:
+            for name, value in fields.items():
+                if data.get(name) != value:
+                    data[name] = value
+                    changed = True
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                changed = patch_track_records(value, video_id, fields) or changed
+    elif isinstance(data, list):
+        for value in data:
+            if isinstance(value, (dict, list)):
+                changed = patch_track_records(value, video_id, fields) or changed
+    return changed
+
+
+class ResponseCache:
+    """SQLite-backed cache of ytmusicapi responses with size-bounded LRU eviction."""
+
+    def __init__(self, path=None, max_bytes=MAX_CACHE_BYTES):
+        self.path = path or os.path.join(os.getcwd(), "data", "api_cache.db")
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                resource TEXT,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_resource ON responses (endpoint, resource)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint, scope, args):
+        return f"{endpoint}:{scope}:{json.dumps(args, sort_keys=True)}"
+
+    def get(self, key):
+        """Returns (data, age_in_seconds) or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if now - row[1] > MAX_STALE_AGE:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        try:
+            return json.loads(row[0]), now - row[1]
+        except ValueError:
+            return None
+
+    def put(self, key, endpoint, resource, data):
+        try:
+            body = json.dumps(data)
+        except (TypeError, ValueError) as e:
+            print(f"Response cache: cannot serialize {endpoint}: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, endpoint, resource, body, len(body), now, now),
+                )
+                self._conn.commit()
+                self._evict_locked()
+            except sqlite3.Error as e:
+                print(f"Response cache write failed: {e}")
+
+    def invalidate(self, endpoint, resource):
+        """Drops every cached response of endpoint for one resource id, in all scopes."""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND resource = ?",
+                    (endpoint, resource),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache invalidate failed: {e}")
+
+    def patch_track(self, scope, video_id, fields):
+        """
+        Updates fields on every cached track record of video_id in one scope, keeping each
+        response's age. Returns (endpoint, resource, data) for every response that changed.
+        """
+        needle = json.dumps({"videoId": video_id})[1:-1]
+        prefix_scope = f":{scope}:"
+        patched = []
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT key, endpoint, resource, body FROM responses WHERE instr(body, ?) > 0",
+                    (needle,),
+                ).fetchall()
+                for key, endpoint, resource, body in rows:
+                    if not key.startswith(endpoint + prefix_scope):
+                        continue
+                    try:
+                        data = json.loads(body)
+                    except ValueError:
+                        continue
+                    if not patch_track_records(data, video_id, fields):
+                        continue
+                    body = json.dumps(data)
+                    self._conn.execute(
+                        "UPDATE responses SET body = ?, size = ? WHERE key = ?",
+                        (body, len(body), key),
+                    )
+                    patched.append((endpoint, resource, data))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache patch failed: {e}")
+        return patched
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until we are back under budget
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._conn.commit()
+        print(f"Response cache: evicted {len(evicted)} entries")
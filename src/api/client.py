@@ -1,8 +1,15 @@
 import os
+import copy
 import json
+import hashlib
+import threading
+import weakref
 import requests
 from ytmusicapi import YTMusic
 import ytmusicapi.navigation
+from ytmusicapi.parsers.playlists import parse_playlist_items
+from api.cache import ResponseCache, ENDPOINT_TTLS, patch_track_records
+from api.playlist_stream import PlaylistStream
 
 # Monkeypatch ytmusicapi.navigation.nav to handle UI changes like musicImmersiveHeaderRenderer
 _original_nav = ytmusicapi.navigation.nav
@@ -51,6 +58,35 @@ def robust_nav(root, items, none_if_absent=False):
 ytmusicapi.navigation.nav = robust_nav
 
 
+def _find_renderer(root, key):
+    """Depth-first search for the first occurrence of key in a raw InnerTube response."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if key in current:
+                return current[key]
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+    return None
+
+
+def _continuation_token(contents, shelf=None):
+    """Reads the next-page token from a playlist shelf (new and legacy layouts)."""
+    if contents:
+        renderer = contents[-1].get("continuationItemRenderer")
+        if renderer:
+            return robust_nav(
+                renderer, ["continuationEndpoint", "continuationCommand", "token"], True
+            )
+    if shelf and shelf.get("continuations"):
+        return shelf["continuations"][0].get("nextContinuationData", {}).get(
+            "continuation"
+        )
+    return None
+
+
 class MusicClient:
     _instance = None
 
@@ -65,6 +101,14 @@ class MusicClient:
         self.auth_path = os.path.join(os.getcwd(), "data", "headers_auth.json")
         self._is_authed = False
         self._playlist_cache = {}  # Cache fully-fetched playlists
+        # Persistent response cache (stale-while-revalidate)
+        self.response_cache = ResponseCache()
+        self._refresh_listeners = []  # Weak references, see add_refresh_listener
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        # Full-playlist walks currently in flight, shared between all readers
+        self._playlist_streams = {}
+        self._stream_lock = threading.Lock()
         self.try_login()
 
     def try_login(self):
@@ -262,6 +306,121 @@ class MusicClient:
             self._is_authed = False
             return False
 
+    # ── Response cache ────────────────────────────────────────────────────────
+
+    def _cache_scope(self):
+        """Responses differ per account (ownership, like status), so key them by login."""
+        if self.is_authenticated():
+            cookie = self.api.headers.get("Cookie", "")
+            if cookie:
+                return hashlib.sha1(cookie.encode()).hexdigest()[:16]
+        return "anonymous"
+
+    @staticmethod
+    def _resource_id(resource):
+        # Playlists are addressed both with and without the "VL" browse prefix
+        if isinstance(resource, str) and resource.startswith("VL"):
+            return resource[2:]
+        return resource
+
+    def add_refresh_listener(self, callback):
+        """
+        Registers callback(endpoint, resource, data), called from a background thread
+        whenever a stale cached response was refreshed with different data.
+        Bound methods are held weakly, so pages that are closed and dropped don't stay alive
+        (or keep getting called) because of the client.
+        """
+        if hasattr(callback, "__self__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            # Plain functions are kept strongly
+            def ref(callback=callback):
+                return callback
+
+        with self._refresh_lock:
+            self._refresh_listeners.append(ref)
+
+    def remove_refresh_listener(self, callback):
+        with self._refresh_lock:
+            self._refresh_listeners = [
+                ref for ref in self._refresh_listeners if ref() not in (None, callback)
+            ]
+
+    def _live_refresh_listeners(self):
+        """Resolves the weak references, dropping listeners whose owner is gone."""
+        with self._refresh_lock:
+            live = []
+            refs = []
+            for ref in self._refresh_listeners:
+                callback = ref()
+                if callback is not None:
+                    live.append(callback)
+                    refs.append(ref)
+            self._refresh_listeners = refs
+        return live
+
+    def _cached_call(self, endpoint, resource, args, fetch):
+        """
+        Serves endpoint from the response cache.
+        Fresh entries are returned as-is; stale ones are returned immediately and refreshed in the background.
+        """
+        resource = self._resource_id(resource)
+        key = ResponseCache.make_key(endpoint, self._cache_scope(), args)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            data, age = cached
+            if age > ENDPOINT_TTLS.get(endpoint, 0):
+                self._revalidate(endpoint, resource, key, data, fetch)
+            return data
+
+        data = fetch()
+        if data:
+            self.response_cache.put(key, endpoint, resource, data)
+        return data
+
+    def _revalidate(self, endpoint, resource, key, old_data, fetch):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh_job():
+            try:
+                data = fetch()
+                if not data:
+                    return
+                self.response_cache.put(key, endpoint, resource, data)
+                if data != old_data:
+                    print(f"Refreshed stale {endpoint} for {resource}")
+                    self._notify_refresh(endpoint, resource, data)
+            except Exception as e:
+                print(f"Background refresh of {endpoint} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=refresh_job)
+        thread.daemon = True
+        thread.start()
+
+    def _notify_refresh(self, endpoint, resource, data):
+        for callback in self._live_refresh_listeners():
+            try:
+                callback(endpoint, resource, data)
+            except Exception as e:
+                print(f"Refresh listener failed: {e}")
+
+    def invalidate_cached(self, endpoint, resource):
+        resource = self._resource_id(resource)
+        self.response_cache.invalidate(endpoint, resource)
+        if endpoint == "get_playlist":
+            self._playlist_cache.pop(resource, None)
+            self._playlist_cache.pop("VL" + resource, None)
+            with self._stream_lock:
+                # A walk that started before the change must not repopulate the cache
+                self._playlist_streams.pop(resource, None)
+                self._playlist_streams.pop("VL" + resource, None)
+
     def search(self, query, *args, **kwargs):
         if not self.api:
             return []
@@ -271,7 +430,9 @@ class MusicClient:
         if not self.api:
             return None
         try:
-            res = self.api.get_song(video_id)
+            res = self._cached_call(
+                "get_song", video_id, [video_id], lambda: self.api.get_song(video_id)
+            )
             return res
         except Exception as e:
             print(f"Error getting song details: {e}")
@@ -285,7 +446,80 @@ class MusicClient:
     def get_playlist(self, playlist_id, limit=None):
         if not self.api:
             return None
-        return self.api.get_playlist(playlist_id, limit=limit)
+        return self._cached_call(
+            "get_playlist",
+            playlist_id,
+            [playlist_id, limit],
+            lambda: self.api.get_playlist(playlist_id, limit=limit),
+        )
+
+    def get_playlist_page(self, playlist_id, continuation=None):
+        """
+        Fetches a single page of a playlist instead of re-fetching everything up to a limit.
+        Without a continuation this returns the get_playlist() header plus the first page of tracks;
+        pass the returned "continuation" back in for {"tracks": [...], "continuation": token or None}.
+        """
+        if not self.api:
+            return None
+        if continuation is None:
+            return self._cached_call(
+                "get_playlist",
+                playlist_id,
+                [playlist_id, "first_page"],
+                lambda: self._fetch_first_playlist_page(playlist_id),
+            )
+
+        try:
+            response = self.api._send_request("browse", {"continuation": continuation})
+        except Exception:
+            # The token may come from a long-stale cached first page; make the next load fetch a new one
+            self.invalidate_cached("get_playlist", playlist_id)
+            raise
+
+        shelf = None
+        contents = None
+        for action in response.get("onResponseReceivedActions", []):
+            contents = action.get("appendContinuationItemsAction", {}).get(
+                "continuationItems"
+            )
+            if contents is not None:
+                break
+        if contents is None:
+            shelf = response.get("continuationContents", {}).get(
+                "musicPlaylistShelfContinuation", {}
+            )
+            contents = shelf.get("contents", [])
+
+        return {
+            "tracks": parse_playlist_items(contents),
+            "continuation": _continuation_token(contents, shelf),
+        }
+
+    def _fetch_first_playlist_page(self, playlist_id):
+        # Run get_playlist on a shallow copy whose _send_request records the raw response,
+        # so the continuation token of the track shelf can be kept for later pages.
+        api = copy.copy(self.api)
+        responses = []
+        send_request = self.api._send_request
+
+        def capture(*args, **kwargs):
+            response = send_request(*args, **kwargs)
+            responses.append(response)
+            return response
+
+        api._send_request = capture
+        data = api.get_playlist(playlist_id, limit=1)
+        if not data:
+            return data
+
+        shelf = _find_renderer(responses[0], "musicPlaylistShelfRenderer") if responses else None
+        if shelf:
+            contents = shelf.get("contents", [])
+            data["tracks"] = parse_playlist_items(contents)
+            data["continuation"] = _continuation_token(contents, shelf)
+        else:
+            data["continuation"] = None
+        return data
 
     def get_watch_playlist(
         self, video_id=None, playlist_id=None, limit=25, radio=False
@@ -301,8 +535,75 @@ class MusicClient:
             print(f"Error getting watch playlist: {e}")
             return {}
 
+    def iter_playlist_pages(self, playlist_id):
+        """
+        Yields (offset, tracks) for a whole playlist, page by page as they arrive.
+        Concurrent callers share one walk; finished playlists are served from the cache.
+        """
+        cached = self.get_cached_playlist_tracks(playlist_id)
+        if cached is not None:
+            yield 0, list(cached)
+            return
+        yield from self.stream_playlist(playlist_id).pages()
+
+    def stream_playlist(self, playlist_id):
+        """Returns the running PlaylistStream for playlist_id, starting one if needed."""
+        with self._stream_lock:
+            stream = self._playlist_streams.get(playlist_id)
+            if stream is None:
+                print(f"Starting playlist stream for {playlist_id}")
+                stream = PlaylistStream(
+                    playlist_id, self._fetch_stream_page, self._on_stream_complete
+                )
+                self._playlist_streams[playlist_id] = stream
+            return stream
+
+    def _fetch_stream_page(self, playlist_id, continuation):
+        if continuation is not None:
+            return self.get_playlist_page(playlist_id, continuation=continuation)
+        # Always start a full walk from a fresh first page, so its continuation token is valid
+        data = self._fetch_first_playlist_page(playlist_id)
+        if data:
+            key = ResponseCache.make_key(
+                "get_playlist", self._cache_scope(), [playlist_id, "first_page"]
+            )
+            self.response_cache.put(
+                key, "get_playlist", self._resource_id(playlist_id), data
+            )
+        return data
+
+    def _on_stream_complete(self, stream):
+        with self._stream_lock:
+            current = self._playlist_streams.get(stream.playlist_id) is stream
+            if current:
+                del self._playlist_streams[stream.playlist_id]
+        if not current or stream.error:
+            return
+
+        tracks = stream.tracks()
+        print(f"Playlist stream for {stream.playlist_id} complete ({len(tracks)} tracks)")
+        self.set_cached_playlist_tracks(stream.playlist_id, tracks)
+        self.response_cache.put(
+            self._all_tracks_key(stream.playlist_id),
+            "get_playlist",
+            self._resource_id(stream.playlist_id),
+            tracks,
+        )
+
+    def _all_tracks_key(self, playlist_id):
+        return ResponseCache.make_key(
+            "get_playlist", self._cache_scope(), [playlist_id, "all_tracks"]
+        )
+
     def get_cached_playlist_tracks(self, playlist_id):
-        return self._playlist_cache.get(playlist_id)
+        tracks = self._playlist_cache.get(playlist_id)
+        if tracks is None:
+            # Fall back to a fully streamed copy from a previous session while it is still fresh
+            cached = self.response_cache.get(self._all_tracks_key(playlist_id))
+            if cached and cached[1] <= ENDPOINT_TTLS["get_playlist"]:
+                tracks = cached[0]
+                self._playlist_cache[playlist_id] = tracks
+        return tracks
 
     def set_cached_playlist_tracks(self, playlist_id, tracks):
         self._playlist_cache[playlist_id] = tracks
@@ -310,13 +611,20 @@ class MusicClient:
     def get_album(self, browse_id):
         if not self.api:
             return None
-        return self.api.get_album(browse_id)
+        return self._cached_call(
+            "get_album", browse_id, [browse_id], lambda: self.api.get_album(browse_id)
+        )
 
     def get_artist(self, channel_id):
         if not self.api:
             return None
         try:
-            res = self.api.get_artist(channel_id)
+            res = self._cached_call(
+                "get_artist",
+                channel_id,
+                [channel_id],
+                lambda: self.api.get_artist(channel_id),
+            )
             return res
         except Exception as e:
             print(f"Error getting artist details: {e}")
@@ -332,12 +640,17 @@ class MusicClient:
     def get_charts(self, country="US"):
         if not self.api:
             return {}
-        return self.api.get_charts(country=country)
+        return self._cached_call(
+            "get_charts",
+            country,
+            [country],
+            lambda: self.api.get_charts(country=country),
+        )
 
     def get_explore(self):
         if not self.api:
             return {}
-        return self.api.get_explore()
+        return self._cached_call("get_explore", None, [], self.api.get_explore)
 
     def get_album_browse_id(self, audio_playlist_id):
         if not self.api:
@@ -352,6 +665,19 @@ class MusicClient:
             return False
         try:
             self.api.rate_song(video_id, rating)
+            # Like status is part of song and liked-songs responses
+            self.invalidate_cached("get_song", video_id)
+            self.invalidate_cached("get_playlist", "LM")
+            self._playlist_cache.pop("LM", None)
+            # ...and of every artist, album and playlist response listing the track
+            fields = {"likeStatus": rating}
+            for tracks in list(self._playlist_cache.values()):
+                patch_track_records(tracks, video_id, fields)
+            patched = self.response_cache.patch_track(self._cache_scope(), video_id, fields)
+            # One notification per resource, even when several of its pages were cached
+            latest = {(endpoint, resource): data for endpoint, resource, data in patched}
+            for (endpoint, resource), data in latest.items():
+                self._notify_refresh(endpoint, resource, data)
             return True
         except Exception as e:
             print(f"Error rating song: {e}")
@@ -402,6 +728,7 @@ class MusicClient:
                 privacyStatus=privacy,
                 moveItem=moveItem,
             )
+            self.invalidate_cached("get_playlist", playlist_id)
             return True
         except Exception as e:
             print(f"Error editing playlist: {e}")
@@ -502,6 +829,7 @@ class MusicClient:
 
             if edit_res.get("status") == "STATUS_SUCCEEDED":
                 print("Thumbnail successfully updated!")
+                self.invalidate_cached("get_playlist", playlist_id)
                 return True
             else:
                 print(f"Failed to bind thumbnail. API Response: {edit_res}")
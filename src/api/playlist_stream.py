@@ -0,0 +1,78 @@
+import threading
+
+
+class PlaylistStream:
+    """
+    A single background walk over the pages of one playlist, shared by every reader.
+    Pages are kept as they arrive, so readers that join late replay from the first page
+    without triggering another fetch.
+    """
+
+    def __init__(self, playlist_id, fetch_page, on_complete=None):
+        self.playlist_id = playlist_id
+        self._fetch_page = fetch_page  # fetch_page(playlist_id, continuation) -> {"tracks", "continuation"}
+        self._on_complete = on_complete
+        self._cond = threading.Condition()
+        self._pages = []
+        self.done = False
+        self.error = None
+
+        thread = threading.Thread(
+            target=self._run, name=f"PlaylistStream-{playlist_id}"
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        continuation = None
+        try:
+            while True:
+                page = self._fetch_page(self.playlist_id, continuation)
+                if not page:
+                    break
+                tracks = page.get("tracks") or []
+                with self._cond:
+                    self._pages.append(tracks)
+                    self._cond.notify_all()
+                continuation = page.get("continuation")
+                if not continuation or not tracks:
+                    break
+        except Exception as e:
+            print(f"Error streaming playlist {self.playlist_id}: {e}")
+            self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+        if self._on_complete:
+            try:
+                self._on_complete(self)
+            except Exception as e:
+                print(f"Playlist stream completion failed: {e}")
+
+    def tracks(self):
+        """All tracks received so far, in playlist order."""
+        with self._cond:
+            return [t for page in self._pages for t in page]
+
+    def pages(self):
+        """
+        Yields (offset, tracks) for every page, blocking until the next one arrives.
+        Raises the fetch error, if any, once the received pages are exhausted.
+        """
+        index = 0
+        offset = 0
+        while True:
+            with self._cond:
+                while index >= len(self._pages) and not self.done:
+                    self._cond.wait()
+                if index >= len(self._pages):
+                    break
+                page = self._pages[index]
+            yield offset, page
+            index += 1
+            offset += len(page)
+
+        if self.error:
+            raise self.error
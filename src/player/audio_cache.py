@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+import uuid
+
+
+class AudioCache:
+    """
+    Bounded on-disk LRU of fully streamed tracks, keyed by (videoId, format).
+    Recency is tracked with file mtimes, so the store needs no separate index.
+    """
+
+    def __init__(self, max_bytes):
+        self.root = os.path.join(os.getcwd(), "data", "audio_cache")
+        os.makedirs(self.root, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # Partial files from a previous run can never be completed
+        for name in os.listdir(self.root):
+            if name.endswith(".partial"):
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+
+    def _path(self, video_id, fmt):
+        key = hashlib.sha1(f"{video_id}|{fmt}".encode()).hexdigest()
+        return os.path.join(self.root, key)
+
+    def get_path(self, video_id, fmt):
+        """Returns the file of a complete cached copy, or None."""
+        path = self._path(video_id, fmt)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return path
+
+    def begin(self, video_id, fmt):
+        """Opens a temporary file for a track that is about to stream."""
+        final_path = self._path(video_id, fmt)
+        tmp_path = f"{final_path}.{uuid.uuid4().hex[:8]}.partial"
+        return CacheWriter(self, final_path, tmp_path)
+
+    def _commit(self, writer):
+        with self._lock:
+            os.replace(writer.tmp_path, writer.final_path)
+            self._evict_locked()
+
+    def _evict_locked(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            if name.endswith(".partial"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        if evicted:
+            print(f"Audio cache: evicted {evicted} tracks")
+
+
+class CacheWriter:
+    """Receives the bytes of one streamed track; only a complete copy is kept."""
+
+    def __init__(self, cache, final_path, tmp_path):
+        self.cache = cache
+        self.final_path = final_path
+        self.tmp_path = tmp_path
+        self.written = 0
+        self._file = open(tmp_path, "wb")
+
+    def write(self, data):
+        self._file.write(data)
+        self.written += len(data)
+
+    def finish(self, expected_size):
+        self._file.close()
+        if expected_size and self.written == expected_size:
+            self.cache._commit(self)
+            print(f"Audio cache: stored {self.written} bytes")
+        else:
+            self.abort()
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
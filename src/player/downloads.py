@@ -0,0 +1,374 @@
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from gi.repository import GLib
+from yt_dlp import YoutubeDL
+
+from api.client import MusicClient
+from player.ydl_pool import create_cookie_file
+
+# Attempts per track before it is left in the "failed" state
+MAX_ATTEMPTS = 3
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class DownloadManager:
+    """
+    Downloads tracks into data/downloads for offline playback.
+
+    The index (data/downloads/index.db) maps videoId to the file plus its metadata, size and sha256.
+    Unfinished downloads are picked up again on the next start, and yt-dlp resumes their .part files.
+    Listeners are called from worker threads as callback(video_id, status, progress).
+
+    Completed downloads are also kept in memory, so is_downloaded() and get_local_stream() are
+    cheap enough for the main loop. Only get_local_stream(verify=True) and get_local_path()
+    check the file on disk.
+    """
+
+    def __init__(self, base_opts, workers=2):
+        self.base_opts = dict(base_opts)
+        self.root = os.path.join(os.getcwd(), "data", "downloads")
+        os.makedirs(self.root, exist_ok=True)
+
+        self.client = MusicClient()
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._active = set()
+        self._cancelled = set()
+
+        self._lock = threading.Lock()
+        self._local = {}  # video_id -> stream entry of a completed download
+        self._conn = sqlite3.connect(
+            os.path.join(self.root, "index.db"), check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS downloads (
+                video_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                path TEXT,
+                title TEXT,
+                artist TEXT,
+                thumbnail TEXT,
+                size INTEGER,
+                sha256 TEXT,
+                error TEXT,
+                added_at REAL NOT NULL,
+                completed_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+        with self._lock:
+            for row in self._conn.execute(
+                "SELECT * FROM downloads WHERE status = 'done' AND path IS NOT NULL"
+            ):
+                self._local[row["video_id"]] = self._stream_entry(row)
+
+        # Resume whatever was still queued or running when the app closed
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id FROM downloads WHERE status IN ('queued', 'downloading') "
+                "ORDER BY added_at"
+            ).fetchall()
+        for row in rows:
+            self._pending.append(row["video_id"])
+        if rows:
+            print(f"Resuming {len(rows)} unfinished downloads")
+
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"Download-{i}")
+            thread.daemon = True
+            thread.start()
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def enqueue(self, video_id, title=None, artist=None, thumbnail=None):
+        if not video_id:
+            return
+        entry = self.get(video_id)
+        if entry and entry["status"] in ("queued", "downloading"):
+            return
+        if entry and entry["status"] == "done" and self.get_local_path(video_id):
+            return
+
+        with self._lock:
+            self._local.pop(video_id, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads "
+                "(video_id, status, title, artist, thumbnail, added_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (video_id, title, artist, thumbnail, time.time()),
+            )
+            self._conn.commit()
+
+        with self._cond:
+            self._cancelled.discard(video_id)
+            self._pending.append(video_id)
+            self._cond.notify()
+        self._notify(video_id, "queued", 0.0)
+
+    def remove(self, video_id):
+        """Cancels a pending download or deletes a finished one."""
+        with self._cond:
+            if video_id in self._pending:
+                self._pending.remove(video_id)
+            if video_id in self._active:
+                self._cancelled.add(video_id)
+
+        entry = self.get(video_id)
+        if entry and entry["path"]:
+            self._delete_files(entry["path"])
+        with self._lock:
+            self._local.pop(video_id, None)
+            self._conn.execute("DELETE FROM downloads WHERE video_id = ?", (video_id,))
+            self._conn.commit()
+        self._notify(video_id, "removed", 0.0)
+
+    def get(self, video_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM downloads WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_downloads(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM downloads ORDER BY added_at DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_local_path(self, video_id):
+        """Returns the file of a completed download, or None. Cheap enough for the playback path."""
+        entry = self.get(video_id)
+        if not entry or entry["status"] != "done" or not entry["path"]:
+            return None
+        try:
+            size = os.path.getsize(entry["path"])
+        except OSError:
+            size = -1
+        if size != entry["size"]:
+            # File vanished or was truncated behind our back
+            print(f"Download of {video_id} is missing or damaged, dropping it")
+            self._set_status(video_id, "failed", error="file missing or damaged")
+            return None
+        return entry["path"]
+
+    def get_local_stream(self, video_id, verify=False):
+        """
+        Returns a stream entry (same shape as the stream cache) for a downloaded track.
+        With verify=True the file is checked on disk first, which is not for the main loop.
+        """
+        entry = self._local.get(video_id)
+        if entry is None:
+            return None
+        if verify and not self.get_local_path(video_id):
+            return None
+        return dict(entry)
+
+    def is_downloaded(self, video_id):
+        return video_id in self._local
+
+    def verify(self, video_id):
+        """Full integrity check against the recorded sha256."""
+        path = self.get_local_path(video_id)
+        if not path:
+            return False
+        if self._hash_file(path) != self.get(video_id)["sha256"]:
+            print(f"Checksum mismatch for {video_id}")
+            self._set_status(video_id, "failed", error="checksum mismatch")
+            return False
+        return True
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                video_id = self._pending.popleft()
+                if video_id in self._active:
+                    continue
+                self._active.add(video_id)
+
+            try:
+                self._download_with_retries(video_id)
+            finally:
+                with self._cond:
+                    self._active.discard(video_id)
+                    self._cancelled.discard(video_id)
+
+    def _download_with_retries(self, video_id):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self._set_status(video_id, "downloading")
+            try:
+                self._download(video_id)
+                return
+            except DownloadCancelled:
+                print(f"Download of {video_id} cancelled")
+                self._delete_partial(video_id)
+                return
+            except Exception as e:
+                with self._cond:
+                    if video_id in self._cancelled:
+                        self._delete_partial(video_id)
+                        return
+                print(f"Download of {video_id} failed (attempt {attempt}): {e}")
+                if attempt == MAX_ATTEMPTS:
+                    self._set_status(video_id, "failed", error=str(e))
+                    self._notify(video_id, "failed", 0.0)
+                    return
+                time.sleep(2**attempt)
+
+    def _download(self, video_id):
+        def progress_hook(d):
+            with self._cond:
+                if video_id in self._cancelled:
+                    raise DownloadCancelled()
+            if d.get("status") == "downloading":
+                total = d.get("total_bytes") or d.get("total_bytes_estimate")
+                if total:
+                    self._notify(
+                        video_id, "downloading", d.get("downloaded_bytes", 0) / total
+                    )
+
+        opts = dict(self.base_opts)
+        opts.update(
+            {
+                "outtmpl": os.path.join(self.root, f"{video_id}.%(ext)s"),
+                "continuedl": True,
+                "retries": 5,
+                "progress_hooks": [progress_hook],
+            }
+        )
+
+        cookie_file = None
+        if self.client.is_authenticated() and self.client.api:
+            headers = self.client.api.headers
+            cookie_file = create_cookie_file(headers)
+            if cookie_file:
+                opts["cookiefile"] = cookie_file
+            if "User-Agent" in headers:
+                opts["http_headers"] = {"User-Agent": headers["User-Agent"]}
+
+        try:
+            with YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(
+                    f"https://www.youtube.com/watch?v={video_id}", download=True
+                )
+                requested = info.get("requested_downloads") or [{}]
+                path = requested[0].get("filepath") or ydl.prepare_filename(info)
+                expected_size = info.get("filesize")
+                title = info.get("title")
+                artist = info.get("artist") or info.get("uploader")
+                thumbnail = info.get("thumbnail")
+                del info
+        finally:
+            if cookie_file and os.path.exists(cookie_file):
+                os.remove(cookie_file)
+
+        # Integrity: the file must exist, be non-empty and match the advertised size
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size <= 0 or (expected_size and size != expected_size):
+            self._delete_files(path)
+            raise IOError(f"incomplete file ({size} of {expected_size} bytes)")
+
+        with self._cond:
+            if video_id in self._cancelled:
+                raise DownloadCancelled()
+
+        digest = self._hash_file(path)
+        entry = self.get(video_id) or {}
+        title = entry.get("title") or title
+        artist = entry.get("artist") or artist
+        thumbnail = entry.get("thumbnail") or thumbnail
+        with self._lock:
+            self._conn.execute(
+                "UPDATE downloads SET status = 'done', path = ?, size = ?, sha256 = ?, "
+                "title = ?, artist = ?, thumbnail = ?, error = NULL, completed_at = ? "
+                "WHERE video_id = ?",
+                (
+                    path,
+                    size,
+                    digest,
+                    title,
+                    artist,
+                    thumbnail,
+                    time.time(),
+                    video_id,
+                ),
+            )
+            self._conn.commit()
+            self._local[video_id] = self._stream_entry(
+                {"path": path, "title": title, "artist": artist, "thumbnail": thumbnail}
+            )
+        print(f"Downloaded {video_id} to {path}")
+        self._notify(video_id, "done", 1.0)
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    def _stream_entry(self, row):
+        return {
+            # Escapes spaces, '#', '%' and non-ASCII characters that titles are full of
+            "url": GLib.filename_to_uri(os.path.abspath(row["path"]), None),
+            "title": row["title"],
+            "uploader": row["artist"],
+            "thumbnail": row["thumbnail"],
+            "expires_at": None,
+        }
+
+    def _set_status(self, video_id, status, error=None):
+        with self._lock:
+            if status != "done":
+                self._local.pop(video_id, None)
+            self._conn.execute(
+                "UPDATE downloads SET status = ?, error = ? WHERE video_id = ?",
+                (status, error, video_id),
+            )
+            self._conn.commit()
+
+    def _notify(self, video_id, status, progress):
+        for callback in list(self._listeners):
+            try:
+                callback(video_id, status, progress)
+            except Exception as e:
+                print(f"Download listener failed: {e}")
+
+    def _hash_file(self, path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _delete_partial(self, video_id):
+        for path in glob.glob(os.path.join(self.root, glob.escape(video_id) + ".*")):
+            self._delete_files(path)
+
+    def _delete_files(self, path):
+        for p in (path, path + ".part"):
+            if os.path.exists(p):
+                try:
+                    os.remove(p)
+                except OSError as e:
+                    print(f"Could not delete {p}: {e}")
@@ -181,29 +181,12 @@ class MuseMprisAdapter(MprisAdapter):
 
             track = self.player.queue[self.player.current_queue_index]
 
-            # Artist normalization
-            artist = track.get("artist", "")
-            if not artist and "artists" in track:
-                artists_list = track.get("artists", [])
-                if isinstance(artists_list, list):
-                    artist = ", ".join(
-                        [a.get("name", "") for a in artists_list if "name" in a]
-                    )
-                elif isinstance(artists_list, str):
-                    artist = artists_list
-
-            if not artist:
-                artist = "Unknown Artist"
-
-            # Thumb normalization
-            thumb = track.get("thumb")
-            if not thumb and "thumbnails" in track:
-                thumbs = track.get("thumbnails", [])
-                if thumbs:
-                    thumb = thumbs[-1].get("url")
+            # Queue entries are normalised Tracks
+            artist = track.artist or "Unknown Artist"
+            thumb = track.thumb
 
             # Sanitize videoId for D-Bus object path (hyphens -> underscores)
-            video_id = track.get("videoId", "unknown")
+            video_id = track.video_id or "unknown"
             # D-Bus path components must not start with a digit and only contain [A-Z, a-z, 0-9, _]
             safe_id = video_id.replace("-", "_").replace(".", "_")
             if safe_id[0].isdigit():
@@ -214,7 +197,7 @@ class MuseMprisAdapter(MprisAdapter):
                 "mpris:length": int(self.player.duration * 1_000_000)
                 if self.player.duration > 0
                 else 0,
-                "xesam:title": track.get("title", "Unknown Title"),
+                "xesam:title": track.title or "Unknown Title",
                 "xesam:artist": [artist],
             }
 
@@ -0,0 +1,204 @@
+import itertools
+import random
+
+_entry_ids = itertools.count(1)
+# Shared by every queue, so a replaced queue never repeats a version a view has seen
+_versions = itertools.count(1)
+
+
+class PlayQueue:
+    """
+    The player's queue: one canonical track array plus an optional shuffle permutation.
+
+    Indexing, len() and iteration follow play order, so callers can treat it like a list.
+    Every entry carries a stable id, which tells duplicates of the same track apart and
+    survives moves, shuffles and removals. Toggling shuffle never searches for the current
+    track: its canonical position is read straight from the permutation.
+
+    While shuffled, removals leave holes (None) in the canonical array instead of
+    renumbering the permutation; holes are compacted once they make up half the array,
+    or when shuffle is turned off.
+
+    version changes with every mutation of the play order, including same-length ones
+    (moves, shuffles), so views can tell whether their rows are still current.
+    """
+
+    __slots__ = ("_tracks", "_ids", "_order", "_holes", "_version")
+
+    def __init__(self, tracks=()):
+        self._tracks = list(tracks)
+        self._ids = [next(_entry_ids) for _ in self._tracks]
+        self._order = None  # Play position -> canonical index, only while shuffled
+        self._holes = 0
+        self._version = next(_versions)
+
+    # ── Sequence protocol (play order) ────────────────────────────────────────
+
+    def __len__(self):
+        return len(self._order) if self._order is not None else len(self._tracks)
+
+    def __getitem__(self, index):
+        if self._order is not None:
+            return self._tracks[self._order[index]]
+        return self._tracks[index]
+
+    def __iter__(self):
+        if self._order is None:
+            return iter(self._tracks)
+        tracks = self._tracks
+        return (tracks[c] for c in self._order)
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def shuffled(self):
+        return self._order is not None
+
+    def entry_id(self, index):
+        if self._order is not None:
+            return self._ids[self._order[index]]
+        return self._ids[index]
+
+    def index_of(self, entry_id):
+        """Play position of an entry, or -1. Linear; only for rare re-synchronisation."""
+        ids = self._ids
+        if self._order is None:
+            try:
+                return ids.index(entry_id)
+            except ValueError:
+                return -1
+        for i, c in enumerate(self._order):
+            if ids[c] == entry_id:
+                return i
+        return -1
+
+    def original(self):
+        """Tracks in their canonical (unshuffled) order."""
+        if self._holes:
+            return [t for t in self._tracks if t is not None]
+        return list(self._tracks)
+
+    # ── Mutation ──────────────────────────────────────────────────────────────
+
+    def append(self, track):
+        self.insert(len(self), track)
+
+    def insert(self, index, track):
+        """Inserts at a play position. While shuffled the track joins the end of the canonical order."""
+        self._version = next(_versions)
+        if self._order is None:
+            self._tracks.insert(index, track)
+            self._ids.insert(index, next(_entry_ids))
+        else:
+            self._tracks.append(track)
+            self._ids.append(next(_entry_ids))
+            self._order.insert(index, len(self._tracks) - 1)
+
+    def extend(self, tracks, shuffle_after=None):
+        """
+        Appends tracks. While shuffled, shuffle_after=i mixes them into the entries after
+        play position i, leaving history and the current track in place.
+        """
+        self._version = next(_versions)
+        start = len(self._tracks)
+        self._tracks.extend(tracks)
+        self._ids.extend(next(_entry_ids) for _ in range(len(self._tracks) - start))
+        if self._order is None:
+            return
+        added = list(range(start, len(self._tracks)))
+        if shuffle_after is None:
+            self._order.extend(added)
+        else:
+            upcoming = self._order[shuffle_after + 1 :] + added
+            random.shuffle(upcoming)
+            del self._order[shuffle_after + 1 :]
+            self._order.extend(upcoming)
+
+    def pop(self, index):
+        """Removes and returns the track at a play position."""
+        self._version = next(_versions)
+        if self._order is None:
+            del self._ids[index]
+            return self._tracks.pop(index)
+        c = self._order.pop(index)
+        track = self._tracks[c]
+        self._tracks[c] = None
+        self._ids[c] = None
+        self._holes += 1
+        if self._holes * 2 > len(self._tracks):
+            self._compact()
+        return track
+
+    def move(self, old_index, new_index):
+        """Moves the entry at old_index so it ends up at new_index (list pop/insert semantics)."""
+        self._version = next(_versions)
+        if self._order is not None:
+            self._order.insert(new_index, self._order.pop(old_index))
+        else:
+            self._tracks.insert(new_index, self._tracks.pop(old_index))
+            self._ids.insert(new_index, self._ids.pop(old_index))
+
+    # ── Shuffle ───────────────────────────────────────────────────────────────
+
+    def shuffle(self, first=-1):
+        """
+        Shuffles the play order. The entry at play position first (if valid) plays first.
+        Returns the new play position of that entry: 0, or -1 without one.
+        """
+        if self._order is not None:
+            self.unshuffle(-1)
+        self._version = next(_versions)
+        n = len(self._tracks)
+        rest = [c for c in range(n) if c != first] if 0 <= first < n else list(range(n))
+        random.shuffle(rest)
+        if 0 <= first < n:
+            self._order = [first] + rest
+            return 0
+        self._order = rest
+        return -1
+
+    def unshuffle(self, current=-1):
+        """Restores canonical order. Returns the new play position of the entry at current."""
+        if self._order is None:
+            return current
+        self._version = next(_versions)
+        c = self._order[current] if 0 <= current < len(self._order) else -1
+        if self._holes:
+            c = self._compact(c)
+        self._order = None
+        return c
+
+    def _compact(self, keep=-1):
+        """Drops holes from the canonical array; returns the new canonical index of keep."""
+        remap = {}
+        tracks, ids = [], []
+        for c, track in enumerate(self._tracks):
+            if track is not None:
+                remap[c] = len(tracks)
+                tracks.append(track)
+                ids.append(self._ids[c])
+        self._tracks, self._ids = tracks, ids
+        if self._order is not None:
+            self._order = [remap[c] for c in self._order]
+        self._holes = 0
+        return remap.get(keep, -1)
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def snapshot(self):
+        """Returns (canonical tracks, play order as canonical indices or None)."""
+        if self._holes:
+            self._compact()
+        return list(self._tracks), (list(self._order) if self._order else None)
+
+    @classmethod
+    def restore(cls, tracks, order=None):
+        queue = cls(tracks)
+        if order is not None:
+            n = len(queue._tracks)
+            if sorted(order) == list(range(n)):
+                queue._order = list(order)
+                queue._version = next(_versions)
+        return queue
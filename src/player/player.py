@@ -1,17 +1,47 @@
 import gi
 
 gi.require_version("Gst", "1.0")
-from gi.repository import Gst, GObject
-from yt_dlp import YoutubeDL
+from gi.repository import Gst, GObject, GLib
 import threading
+import hashlib
 import random
 import os
+import time
 
 from mpris_server.server import Server
 from player.mpris import MuseMprisAdapter, MuseEventAdapter
+from player.stream_cache import StreamCache
+from player.ydl_pool import YoutubeDLPool
+from player.resolver import (
+    StreamResolver,
+    PRIORITY_PLAYBACK,
+    PRIORITY_PREFETCH,
+    PRIORITY_REFRESH,
+)
+from player.downloads import DownloadManager
+from player.audio_cache import AudioCache
+from player.stream_proxy import StreamProxy
+from player.quality import format_for_profile, describe_stream
+from player.track import Track
+from player.play_queue import PlayQueue
+from player.session import (
+    SessionStore,
+    pack_session,
+    unpack_queue,
+    POSITION_INTERVAL,
+)
+from settings import Settings
 
 from api.client import MusicClient
 
+# Automatic re-resolutions allowed per track before an error stops playback
+MAX_RECOVERY_ATTEMPTS = 3
+# Directly played URLs are refreshed this long before their expire= timestamp
+REFRESH_BEFORE_EXPIRY = 10 * 60
+EXPIRY_CHECK_INTERVAL = 60
+# How long the stream proxy waits for a re-resolved URL before failing the read
+REFRESH_TIMEOUT = 60
+
 
 class Player(GObject.Object):
     __gsignals__ = {
@@ -35,6 +65,11 @@ class Player(GObject.Object):
             None,
             (float, bool),
         ),  # volume, muted
+        "stream-info-changed": (
+            GObject.SignalFlags.RUN_FIRST,
+            None,
+            (str,),
+        ),  # codec, bitrate and itag of the playing stream
     }
 
     def __init__(self):
@@ -42,29 +77,68 @@ class Player(GObject.Object):
         Gst.init(None)
         self.client = MusicClient()
         self.player = Gst.ElementFactory.make("playbin", "player")
+        self.settings = Settings()
         self.ydl_opts = {
-            "format": "bestaudio/best",
+            # The selector doubles as the stream/audio cache key, so profiles never share entries
+            "format": format_for_profile(self.settings.get("audio_quality")),
             "quiet": True,
             "noplaylist": True,
             "extract_flat": False,
             "js_runtimes": {"node": {}},
             "remote_components": ["ejs:github"],
         }
+        # Resolved stream URLs survive restarts, so replays skip yt-dlp entirely
+        self.stream_cache = StreamCache()
+        self.ydl_pool = YoutubeDLPool(self.ydl_opts)
+        # All resolutions (playback and prefetch) share one bounded, de-duplicating pool
+        self.resolver = StreamResolver(self._resolve_stream, workers=2)
+        # Offline copies; downloaded tracks never go through the resolver
+        self.downloads = DownloadManager(self.ydl_opts)
+        # Opt-in write-through cache of streamed audio
+        self.audio_cache = AudioCache(self.settings.get("audio_cache_max_mb") * 1024 * 1024)
+        self.settings.connect(self._on_setting_changed)
+        # playbin streams through a local range proxy that survives URL expiry
+        try:
+            self.stream_proxy = StreamProxy(
+                self._refresh_stream,
+                self.audio_cache,
+                lambda: self.settings.get("audio_cache_enabled"),
+            )
+        except Exception as e:
+            print(f"Stream proxy unavailable, playing URLs directly: {e}")
+            self.stream_proxy = None
 
         self.bus = self.player.get_bus()
         self.bus.add_signal_watch()
         self.bus.connect("message", self.on_message)
 
+        # Gapless: hand playbin the next URI before the current stream drains
+        self.gapless_enabled = True
+        # about-to-finish fires on a streaming thread, so the main loop prepares the next entry and
+        # the handler only swaps it in under the lock
+        self._gapless_lock = threading.Lock()
+        self._gapless_next = None  # (queue index, entry id, stream, uri) ready for about-to-finish
+        self._gapless_pending = None  # The same tuple once handed to playbin
+        self.player.connect("about-to-finish", self._on_about_to_finish)
+
         self.current_video_id = None
 
         # Queue State
-        self.queue = []  # List of dicts: {id, title, artist, thumb, ...}
+        self.queue = PlayQueue()  # Tracks in play order, see PlayQueue
         self.current_queue_index = -1
         self.shuffle_mode = False
-        self.original_queue = []  # Backup for un-shuffle
         self.load_generation = 0  # To handle race conditions in loading
         self.current_url = None
+        self.stream_info = ""  # Shown in the UI, see describe_stream
         self.last_seek_time = 0.0
+        # Recovery from expired stream URLs
+        self._last_position = 0.0  # Seconds, as last reported by update_position
+        self._current_expires_at = None  # Only set while playbin holds a signed URL itself
+        self._fresh_stream = None  # (videoId, entry) re-resolved ahead of expiry
+        self._pending_resume = None  # (position, resume playing) applied once prerolled
+        self._recovery_attempts = 0
+        self._start_at = 0.0  # Position for the next _start_playback, e.g. a restored session
+        self._restore_pending = False  # Restored track is shown but not loaded yet
         self.duration = -1
         self._is_loading = False
         self._current_logical_state = "stopped"
@@ -75,8 +149,12 @@ class Player(GObject.Object):
         self.queue_is_infinite = False
         self._is_fetching_infinite = False
 
+        # Look-ahead resolution of upcoming stream URLs
+        self.prefetch_count = 2  # How many upcoming tracks to resolve ahead
+
         # Timer for progress
         GObject.timeout_add(100, self.update_position)
+        GObject.timeout_add_seconds(EXPIRY_CHECK_INTERVAL, self._check_stream_expiry)
 
         # MPRIS Setup
         self.mpris_adapter = MuseMprisAdapter(self)
@@ -93,6 +171,16 @@ class Player(GObject.Object):
         self.connect("progression", self._on_mpris_progression)
         self.connect("volume-changed", self._on_mpris_volume_changed)
 
+        # Re-plan look-ahead whenever the upcoming order can have changed
+        self.connect("state-changed", self._on_prefetch_state_changed)
+
+        # Session persistence: restored in the background so window presentation never waits
+        self.session = SessionStore(self._snapshot_session)
+        self.connect("state-changed", lambda *_: self.session.mark_dirty())
+        self.connect("metadata-changed", lambda *_: self.session.mark_dirty())
+        GObject.timeout_add_seconds(POSITION_INTERVAL, self._on_session_position_timer)
+        self.session.load_async(self._restore_session)
+
     def _on_mpris_state_changed(self, obj, state):
         if hasattr(self, "mpris_events"):
             # Explicitly tell the server the PlaybackStatus changed
@@ -121,49 +209,28 @@ class Player(GObject.Object):
         self, video_id, title="Loading...", artist="Unknown", thumbnail_url=None
     ):
         """Legacy/Single-track load. Clears queue and plays this one."""
-        track = {
-            "videoId": video_id,
-            "title": title,
-            "artist": artist,  # String or list, normalized later
-            "thumb": thumbnail_url,
-        }
-        self.set_queue([track])
+        if isinstance(artist, list):
+            artist = ", ".join(a.get("name", "") for a in artist)
+        self.set_queue([Track(video_id, title, artist, thumbnail_url)])
 
     def set_queue(
         self, tracks, start_index=0, shuffle=False, source_id=None, is_infinite=False
     ):
         """
         Sets the global queue and plays the track at start_index.
-        tracks: list of dicts with videoId, title, artist, thumb
+        tracks: Track objects or track dicts, normalised here once
         """
         self.stop()
-        self.queue = list(tracks)  # Copy for playing
-        self.original_queue = list(tracks)  # Backup for un-shuffle
+        self.queue = PlayQueue(Track.from_dict(t) for t in tracks)
         self.shuffle_mode = shuffle  # Set mode based on request
         self.queue_source_id = source_id
         self.queue_is_infinite = is_infinite
         self._is_fetching_infinite = False
 
-        target_track = (
-            self.queue[start_index] if 0 <= start_index < len(self.queue) else None
-        )
-
         if shuffle:
-            import random
-
-            # If start_index is valid, we want to play that track FIRST, then shuffle the rest.
-            if target_track:
-                # Remove target
-                self.queue.remove(target_track)
-                # Shuffle rest
-                random.shuffle(self.queue)
-                # Insert target at 0
-                self.queue.insert(0, target_track)
-                self.current_queue_index = 0
-            else:
-                random.shuffle(self.queue)
-                self.current_queue_index = 0
-            # Note: original_queue remains ordered as passed
+            # A valid start_index plays first, the rest is shuffled behind it
+            self.queue.shuffle(start_index)
+            self.current_queue_index = 0
         else:
             self.current_queue_index = start_index
 
@@ -175,23 +242,21 @@ class Player(GObject.Object):
 
     def add_to_queue(self, track, next=False):
         """Adds a track to the queue. if next=True, inserts after current."""
+        track = Track.from_dict(track)
         if next and self.current_queue_index >= 0:
             self.queue.insert(self.current_queue_index + 1, track)
-            self.original_queue.insert(
-                self.current_queue_index + 1, track
-            )  # Keep sync roughly
         else:
             self.queue.append(track)
-            self.original_queue.append(track)
 
         # If nothing is playing, play this
         if self.current_queue_index == -1:
             self.current_queue_index = 0
             self._play_current_index()
+        self.session.mark_dirty()
 
     def remove_from_queue(self, index):
         if 0 <= index < len(self.queue):
-            pop = self.queue.pop(index)
+            self.queue.pop(index)
             # Adjust current index
             if index < self.current_queue_index:
                 self.current_queue_index -= 1
@@ -203,9 +268,7 @@ class Player(GObject.Object):
                     self.stop()
                     self.current_queue_index = -1
 
-            # Remove from original if present (simplified)
-            if pop in self.original_queue:
-                self.original_queue.remove(pop)
+            self.session.mark_dirty()
 
     def move_queue_item(self, old_index, new_index):
         if 0 <= old_index < len(self.queue) and 0 <= new_index < len(self.queue):
@@ -215,8 +278,7 @@ class Player(GObject.Object):
             if old_index < new_index:
                 insert_index -= 1
 
-            item = self.queue.pop(old_index)
-            self.queue.insert(insert_index, item)
+            self.queue.move(old_index, insert_index)
 
             # Update current_queue_index
             # This is tricky. Let's just re-find the playing track if possible, or simple math.
@@ -235,8 +297,7 @@ class Player(GObject.Object):
 
     def clear_queue(self):
         self.stop()
-        self.queue = []
-        self.original_queue = []
+        self.queue = PlayQueue()
         self.current_queue_index = -1
         self.emit("state-changed", "stopped")
         self.emit("metadata-changed", "", "", "", "", "INDIFFERENT")
@@ -310,43 +371,16 @@ class Player(GObject.Object):
 
     def shuffle_queue(self):
         if not self.shuffle_mode:
-            # Enable Shuffle
+            # Enable Shuffle: the current track stays, everything else is shuffled behind it
             self.shuffle_mode = True
             if self.queue:
-                current = (
-                    self.queue[self.current_queue_index]
-                    if self.current_queue_index >= 0
-                    else None
-                )
-
-                # Shuffle the list
-                remaining = [
-                    t for i, t in enumerate(self.queue) if i != self.current_queue_index
-                ]
-                random.shuffle(remaining)
-
-                if current:
-                    self.queue = [current] + remaining
-                    self.current_queue_index = 0
-                else:
-                    self.queue = remaining
-                    self.current_queue_index = -1
+                self.current_queue_index = self.queue.shuffle(self.current_queue_index)
         else:
-            # Disable Shuffle (Restore original order)
+            # Disable Shuffle: back to the original order, still on the same entry
             self.shuffle_mode = False
-            # Try to find current track in original queue
-            if self.current_queue_index >= 0 and self.current_queue_index < len(
-                self.queue
-            ):
-                current = self.queue[self.current_queue_index]
-                self.queue = list(self.original_queue)
-                # Restore index
-                try:
-                    self.current_queue_index = self.queue.index(current)
-                except ValueError:
-                    self.current_queue_index = 0  # Fallback
-            else:
-                self.queue = list(self.original_queue)
+            index = self.queue.unshuffle(self.current_queue_index)
+            if self.current_queue_index >= 0:
+                self.current_queue_index = index
 
         # Emit signal to update UI
         self.emit("state-changed", "queue-updated")
@@ -361,36 +395,28 @@ class Player(GObject.Object):
     def _play_current_index(self):
         if 0 <= self.current_queue_index < len(self.queue):
             track = self.queue[self.current_queue_index]
-            video_id = track.get("videoId")
-            title = track.get("title", "Unknown")
-            artist = track.get("artist", "")
-            thumb = track.get("thumb")
-            like_status = track.get("likeStatus", "INDIFFERENT")
-
-            # Metadata Normalization (Handle raw ytmusicapi data)
-            if not artist and "artists" in track:
-                artist = ", ".join(
-                    [a.get("name", "") for a in track.get("artists", [])]
-                )
-
-            if not artist:
-                artist = "Unknown"
-
-            if not thumb and "thumbnails" in track:
-                thumbs = track.get("thumbnails", [])
-                if thumbs:
-                    thumb = thumbs[-1]["url"]
-
-            # Handle artist list if needed (legacy check)
-            if isinstance(artist, list):
-                artist = ", ".join([a.get("name", "") for a in artist])
-
-            self._load_internal(video_id, title, artist, thumb, like_status)
+            self._load_internal(
+                track.video_id, track.title, track.artist, track.thumb, track.like_status
+            )
 
     def _load_internal(
-        self, video_id, title, artist, thumbnail_url, like_status="INDIFFERENT"
+        self,
+        video_id,
+        title,
+        artist,
+        thumbnail_url,
+        like_status="INDIFFERENT",
+        start_at=0.0,
     ):
         self.current_video_id = video_id
+        # An explicit load overrides any URI queued for a gapless switch
+        self._clear_gapless()
+        self._pending_resume = None
+        self._fresh_stream = None
+        self._recovery_attempts = 0
+        self._last_position = start_at
+        self._start_at = start_at
+        self._restore_pending = False
 
         # Set loading FIRST, then stop pipeline — prevents a "stopped" flash
         self._is_loading = True
@@ -421,54 +447,53 @@ class Player(GObject.Object):
         if hasattr(self, "mpris_events"):
             self.mpris_events.on_player_all()
 
-        # Run yt-dlp in a thread
-        thread = threading.Thread(
-            target=self._fetch_and_play,
-            args=(video_id, title, artist, thumbnail_url, like_status, current_gen),
+        local = self.downloads.get_local_stream(video_id)
+        if local:
+            print(f"DEBUG: Playing downloaded copy of {video_id}")
+            self.resolver.cancel_priority(PRIORITY_PLAYBACK)
+            thread = threading.Thread(
+                target=self._fetch_and_play,
+                args=(
+                    video_id,
+                    title,
+                    artist,
+                    thumbnail_url,
+                    like_status,
+                    current_gen,
+                    local,
+                ),
+            )
+            thread.daemon = True
+            thread.start()
+            return
+
+        # Resolve on the shared pool; this supersedes whatever is still queued
+        def on_resolved(vid, stream, error):
+            if error:
+                print(f"Error fetching URL: {error}")
+                return
+            self._fetch_and_play(
+                video_id, title, artist, thumbnail_url, like_status, current_gen, stream
+            )
+
+        self.resolver.submit(
+            video_id, callback=on_resolved, priority=PRIORITY_PLAYBACK, supersede=True
         )
-        thread.daemon = True
-        thread.start()
 
     def extend_queue(self, tracks):
-        """Appends new tracks to the queue (and original_queue)."""
+        """Appends new tracks to the queue."""
         if not tracks:
             return
+        tracks = [Track.from_dict(t) for t in tracks]
 
-        # Append to original queue always
-        self.original_queue.extend(tracks)
-
-        if self.shuffle_mode:
-            # Smart Shuffle: Mix new tracks with UPCOMING tracks
-            # We don't want to touch history or current song.
-
-            current_idx = self.current_queue_index
-
-            # Assume valid index; fallback handling can be added if needed.
-            if 0 <= current_idx < len(self.queue):
-                history_and_current = self.queue[: current_idx + 1]
-                upcoming = self.queue[current_idx + 1 :]
-
-                combined = upcoming + tracks
-                import random
-
-                random.shuffle(combined)
-
-                self.queue = history_and_current + combined
-                # current_queue_index stays same
-            else:
-                # Queue empty or invalid index, just shuffle all
-                self.queue.extend(tracks)
-                import random
-
-                random.shuffle(self.queue)
-                # If we were playing, index might be -1.
-                # If we were stopped, index -1.
-
-                if self.current_queue_index == -1 and self.queue:
-                    self.current_queue_index = 0
-
+        if self.shuffle_mode and 0 <= self.current_queue_index < len(self.queue):
+            # Smart Shuffle: mix new tracks with upcoming ones, leaving history and current alone
+            self.queue.extend(tracks, shuffle_after=self.current_queue_index)
         else:
             self.queue.extend(tracks)
+            if self.shuffle_mode and self.current_queue_index == -1 and self.queue:
+                self.queue.shuffle()
+                self.current_queue_index = 0
 
         self.emit("state-changed", "queue-updated")
 
@@ -478,7 +503,7 @@ class Player(GObject.Object):
 
         last_video_id = None
         if self.queue:
-            last_video_id = self.queue[-1].get("videoId")
+            last_video_id = self.queue[-1].video_id
 
         def fetch_job():
             try:
@@ -491,9 +516,7 @@ class Player(GObject.Object):
                 tracks = data.get("tracks", [])
 
                 # Filter out tracks already in our queue
-                existing_ids = {
-                    t.get("videoId") for t in self.queue if t.get("videoId")
-                }
+                existing_ids = {t.video_id for t in self.queue if t.video_id}
                 new_tracks = [t for t in tracks if t.get("videoId") not in existing_ids]
 
                 if new_tracks:
@@ -512,32 +535,61 @@ class Player(GObject.Object):
         self.extend_queue(new_tracks)
         self._is_fetching_infinite = False
 
-    def _create_cookie_file(self, headers):
-        """Creates a temporary Netscape format cookie file from headers."""
-        import tempfile
-        import time
+    def _auth_identity(self):
+        """Short fingerprint of the current login, used to key cached stream URLs."""
+        if self.client.is_authenticated() and self.client.api:
+            cookie = self.client.api.headers.get("Cookie", "")
+            if cookie:
+                return hashlib.sha1(cookie.encode()).hexdigest()[:16]
+        return "anonymous"
+
+    def _refresh_stream(self, video_id):
+        """Re-resolves an expired stream on the shared pool, blocking; for the stream proxy."""
+        return self.resolver.resolve(
+            video_id, priority=PRIORITY_PLAYBACK, use_cache=False, timeout=REFRESH_TIMEOUT
+        )
 
-        cookie_str = headers.get("Cookie", "")
-        if not cookie_str:
-            return None
+    def _resolve_stream(self, video_id, use_cache=True):
+        """
+        Resolves the stream URL for video_id.
+        Returns a dict with url, title, uploader and thumbnail, served from the stream cache when still valid.
+        """
+        fmt = self.ydl_opts["format"]
+        auth = self._auth_identity()
 
-        fd, path = tempfile.mkstemp(suffix=".txt", text=True)
-        with os.fdopen(fd, "w") as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write("# This file is generated by Mixtapes\n\n")
+        # Off the main loop, so the file itself can be checked
+        local = self.downloads.get_local_stream(video_id, verify=True)
+        if local:
+            return local
 
-            now = int(time.time()) + 3600 * 24 * 365  # 1 year validity
+        if use_cache:
+            cached = self.stream_cache.get(video_id, fmt, auth)
+            if cached:
+                print(f"DEBUG: Stream cache hit for {video_id}")
+                return cached
 
-            # Simple parsing of "key=value; key2=value2"
-            parts = cookie_str.split(";")
-            for part in parts:
-                if "=" in part:
-                    key, value = part.strip().split("=", 1)
-                    # domain flag path secure expiration name value
-                    f.write(f".youtube.com\tTRUE\t/\tTRUE\t{now}\t{key}\t{value}\n")
-                    f.write(f".google.com\tTRUE\t/\tTRUE\t{now}\t{key}\t{value}\n")
+        url = f"https://www.youtube.com/watch?v={video_id}"
 
-        return path
+        headers = None
+        if self.client.is_authenticated() and self.client.api:
+            headers = self.client.api.headers
+        else:
+            print("DEBUG: Client NOT authenticated")
+
+        # Warm instances keep extractors and the JS runtime alive between tracks
+        with self.ydl_pool.acquire(auth, headers) as ydl:
+            info = ydl.extract_info(url, download=False)
+            entry = self.stream_cache.put(
+                video_id,
+                fmt,
+                auth,
+                info["url"],
+                title=info.get("title", "Unknown"),
+                uploader=info.get("uploader", "Unknown"),
+                thumbnail=info.get("thumbnail"),
+            )
+            del info  # Free 100KB+ of format/subtitle data
+            return entry
 
     def _fetch_and_play(
         self,
@@ -547,138 +599,213 @@ class Player(GObject.Object):
         thumb_hint,
         like_status_hint,
         generation,
+        stream=None,
     ):
         if generation != self.load_generation:
             print(
                 f"DEBUG: Stale load generation {generation} (current {self.load_generation}). Aborting."
             )
             return
-        import os
-
-        url = f"https://www.youtube.com/watch?v={video_id}"
 
-        # Use a local copy of options to prevent race conditions
-        opts = self.ydl_opts.copy()
-        cookie_file = None
         try:
-            # Inject headers/cookies if authenticated
-            if self.client.is_authenticated() and self.client.api:
-                print(
-                    f"DEBUG: Client is authenticated. Headers keys: {list(self.client.api.headers.keys())}"
-                )
-                # Create Netscape cookie file
-                cookie_file = self._create_cookie_file(self.client.api.headers)
-                if cookie_file:
-                    print(f"DEBUG: Generated cookie file at {cookie_file}")
-                    opts["cookiefile"] = cookie_file
-                else:
-                    print("DEBUG: No cookie file generated (Cookie header missing?)")
-
-                # Still pass User-Agent and Authorization if available
-                http_headers = {}
-                if "User-Agent" in self.client.api.headers:
-                    http_headers["User-Agent"] = self.client.api.headers["User-Agent"]
-                if "Authorization" in self.client.api.headers:
-                    print("DEBUG: Passing Authorization header to yt-dlp")
-                    http_headers["Authorization"] = self.client.api.headers[
-                        "Authorization"
-                    ]
-
-                if http_headers:
-                    opts["http_headers"] = http_headers
-            else:
-                print("DEBUG: Client NOT authenticated")
+            if stream is None:
+                stream = self._resolve_stream(video_id)
+            stream_url = stream["url"]
+
+            # Extract only what we need from the resolved entry
+            fetched_title = stream.get("title") or "Unknown"
+            fetched_artist = stream.get("uploader") or "Unknown"
+            fetched_thumb = stream.get("thumbnail")
+
+            # If hints are placeholders, try to get better metadata from ytmusicapi
+            if (not title_hint or title_hint == "Loading...") or (
+                not artist_hint or artist_hint == "Unknown"
+            ):
+                try:
+                    song_details = self.client.get_song(video_id)
+                    if song_details:
+                        v_details = song_details.get("videoDetails", {})
+                        if "title" in v_details:
+                            fetched_title = v_details["title"]
+                        if "author" in v_details:
+                            fetched_artist = v_details["author"]
+
+                        # Use high-res thumbnail from get_song if available
+                        if (
+                            not thumb_hint
+                            and "thumbnail" in v_details
+                            and "thumbnails" in v_details["thumbnail"]
+                        ):
+                            thumbs = v_details["thumbnail"]["thumbnails"]
+                            if thumbs:
+                                fetched_thumb = thumbs[-1]["url"]
+
+                except Exception as e:
+                    print(f"Error fetching metadata from ytmusicapi: {e}")
+
+            final_title = (
+                title_hint
+                if title_hint and title_hint != "Loading..."
+                else fetched_title
+            )
+            final_artist = (
+                artist_hint
+                if artist_hint and artist_hint != "Unknown"
+                else fetched_artist
+            )
 
-            with YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                stream_url = info["url"]
+            print(f"Playing: {final_title} by {final_artist}")
 
-                # Extract only what we need, then drop the large info dict
-                fetched_title = info.get("title", "Unknown")
-                fetched_artist = info.get("uploader", "Unknown")
-                fetched_thumb = info.get("thumbnail")
-                del info  # Free 100KB+ of format/subtitle data
+            final_thumb = thumb_hint or fetched_thumb or ""
 
-                # If hints are placeholders, try to get better metadata from ytmusicapi
-                if (not title_hint or title_hint == "Loading...") or (
-                    not artist_hint or artist_hint == "Unknown"
-                ):
-                    try:
-                        song_details = self.client.get_song(video_id)
-                        if song_details:
-                            v_details = song_details.get("videoDetails", {})
-                            if "title" in v_details:
-                                fetched_title = v_details["title"]
-                            if "author" in v_details:
-                                fetched_artist = v_details["author"]
-
-                            # Use high-res thumbnail from get_song if available
-                            if (
-                                not thumb_hint
-                                and "thumbnail" in v_details
-                                and "thumbnails" in v_details["thumbnail"]
-                            ):
-                                thumbs = v_details["thumbnail"]["thumbnails"]
-                                if thumbs:
-                                    fetched_thumb = thumbs[-1]["url"]
-
-                    except Exception as e:
-                        print(f"Error fetching metadata from ytmusicapi: {e}")
-
-                final_title = (
-                    title_hint
-                    if title_hint and title_hint != "Loading..."
-                    else fetched_title
-                )
-                final_artist = (
-                    artist_hint
-                    if artist_hint and artist_hint != "Unknown"
-                    else fetched_artist
+            # Check generation again before playing
+            if generation != self.load_generation:
+                print(
+                    f"DEBUG: Stale load generation {generation} before playbin set. Aborting."
                 )
+                return
 
-                print(f"Playing: {final_title} by {final_artist}")
-
-                final_thumb = thumb_hint or fetched_thumb or ""
-
-                # Check generation again before playing
-                if generation != self.load_generation:
-                    print(
-                        f"DEBUG: Stale load generation {generation} before playbin set. Aborting."
-                    )
-                    if cookie_file and os.path.exists(cookie_file):
-                        os.remove(cookie_file)
-                    return
-
-                GObject.idle_add(self._start_playback, stream_url)
-
-                GObject.idle_add(
-                    self.emit,
-                    "metadata-changed",
-                    final_title,
-                    final_artist,
-                    final_thumb,
-                    video_id,
-                    like_status_hint,
-                )
+            uri = self._playback_uri(video_id, stream)
+            self._set_current_stream(stream, uri)
+            self._announce_stream(video_id, stream)
+            GObject.idle_add(self._start_playback, uri)
+
+            GObject.idle_add(
+                self.emit,
+                "metadata-changed",
+                final_title,
+                final_artist,
+                final_thumb,
+                video_id,
+                like_status_hint,
+            )
         except Exception as e:
             print(f"Error fetching URL: {e}")
-        finally:
-            if cookie_file and os.path.exists(cookie_file):
-                try:
-                    os.remove(cookie_file)
-                    print(f"DEBUG: Cleaned up cookie file {cookie_file}")
-                except:
-                    pass
+
+    def _playback_uri(self, video_id, stream):
+        """Picks what playbin opens: a local copy, the stream proxy, or the stream URL itself."""
+        url = stream["url"]
+        if url.startswith("file://"):
+            return url
+
+        fmt = self.ydl_opts["format"]
+        if self.settings.get("audio_cache_enabled"):
+            cached = self.audio_cache.get_path(video_id, fmt)
+            if cached:
+                print(f"DEBUG: Audio cache hit for {video_id}")
+                return GLib.filename_to_uri(os.path.abspath(cached), None)
+
+        if self.stream_proxy is None:
+            return url
+        return self.stream_proxy.register(video_id, fmt, url)
+
+    def _on_setting_changed(self, key, value):
+        if key == "audio_cache_max_mb":
+            self.audio_cache.max_bytes = value * 1024 * 1024
+        elif key == "audio_quality":
+            self.ydl_opts["format"] = format_for_profile(value)
+            print(f"Audio quality set to {value} ({self.ydl_opts['format']})")
+            # Warm instances are rebuilt with the new selector; applies from the next track on
+            self.ydl_pool.set_options(self.ydl_opts)
+            self.downloads.base_opts["format"] = self.ydl_opts["format"]
+            self._schedule_prefetch()
+
+    def _announce_stream(self, video_id, stream):
+        """Logs and publishes which format is playing. Safe to call from worker threads."""
+        info = describe_stream(stream["url"])
+        print(f"Stream for {video_id}: {info or 'unknown format'}")
+        GObject.idle_add(self._set_stream_info, info)
+
+    def _set_stream_info(self, info):
+        self.stream_info = info
+        self.emit("stream-info-changed", info)
+        return False
 
     def _start_playback(self, uri, cookie_file=None):
         self.player.set_state(Gst.State.NULL)
         self.player.set_property("uri", uri)
-        self.player.set_state(Gst.State.PLAYING)
+        if self._start_at > 1.0:
+            # Preroll paused, seek on ASYNC_DONE, then play
+            self._pending_resume = (self._start_at, True)
+            self._start_at = 0.0
+            self.player.set_state(Gst.State.PAUSED)
+        else:
+            self.player.set_state(Gst.State.PLAYING)
+
+        # Current track is resolved, so the network is free for look-ahead work
+        self._schedule_prefetch()
 
         # Direct URLs typically work without explicit cookies. Stale URLs are handled in _load_internal.
         return False
 
+    # ── Look-ahead prefetch ───────────────────────────────────────────────────
+
+    def _upcoming_indices(self, count):
+        """Queue indices that will play after the current one, honouring repeat mode."""
+        n = len(self.queue)
+        idx = self.current_queue_index
+        if n == 0 or not (0 <= idx < n):
+            return []
+
+        # Repeat-one replays the current track, whose URL is already cached
+        if self.repeat_mode == "track":
+            return []
+
+        indices = []
+        for step in range(1, count + 1):
+            nxt = idx + step
+            if nxt >= n:
+                if self.repeat_mode != "all":
+                    break
+                nxt %= n
+            if nxt == idx:
+                break
+            indices.append(nxt)
+        return indices
+
+    def _on_prefetch_state_changed(self, obj, state):
+        # Shuffle, move_queue_item, removals and repeat changes all end up here
+        if state in ("queue-updated", "repeat-updated"):
+            self._schedule_prefetch()
+            self._prepare_gapless()
+
+    def _schedule_prefetch(self):
+        """Resolves the next prefetch_count queue entries in the background."""
+        if self.prefetch_count <= 0 or self._is_loading:
+            return
+
+        targets = []
+        for i in self._upcoming_indices(self.prefetch_count):
+            video_id = self.queue[i].video_id
+            if self.downloads.is_downloaded(video_id):
+                continue
+            if video_id and video_id not in targets:
+                targets.append(video_id)
+
+        # Replace (not extend) the plan so reordered or removed tracks drop out
+        self.resolver.cancel_priority(PRIORITY_PREFETCH)
+        generation = self.load_generation
+        for video_id in targets:
+            # Cache hits finish immediately, misses warm the cache for next()
+            self.resolver.submit(
+                video_id,
+                callback=lambda vid, stream, error, gen=generation: self._on_prefetched(
+                    vid, error, gen
+                ),
+                priority=PRIORITY_PREFETCH,
+            )
+
+    def _on_prefetched(self, video_id, error, generation):
+        if error:
+            print(f"Prefetch failed for {video_id}: {error}")
+        elif generation == self.load_generation:
+            print(f"DEBUG: Prefetched stream for {video_id}")
+            GObject.idle_add(self._prepare_gapless)
+
     def play(self):
+        if self._restore_pending:
+            self._resume_restored_track()
+            return
         self.player.set_state(Gst.State.PLAYING)
         self._update_logical_state()
 
@@ -689,6 +816,8 @@ class Player(GObject.Object):
     def stop(self):
         self.player.set_state(Gst.State.NULL)
         self._is_loading = False
+        self._clear_gapless()
+        self._pending_resume = None
         # Force stopped state immediately
         if self._current_logical_state != "stopped":
             self._current_logical_state = "stopped"
@@ -727,13 +856,23 @@ class Player(GObject.Object):
                 GObject.idle_add(self._play_current_index)
             else:
                 GObject.idle_add(self.next)
+        elif t == Gst.MessageType.STREAM_START:
+            # With a gapless hand-over this is the moment the next track becomes audible
+            with self._gapless_lock:
+                pending, self._gapless_pending = self._gapless_pending, None
+            if pending is not None:
+                self._commit_gapless_transition(pending)
         elif t == Gst.MessageType.ASYNC_DONE:
             # The stream is actually loaded and ready
+            if self._pending_resume is not None:
+                self._apply_pending_resume()
             if hasattr(self, "mpris_events"):
                 self.mpris_events.on_player_all()  # Refresh duration and status
         elif t == Gst.MessageType.ERROR:
             err, debug = message.parse_error()
             print(f"Error: {err}, {debug}")
+            if self._is_stream_error(err, debug) and self._recover_stream():
+                return
             self.player.set_state(Gst.State.NULL)
             self._is_loading = False
             self._update_logical_state()
@@ -742,11 +881,336 @@ class Player(GObject.Object):
                 old, new, pending = message.parse_state_changed()
                 if new == Gst.State.PLAYING:
                     self._is_loading = False
+                    self._prepare_gapless()
                 self._update_logical_state()
         # BUFFERING messages are intentionally ignored — playbin manages
         # stream buffering internally and briefly pauses the pipeline,
         # which would cause the spinner to flash unnecessarily.
 
+    # ── Gapless playback ──────────────────────────────────────────────────────
+
+    def _prepare_gapless(self):
+        """
+        Picks the entry about-to-finish will hand to playbin. Runs on the main loop whenever the
+        current track starts, the queue or repeat mode changes, or a prefetch lands. Only
+        already-resolved URLs are used; anything else falls back to the EOS path.
+        """
+        prepared = None
+        idx = self.current_queue_index
+        if self.gapless_enabled and not self._is_loading and 0 <= idx < len(self.queue):
+            if self.repeat_mode == "track":
+                next_index = idx
+            else:
+                upcoming = self._upcoming_indices(1)
+                next_index = upcoming[0] if upcoming else -1
+            video_id = self.queue[next_index].video_id if next_index >= 0 else None
+            if video_id:
+                cached = self.downloads.get_local_stream(video_id) or self.stream_cache.get(
+                    video_id, self.ydl_opts["format"], self._auth_identity()
+                )
+                if cached:
+                    entry_id = self.queue.entry_id(next_index)
+                    with self._gapless_lock:
+                        previous = self._gapless_next
+                    if previous and previous[1] == entry_id and previous[2]["url"] == cached["url"]:
+                        # Same entry and URL: keep the proxy registration already made for it
+                        uri = previous[3]
+                    else:
+                        uri = self._playback_uri(video_id, cached)
+                    prepared = (next_index, entry_id, cached, uri)
+
+        with self._gapless_lock:
+            self._gapless_next = prepared
+        return False
+
+    def _clear_gapless(self):
+        with self._gapless_lock:
+            self._gapless_next = None
+            self._gapless_pending = None
+
+    def _on_about_to_finish(self, playbin):
+        """
+        Runs on a GStreamer streaming thread shortly before the current stream drains.
+        Takes the entry _prepare_gapless() left ready; setting the URI is the only work done here.
+        """
+        with self._gapless_lock:
+            prepared, self._gapless_next = self._gapless_next, None
+            self._gapless_pending = prepared
+        if prepared is None:
+            print("DEBUG: Gapless skipped, next track not resolved yet")
+            return
+        playbin.set_property("uri", prepared[3])
+        print(f"DEBUG: Gapless hand-over queued for queue position {prepared[0]}")
+
+    def _commit_gapless_transition(self, pending):
+        """Moves the logical queue position to the track playbin just switched to."""
+        next_index, entry_id, stream, uri = pending
+
+        # The queue may have been reordered since about-to-finish; follow the entry
+        if not (
+            0 <= next_index < len(self.queue)
+            and self.queue.entry_id(next_index) == entry_id
+        ):
+            next_index = self.queue.index_of(entry_id)
+            if next_index == -1:
+                return
+
+        track = self.queue[next_index]
+        video_id = track.video_id
+        self._set_current_stream(stream, uri)
+        self._announce_stream(video_id, stream)
+        self._fresh_stream = None
+        self._recovery_attempts = 0
+        self._last_position = 0.0
+
+        self.current_queue_index = next_index
+        self.current_video_id = video_id
+        # Invalidate any in-flight loads for the previous track
+        self.load_generation += 1
+        self.duration = -1
+        self.emit("progression", 0.0, 0.0)
+
+        print(f"Playing (gapless): {track.title} by {track.artist}")
+        self.emit(
+            "metadata-changed",
+            track.title,
+            track.artist,
+            track.thumb or "",
+            video_id,
+            track.like_status,
+        )
+        # The pipeline never left PLAYING, so this keeps the logical state stable
+        self._update_logical_state()
+        self.emit("state-changed", "queue-updated")
+
+        # Keep infinite queues topped up exactly like next() does
+        if self.queue_is_infinite and self.queue_source_id and self.client:
+            if (
+                not self._is_fetching_infinite
+                and self.current_queue_index >= len(self.queue) // 2
+            ):
+                self._start_infinite_fetch()
+
+    # ── Stream recovery ───────────────────────────────────────────────────────
+
+    def _set_current_stream(self, stream, uri):
+        """Remembers which stream URL the current track plays from."""
+        self.current_url = stream["url"]
+        # Only a signed URL that playbin opens itself can expire under it; the proxy refreshes its own
+        self._current_expires_at = stream.get("expires_at") if uri == stream["url"] else None
+
+    def _is_stream_error(self, err, debug):
+        """True for errors a freshly resolved URL can fix: HTTP failures, expiry, dropped connections."""
+        if not self.current_video_id or (self.current_url or "").startswith("file://"):
+            return False
+        if "resource" in str(getattr(err, "domain", "")).lower():
+            return True
+        text = f"{err} {debug}".lower()
+        return any(s in text for s in ("403", "410", "forbidden", "expired"))
+
+    def _recover_stream(self):
+        """
+        Re-resolves the current track, bypassing the stream cache, and resumes it where it stopped.
+        Returns False once the per-track attempts are used up.
+        """
+        if self._recovery_attempts >= MAX_RECOVERY_ATTEMPTS:
+            print("DEBUG: Giving up on stream recovery")
+            return False
+        self._recovery_attempts += 1
+
+        video_id = self.current_video_id
+        failed_url = self.current_url
+        position = self._last_position
+        _, state, pending = self.player.get_state(0)
+        playing = Gst.State.PLAYING in (state, pending) or (
+            self._current_logical_state == "playing"
+        )
+        print(
+            f"DEBUG: Stream for {video_id} failed, re-resolving (attempt {self._recovery_attempts}) "
+            f"to resume at {position:.1f}s"
+        )
+
+        self.player.set_state(Gst.State.NULL)
+        self._clear_gapless()
+        self._is_loading = True
+        self._update_logical_state()
+        self.load_generation += 1
+        generation = self.load_generation
+
+        def on_resolved(vid, stream, error):
+            if generation != self.load_generation:
+                return
+            if error:
+                print(f"Error re-resolving {vid}: {error}")
+                GObject.idle_add(self._on_recovery_failed, generation)
+                return
+            uri = self._playback_uri(vid, stream)
+            self._set_current_stream(stream, uri)
+            self._announce_stream(vid, stream)
+            GObject.idle_add(self._resume_stream, uri, position, playing, generation)
+
+        fresh = self._fresh_stream
+        self._fresh_stream = None
+        if fresh and fresh[0] == video_id and fresh[1]["url"] != failed_url:
+            # Already refreshed ahead of expiry
+            on_resolved(video_id, fresh[1], None)
+        else:
+            self.resolver.submit(
+                video_id,
+                callback=on_resolved,
+                priority=PRIORITY_PLAYBACK,
+                supersede=True,
+                use_cache=False,
+            )
+        return True
+
+    def _resume_stream(self, uri, position, playing, generation):
+        if generation != self.load_generation:
+            return False
+        # Preroll paused; the seek and the switch to PLAYING follow on ASYNC_DONE
+        self._pending_resume = (position, playing)
+        self.player.set_state(Gst.State.NULL)
+        self.player.set_property("uri", uri)
+        self.player.set_state(Gst.State.PAUSED)
+        return False
+
+    def _apply_pending_resume(self):
+        position, playing = self._pending_resume
+        self._pending_resume = None
+        if position > 1.0:
+            self.seek(position)
+        if playing:
+            self.player.set_state(Gst.State.PLAYING)
+        else:
+            self._is_loading = False
+        self._update_logical_state()
+
+    def _on_recovery_failed(self, generation):
+        if generation == self.load_generation:
+            self.player.set_state(Gst.State.NULL)
+            self._is_loading = False
+            self._update_logical_state()
+        return False
+
+    def _check_stream_expiry(self):
+        """Re-resolves the current track shortly before its signed URL expires."""
+        expires_at = self._current_expires_at
+        if (
+            expires_at
+            and not self._is_loading
+            and self._fresh_stream is None
+            and expires_at - time.time() < REFRESH_BEFORE_EXPIRY
+        ):
+            video_id = self.current_video_id
+            generation = self.load_generation
+            print(f"DEBUG: Stream URL for {video_id} expires soon, refreshing")
+
+            def on_refreshed(vid, stream, error):
+                if error:
+                    print(f"Error refreshing {vid}: {error}")
+                    return
+                GObject.idle_add(self._on_stream_refreshed, vid, stream, generation)
+
+            # Not superseding: this must not cancel a playback resolution. Its own priority
+            # class keeps _schedule_prefetch's cancel_priority(PRIORITY_PREFETCH) off it
+            self.resolver.submit(
+                video_id,
+                callback=on_refreshed,
+                priority=PRIORITY_REFRESH,
+                use_cache=False,
+            )
+        return True
+
+    def _on_stream_refreshed(self, video_id, stream, generation):
+        if generation != self.load_generation or video_id != self.current_video_id:
+            return False
+        _, state, _ = self.player.get_state(0)
+        if state == Gst.State.PAUSED and not self._is_loading:
+            # Nothing is streaming, so swap the URL now instead of failing on resume
+            uri = self._playback_uri(video_id, stream)
+            self._set_current_stream(stream, uri)
+            self.load_generation += 1
+            self._is_loading = True
+            self._update_logical_state()
+            self._resume_stream(uri, self._last_position, False, self.load_generation)
+        else:
+            # An open connection keeps working; the fresh URL is used if it drops
+            self._fresh_stream = (video_id, stream)
+            self._current_expires_at = None
+        return False
+
+    # ── Session persistence ───────────────────────────────────────────────────
+
+    def _snapshot_session(self):
+        return pack_session(self, self._last_position)
+
+    def _on_session_position_timer(self):
+        if self._current_logical_state == "playing":
+            self.session.mark_dirty()
+        return True
+
+    def _restore_session(self, data):
+        """Puts the saved queue back, paused on the saved track and position."""
+        if self.queue or self.current_video_id:
+            # The user started something while the session was loading
+            return False
+        queue = unpack_queue(data)
+        index = data.get("index", -1)
+        if not (0 <= index < len(queue)):
+            return False
+
+        self.queue = queue
+        self.current_queue_index = index
+        self.shuffle_mode = bool(data.get("shuffle"))
+        self.repeat_mode = data.get("repeat") or "none"
+        self.queue_source_id = data.get("source_id")
+        self.queue_is_infinite = bool(data.get("infinite"))
+        self._last_position = float(data.get("position") or 0.0)
+        self._restore_pending = True
+
+        track = queue[index]
+        video_id = track.video_id
+        self.current_video_id = video_id
+        print(
+            f"Restored session: {len(queue)} tracks, {track.title} at {self._last_position:.0f}s"
+        )
+        self.emit(
+            "metadata-changed",
+            track.title,
+            track.artist,
+            track.thumb or "",
+            video_id,
+            track.like_status,
+        )
+        self.emit("progression", self._last_position, 0.0)
+        self.emit("state-changed", "queue-updated")
+        self.emit("state-changed", "repeat-updated")
+
+        # Resolve now so pressing play starts within a second
+        generation = self.load_generation
+        self.resolver.submit(
+            video_id,
+            callback=lambda vid, stream, error: self._on_prefetched(
+                vid, error, generation
+            ),
+            priority=PRIORITY_PLAYBACK,
+        )
+        return False
+
+    def _resume_restored_track(self):
+        self._restore_pending = False
+        if not (0 <= self.current_queue_index < len(self.queue)):
+            return
+        track = self.queue[self.current_queue_index]
+        self._load_internal(
+            track.video_id,
+            track.title,
+            track.artist,
+            track.thumb,
+            track.like_status,
+            start_at=self._last_position,
+        )
+
     def get_state_string(self):
         """Returns the current logical player state."""
         return self._current_logical_state
@@ -778,6 +1242,7 @@ class Player(GObject.Object):
             success_pos, pos_nanos = self.player.query_position(Gst.Format.TIME)
             if success_pos:
                 current_time = pos_nanos / Gst.SECOND
+                self._last_position = current_time
 
                 # Update the Adapter's cache immediately
                 if hasattr(self, "mpris_adapter"):
@@ -0,0 +1,83 @@
+from urllib.parse import urlparse, parse_qs
+
+# Stream quality profiles. "abr_cap" is the highest average audio bitrate (kbps) the profile
+# asks yt-dlp for; the selector falls back to whatever exists when nothing is under the cap.
+QUALITY_PROFILES = {
+    "data-saver": {
+        "label": "Data Saver",
+        "description": "Lowest bitrate, about 50 kbps",
+        "abr_cap": 64,
+        "format": "bestaudio[abr<=64]/worstaudio/worst",
+    },
+    "normal": {
+        "label": "Normal",
+        "description": "Up to 128–160 kbps",
+        "abr_cap": 160,
+        "format": "bestaudio[abr<=160]/bestaudio/best",
+    },
+    "high": {
+        "label": "High",
+        "description": "Best available audio",
+        "abr_cap": None,
+        "format": "bestaudio/best",
+    },
+}
+DEFAULT_PROFILE = "high"
+
+# Audio itags served by googlevideo
+_ITAG_CODECS = {
+    "139": "AAC",
+    "140": "AAC",
+    "141": "AAC",
+    "249": "Opus",
+    "250": "Opus",
+    "251": "Opus",
+}
+
+
+def format_for_profile(name):
+    """Returns the yt-dlp format selector of a profile, falling back to the default one."""
+    profile = QUALITY_PROFILES.get(name) or QUALITY_PROFILES[DEFAULT_PROFILE]
+    return profile["format"]
+
+
+def stream_info(url):
+    """
+    Reads itag, codec and average bitrate (kbps) from a googlevideo URL.
+    The bitrate is derived from the clen= and dur= parameters, so cached URLs need no extra lookup.
+    """
+    info = {"itag": None, "codec": None, "kbps": None}
+    if not url or url.startswith("file://"):
+        return info
+    try:
+        params = parse_qs(urlparse(url).query)
+    except ValueError:
+        return info
+
+    itag = (params.get("itag") or [None])[0]
+    info["itag"] = itag
+    mime = (params.get("mime") or [""])[0]
+    info["codec"] = _ITAG_CODECS.get(itag) or (mime.split("/")[-1].upper() or None)
+    try:
+        clen = int(params["clen"][0])
+        dur = float(params["dur"][0])
+        if dur > 0:
+            info["kbps"] = round(clen * 8 / dur / 1000)
+    except (KeyError, IndexError, ValueError):
+        pass
+    return info
+
+
+def describe_stream(url):
+    """Short label for the UI, e.g. 'Opus · 134 kbps · itag 251'."""
+    if url and url.startswith("file://"):
+        return "Downloaded"
+    info = stream_info(url)
+    parts = []
+    if info["codec"]:
+        parts.append(info["codec"])
+    if info["kbps"]:
+        parts.append(f"{info['kbps']} kbps")
+    if info["itag"]:
+        parts.append(f"itag {info['itag']}")
+    return " · ".join(parts)
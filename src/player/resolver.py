@@ -0,0 +1,176 @@
+import heapq
+import itertools
+import threading
+
+# Lower values run first
+PRIORITY_PLAYBACK = 0
+# Re-resolving the playing track ahead of expiry; its own class so prefetch replans don't cancel it
+PRIORITY_REFRESH = 5
+PRIORITY_PREFETCH = 10
+
+
+class ResolveJob:
+    __slots__ = ("video_id", "priority", "use_cache", "callbacks", "state", "entry", "error")
+
+    def __init__(self, video_id, priority, use_cache):
+        self.video_id = video_id
+        self.priority = priority
+        self.use_cache = use_cache
+        self.callbacks = []
+        self.state = "queued"  # queued, running, done, cancelled
+        self.entry = None
+        self.error = None
+
+
+class StreamResolver:
+    """
+    Bounded worker pool for stream resolution.
+
+    Jobs are de-duplicated per videoId, so a track that is already being prefetched
+    is not extracted twice. A use_cache=False request only joins a job that will also bypass
+    the cache: queued jobs are upgraded, a running cache-backed job gets a fresh one next to it. Playback requests can supersede everything still queued,
+    which keeps rapid skipping down to the jobs that are actually running.
+    Callbacks are invoked on the worker thread as callback(video_id, entry, error);
+    resolve() is the blocking form for callers that already run on a thread of their own.
+    """
+
+    def __init__(self, resolve_func, workers=2):
+        self._resolve = resolve_func
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}  # videoId -> queued or running job
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "cancelled": 0, "deduplicated": 0}
+
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"StreamResolver-{i}"
+            )
+            thread.daemon = True
+            thread.start()
+
+    def submit(
+        self,
+        video_id,
+        callback=None,
+        priority=PRIORITY_PLAYBACK,
+        supersede=False,
+        use_cache=True,
+    ):
+        """Queues a resolution. With supersede=True every other queued job is cancelled first."""
+        with self._cond:
+            if supersede:
+                self._cancel_queued(lambda job: job.video_id != video_id)
+                # Running jobs can't be interrupted, but nobody is waiting on them anymore
+                for job in self._jobs.values():
+                    if job.video_id != video_id and job.priority == PRIORITY_PLAYBACK:
+                        job.callbacks.clear()
+
+            job = self._jobs.get(video_id)
+            if job is not None and job.state == "running" and job.use_cache and not use_cache:
+                # A cache-backed run may hand back the very URL the caller found expired;
+                # let it finish for its own callers and start a fresh job alongside it
+                job = None
+            if job is not None:
+                self._stats["deduplicated"] += 1
+                if callback:
+                    job.callbacks.append(callback)
+                if job.state == "queued":
+                    if not use_cache:
+                        job.use_cache = False
+                    if priority < job.priority:
+                        # Re-push with the better priority; the old heap entry is skipped
+                        job.priority = priority
+                        heapq.heappush(self._heap, (priority, next(self._seq), job))
+                        self._cond.notify()
+                return job
+
+            job = ResolveJob(video_id, priority, use_cache)
+            if callback:
+                job.callbacks.append(callback)
+            self._jobs[video_id] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+            return job
+
+    def resolve(self, video_id, priority=PRIORITY_PLAYBACK, use_cache=True, timeout=None):
+        """Submits a job and waits for it; returns its entry or raises its error. Never call from a worker."""
+        job = self.submit(video_id, priority=priority, use_cache=use_cache)
+        with self._cond:
+            # Waits on the job state, not a callback, since superseding clears callbacks
+            finished = self._cond.wait_for(
+                lambda: job.state in ("done", "cancelled"), timeout
+            )
+        if not finished:
+            raise TimeoutError(f"resolving {video_id} timed out")
+        if job.state == "cancelled":
+            raise RuntimeError(f"resolving {video_id} was cancelled")
+        if job.error:
+            raise job.error
+        return job.entry
+
+    def cancel_priority(self, priority):
+        """Cancels all queued jobs of one priority class (e.g. a stale prefetch plan)."""
+        with self._cond:
+            self._cancel_queued(lambda job: job.priority == priority)
+
+    def get_metrics(self):
+        """Returns counters for queued, running, completed, failed, cancelled and de-duplicated jobs."""
+        with self._cond:
+            metrics = dict(self._stats)
+            metrics["queued"] = sum(
+                1 for job in self._jobs.values() if job.state == "queued"
+            )
+            metrics["running"] = self._running
+            return metrics
+
+    def _cancel_queued(self, predicate):
+        """Must be called with the lock held."""
+        cancelled = False
+        for video_id, job in list(self._jobs.items()):
+            if job.state == "queued" and predicate(job):
+                job.state = "cancelled"
+                job.callbacks.clear()
+                del self._jobs[video_id]
+                self._stats["cancelled"] += 1
+                cancelled = True
+        if cancelled:
+            # Wakes blocking resolve() callers; idle workers just go back to waiting
+            self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = None
+                while job is None:
+                    while not self._heap:
+                        self._cond.wait()
+                    priority, _, candidate = heapq.heappop(self._heap)
+                    # Skip cancelled jobs and stale entries left behind by priority bumps
+                    if candidate.state == "queued" and candidate.priority == priority:
+                        job = candidate
+                job.state = "running"
+                self._running += 1
+
+            entry, error = None, None
+            try:
+                entry = self._resolve(job.video_id, use_cache=job.use_cache)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                job.entry, job.error = entry, error
+                job.state = "done"
+                self._running -= 1
+                if self._jobs.get(job.video_id) is job:
+                    del self._jobs[job.video_id]
+                self._stats["failed" if error else "completed"] += 1
+                callbacks = list(job.callbacks)
+                self._cond.notify_all()
+
+            for callback in callbacks:
+                try:
+                    callback(job.video_id, entry, error)
+                except Exception as e:
+                    print(f"Stream resolver callback failed: {e}")
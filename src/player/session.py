@@ -0,0 +1,131 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from gi.repository import GObject
+
+from player.track import Track
+from player.play_queue import PlayQueue
+
+SESSION_VERSION = 2
+# Changes are written at most this often
+SAVE_DELAY_MS = 2000
+# While playing, the position is snapshotted this often
+POSITION_INTERVAL = 15
+# Track attributes stored per row, in Track() argument order
+TRACK_FIELDS = (
+    "video_id",
+    "title",
+    "artist",
+    "thumb",
+    "like_status",
+    "artist_id",
+    "album",
+    "album_id",
+    "duration_seconds",
+)
+
+
+class SessionStore:
+    """
+    Persists the player's queue, position and modes to data/session.json.
+
+    Saves are debounced: mark_dirty() only arms a timer, the snapshot is taken on the main loop
+    and written from a worker thread. Tracks are stored as a compact table of
+    TRACK_FIELDS rows in canonical order, plus the shuffle permutation as a list of row indices.
+    """
+
+    def __init__(self, snapshot_func):
+        self.path = os.path.join(os.getcwd(), "data", "session.json")
+        self._snapshot = snapshot_func
+        self._timer_id = None
+        self._write_lock = threading.Lock()
+        atexit.register(self.save_now)
+
+    def mark_dirty(self):
+        if self._timer_id is None:
+            self._timer_id = GObject.timeout_add(SAVE_DELAY_MS, self._on_timer)
+
+    def _on_timer(self):
+        self._timer_id = None
+        try:
+            data = self._snapshot()
+        except Exception as e:
+            print(f"Error snapshotting session: {e}")
+            return False
+        thread = threading.Thread(target=self._write, args=(data,))
+        thread.daemon = True
+        thread.start()
+        return False
+
+    def save_now(self):
+        """Synchronous save, used on exit."""
+        if self._timer_id is not None:
+            GObject.source_remove(self._timer_id)
+            self._timer_id = None
+        try:
+            self._write(self._snapshot())
+        except Exception as e:
+            print(f"Error saving session: {e}")
+
+    def _write(self, data):
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Error writing session: {e}")
+
+    def load_async(self, callback):
+        """Reads the saved session off the main thread, then calls callback(data) on the main loop."""
+
+        def job():
+            data = self.load()
+            if data:
+                GObject.idle_add(callback, data)
+
+        thread = threading.Thread(target=job, name="SessionLoad")
+        thread.daemon = True
+        thread.start()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading session: {e}")
+            return None
+        if data.get("version") != SESSION_VERSION:
+            return None
+        return data
+
+
+def pack_session(player, position):
+    """Builds the compact snapshot of player's queue state."""
+    tracks, order = player.queue.snapshot()
+    return {
+        "version": SESSION_VERSION,
+        "saved_at": time.time(),
+        "tracks": [[getattr(t, name) for name in TRACK_FIELDS] for t in tracks],
+        "order": order,
+        "index": player.current_queue_index,
+        "video_id": player.current_video_id,
+        "position": round(position, 1),
+        "shuffle": player.shuffle_mode,
+        "repeat": player.repeat_mode,
+        "source_id": player.queue_source_id,
+        "infinite": player.queue_is_infinite,
+    }
+
+
+def unpack_queue(data):
+    """Rebuilds the PlayQueue saved by pack_session."""
+    tracks = [Track(*row[: len(TRACK_FIELDS)]) for row in data.get("tracks", [])]
+    return PlayQueue.restore(tracks, data.get("order"))
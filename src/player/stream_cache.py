@@ -0,0 +1,180 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+
+# Never hand out a URL this close to its expiry; playbin needs time to open it
+EXPIRY_MARGIN = 120
+# Fallback lifetime for stream URLs that carry no expire= parameter
+DEFAULT_TTL = 3 * 3600
+# How often the background sweeper drops expired rows
+EVICT_INTERVAL = 15 * 60
+
+
+def parse_expire(url):
+    """Returns the unix timestamp from a googlevideo `expire=` parameter, or None."""
+    if not url:
+        return None
+    try:
+        parsed = urlparse(url)
+        values = parse_qs(parsed.query).get("expire")
+        if values:
+            return int(values[0])
+        # Some manifest-style URLs carry parameters as path segments: /expire/1700000000/
+        match = re.search(r"/expire/(\d+)", parsed.path)
+        if match:
+            return int(match.group(1))
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+class StreamCache:
+    """Persistent cache of resolved stream URLs keyed by (videoId, format, auth identity)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.getcwd(), "data", "stream_cache.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory = {}  # Hot copy of the rows we have touched this session
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS streams (
+                video_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                auth TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                uploader TEXT,
+                thumbnail TEXT,
+                expires_at INTEGER NOT NULL,
+                stored_at INTEGER NOT NULL,
+                PRIMARY KEY (video_id, format, auth)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS streams_expiry ON streams (expires_at)"
+        )
+        self._conn.commit()
+
+        self._evict_thread = threading.Thread(target=self._evict_loop)
+        self._evict_thread.daemon = True
+        self._evict_thread.start()
+
+    def get(self, video_id, fmt, auth):
+        """Returns a cached entry dict if it is still valid, otherwise None."""
+        key = (video_id, fmt, auth)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT url, title, uploader, thumbnail, expires_at FROM streams "
+                    "WHERE video_id = ? AND format = ? AND auth = ?",
+                    key,
+                ).fetchone()
+                if row:
+                    entry = {
+                        "url": row[0],
+                        "title": row[1],
+                        "uploader": row[2],
+                        "thumbnail": row[3],
+                        "expires_at": row[4],
+                    }
+                    self._memory[key] = entry
+
+        if entry is None:
+            return None
+        if entry["expires_at"] - EXPIRY_MARGIN <= now:
+            self.invalidate(video_id, fmt, auth)
+            return None
+        return entry
+
+    def put(self, video_id, fmt, auth, url, title=None, uploader=None, thumbnail=None):
+        expires_at = parse_expire(url) or int(time.time()) + DEFAULT_TTL
+        entry = {
+            "url": url,
+            "title": title,
+            "uploader": uploader,
+            "thumbnail": thumbnail,
+            "expires_at": expires_at,
+        }
+        with self._lock:
+            self._memory[(video_id, fmt, auth)] = entry
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO streams VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        video_id,
+                        fmt,
+                        auth,
+                        url,
+                        title,
+                        uploader,
+                        thumbnail,
+                        expires_at,
+                        int(time.time()),
+                    ),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Stream cache write failed: {e}")
+        return entry
+
+    def invalidate(self, video_id, fmt=None, auth=None):
+        """Drops cached URLs for a videoId (optionally only one format/auth pair)."""
+        with self._lock:
+            for key in list(self._memory):
+                if key[0] != video_id:
+                    continue
+                if fmt is not None and key[1] != fmt:
+                    continue
+                if auth is not None and key[2] != auth:
+                    continue
+                del self._memory[key]
+
+            query = "DELETE FROM streams WHERE video_id = ?"
+            params = [video_id]
+            if fmt is not None:
+                query += " AND format = ?"
+                params.append(fmt)
+            if auth is not None:
+                query += " AND auth = ?"
+                params.append(auth)
+            try:
+                self._conn.execute(query, params)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Stream cache invalidate failed: {e}")
+
+    def evict_expired(self):
+        now = int(time.time())
+        with self._lock:
+            for key, entry in list(self._memory.items()):
+                if entry["expires_at"] - EXPIRY_MARGIN <= now:
+                    del self._memory[key]
+            try:
+                cur = self._conn.execute(
+                    "DELETE FROM streams WHERE expires_at - ? <= ?",
+                    (EXPIRY_MARGIN, now),
+                )
+                self._conn.commit()
+                removed = cur.rowcount
+            except sqlite3.Error as e:
+                print(f"Stream cache eviction failed: {e}")
+                return 0
+        if removed:
+            print(f"Stream cache: evicted {removed} expired URLs")
+        return removed
+
+    def _evict_loop(self):
+        while True:
+            self.evict_expired()
+            time.sleep(EVICT_INTERVAL)
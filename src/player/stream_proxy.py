@@ -0,0 +1,344 @@
+import asyncio
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from player.stream_cache import parse_expire
+
+# Upstream is read in ranges of this size; googlevideo throttles long open-ended reads
+CHUNK_SIZE = 1024 * 1024
+# Ranges fetched ahead of what playbin has consumed
+READ_AHEAD = 2
+# Refresh a URL this close to its expiry before using it again
+REFRESH_MARGIN = 60
+REQUEST_TIMEOUT = 20
+# Only recently requested or handed out streams are ever requested again
+MAX_STREAMS = 32
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class _TeeWriter:
+    """Feeds a CacheWriter from its own thread, so the event loop never blocks on disk."""
+
+    def __init__(self, cache, video_id, fmt):
+        self._queue = queue.Queue()
+        self._failed = False
+        thread = threading.Thread(
+            target=self._run, args=(cache, video_id, fmt), name="StreamProxyTee"
+        )
+        thread.daemon = True
+        thread.start()
+
+    def write(self, data):
+        # After a disk error nothing reads the queue; don't let it grow with the track
+        if not self._failed:
+            self._queue.put(("write", data))
+
+    def finish(self, size):
+        self._queue.put(("finish", size))
+
+    def abort(self):
+        self._queue.put(("abort", None))
+
+    def _run(self, cache, video_id, fmt):
+        writer = None
+        try:
+            writer = cache.begin(video_id, fmt)
+            while True:
+                op, arg = self._queue.get()
+                if op == "write":
+                    writer.write(arg)
+                    continue
+                if op == "finish":
+                    writer.finish(arg)
+                else:
+                    writer.abort()
+                return
+        except Exception as e:
+            self._failed = True
+            print(f"Stream proxy: caching {video_id} failed: {e}")
+            if writer:
+                writer.abort()
+
+
+class _Stream:
+    __slots__ = ("video_id", "fmt", "url", "size", "content_type", "lock")
+
+    def __init__(self, video_id, fmt, url):
+        self.video_id = video_id
+        self.fmt = fmt
+        self.url = url
+        self.size = None  # Learned from the first Content-Range
+        self.content_type = None
+        self.lock = threading.Lock()  # Serializes re-resolution
+
+
+class StreamProxy:
+    """
+    In-process HTTP proxy between playbin and googlevideo.
+
+    An asyncio server on 127.0.0.1 answers playbin's (ranged) requests by reading the upstream
+    in CHUNK_SIZE ranges, READ_AHEAD ranges ahead, over pooled keep-alive connections.
+    When the upstream URL expires mid-track (403/410, or close to expire=), the track is
+    re-resolved through refresh(video_id), which must bypass the stream cache, and the read
+    continues at the same offset, so playbin never sees the failure.
+    Full reads from byte 0 are teed into the AudioCache, on a writer thread, while
+    cache_enabled() is true.
+    """
+
+    def __init__(self, refresh, cache=None, cache_enabled=None):
+        self._refresh_entry = refresh
+        self.cache = cache
+        self._cache_enabled = cache_enabled or (lambda: False)
+        self._streams = OrderedDict()  # token -> _Stream
+        self._lock = threading.Lock()
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=READ_AHEAD + 4)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Blocking upstream reads run here so the event loop only shuffles bytes
+        self._executor = ThreadPoolExecutor(
+            max_workers=READ_AHEAD + 2, thread_name_prefix="StreamProxyFetch"
+        )
+
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        thread = threading.Thread(target=self._run, name="StreamProxy")
+        thread.daemon = True
+        thread.start()
+        self._ready.wait(5)
+        if self.port is None:
+            raise RuntimeError("stream proxy failed to start")
+        print(f"Stream proxy listening on port {self.port}")
+
+    def register(self, video_id, fmt, url):
+        """Returns a local URL for playbin that serves url as the stream of (video_id, fmt)."""
+        token = uuid.uuid4().hex
+        with self._lock:
+            while len(self._streams) >= MAX_STREAMS:
+                self._streams.popitem(last=False)
+            self._streams[token] = _Stream(video_id, fmt, url)
+        return f"http://127.0.0.1:{self.port}/stream/{token}"
+
+    # ── Server ────────────────────────────────────────────────────────────────
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            server = self._loop.run_until_complete(
+                asyncio.start_server(self._serve, "127.0.0.1", 0)
+            )
+            self.port = server.sockets[0].getsockname()[1]
+        except Exception as e:
+            print(f"Stream proxy could not listen: {e}")
+            return
+        finally:
+            self._ready.set()
+        self._loop.run_forever()
+
+    async def _serve(self, reader, writer):
+        # One connection may carry many requests (playbin keeps it alive across seeks)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 2:
+                    break
+                method, path = parts[0], parts[1]
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = await self._handle(method, path, headers, writer)
+                if not keep_alive or headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # playbin dropped the connection (seek, skip or stop)
+        except Exception as e:
+            print(f"Stream proxy: connection failed: {e}")
+        finally:
+            writer.close()
+
+    async def _handle(self, method, path, headers, writer):
+        token = path.split("?", 1)[0].rsplit("/", 1)[-1]
+        with self._lock:
+            stream = self._streams.get(token)
+            if stream is not None:
+                # Every request counts as use, so the stream playbin is reading is never the oldest
+                self._streams.move_to_end(token)
+        if method not in ("GET", "HEAD"):
+            await self._send_head(writer, 405, "Method Not Allowed", {"Content-Length": "0"})
+            return True
+        if stream is None:
+            await self._send_head(writer, 404, "Not Found", {"Content-Length": "0"})
+            return True
+
+        start, end = self._parse_range(headers.get("range"))
+        ranged = start is not None
+        start = start or 0
+
+        # The first range also tells us the total size, so no separate probe is needed
+        try:
+            first = await self._fetch(stream, start, self._chunk_end(start, end))
+        except Exception as e:
+            print(f"Stream proxy: upstream failed for {stream.video_id}: {e}")
+            await self._send_head(writer, 502, "Bad Gateway", {"Content-Length": "0"})
+            return False
+
+        size = stream.size
+        if size is not None and start >= size:
+            await self._send_head(
+                writer,
+                416,
+                "Range Not Satisfiable",
+                {"Content-Range": f"bytes */{size}", "Content-Length": "0"},
+            )
+            return True
+        if end is None or (size is not None and end >= size):
+            end = size - 1 if size is not None else start + len(first) - 1
+
+        response_headers = {
+            "Content-Type": stream.content_type or "application/octet-stream",
+            "Content-Length": str(end - start + 1),
+            "Accept-Ranges": "bytes",
+        }
+        if ranged:
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{size or '*'}"
+            await self._send_head(writer, 206, "Partial Content", response_headers)
+        else:
+            await self._send_head(writer, 200, "OK", response_headers)
+        if method == "HEAD":
+            return True
+
+        # Only a read of the whole file can produce a complete cached copy
+        tee = None
+        if self.cache and self._cache_enabled() and start == 0 and end == (size or 0) - 1:
+            tee = _TeeWriter(self.cache, stream.video_id, stream.fmt)
+
+        pending = []
+        pos = start + len(first)
+        data = first[: end - start + 1]
+        try:
+            while True:
+                # Keep READ_AHEAD ranges in flight while playbin consumes this one
+                while len(pending) < READ_AHEAD and pos <= end:
+                    chunk_end = self._chunk_end(pos, end)
+                    pending.append(asyncio.ensure_future(self._fetch(stream, pos, chunk_end)))
+                    pos = chunk_end + 1
+
+                writer.write(data)
+                await writer.drain()
+                if tee:
+                    tee.write(data)
+
+                if not pending:
+                    break
+                data = await pending.pop(0)
+                if not data:
+                    raise UpstreamError("upstream returned an empty range")
+
+            if tee:
+                tee.finish(size)
+                tee = None
+            return True
+        except ConnectionError:
+            return False
+        except Exception as e:
+            # Headers are already out; closing is the only way left to signal the failure
+            print(f"Stream proxy: read of {stream.video_id} failed: {e}")
+            return False
+        finally:
+            for future in pending:
+                future.cancel()
+            if tee:
+                tee.abort()
+
+    async def _send_head(self, writer, status, reason, headers):
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    def _parse_range(self, value):
+        """Parses 'bytes=a-b' / 'bytes=a-' into (start, end or None). Suffix ranges are unsupported."""
+        if not value or not value.startswith("bytes="):
+            return None, None
+        first, _, last = value[6:].split(",", 1)[0].strip().partition("-")
+        try:
+            start = int(first) if first else None
+            end = int(last) if last else None
+        except ValueError:
+            return None, None
+        if start is None:
+            return None, None
+        return start, end
+
+    def _chunk_end(self, start, end):
+        chunk_end = start + CHUNK_SIZE - 1
+        return chunk_end if end is None else min(chunk_end, end)
+
+    # ── Upstream ──────────────────────────────────────────────────────────────
+
+    async def _fetch(self, stream, start, end):
+        return await self._loop.run_in_executor(
+            self._executor, self._fetch_range, stream, start, end
+        )
+
+    def _fetch_range(self, stream, start, end):
+        for attempt in range(2):
+            url = stream.url
+            expire = parse_expire(url)
+            if expire and expire - time.time() < REFRESH_MARGIN:
+                url = self._refresh(stream, url)
+
+            response = self._session.get(
+                url, headers={"Range": f"bytes={start}-{end}"}, timeout=REQUEST_TIMEOUT
+            )
+            if response.status_code in (403, 410) and attempt == 0:
+                # Expired or revoked mid-track: resolve again and retry the same range
+                print(f"Stream proxy: upstream URL for {stream.video_id} expired, re-resolving")
+                self._refresh(stream, url)
+                continue
+            if response.status_code == 416:
+                return b""
+            if response.status_code not in (200, 206):
+                raise UpstreamError(f"HTTP {response.status_code}")
+
+            content_range = response.headers.get("Content-Range", "")
+            total = content_range.rsplit("/", 1)[-1] if "/" in content_range else ""
+            if total.isdigit():
+                stream.size = int(total)
+            elif response.status_code == 200:
+                # Server ignored the range and sent the whole file
+                stream.size = len(response.content)
+                return response.content[start : end + 1]
+            if not stream.content_type:
+                stream.content_type = response.headers.get("Content-Type")
+            return response.content
+        raise UpstreamError("upstream URL still rejected after re-resolving")
+
+    def _refresh(self, stream, stale_url):
+        """Swaps in a freshly resolved URL, once per expiry even with several ranges in flight."""
+        with stream.lock:
+            if stream.url == stale_url:
+                entry = self._refresh_entry(stream.video_id)
+                stream.url = entry["url"]
+            return stream.url
@@ -0,0 +1,120 @@
+import sys
+
+
+def _parse_duration(text):
+    """'3:45' / '1:02:03' -> seconds, or None."""
+    if not text or not isinstance(text, str):
+        return None
+    seconds = 0
+    try:
+        for part in text.split(":"):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def _intern(value):
+    # Artist and album names repeat a lot in long queues; share one string per name
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Track:
+    """
+    A normalised queue entry.
+
+    Built once when a track is enqueued, so the player, MPRIS and the queue views read plain
+    attributes instead of re-normalising ytmusicapi dicts (nested artists, thumbnail lists,
+    album objects) on every access.
+    """
+
+    __slots__ = (
+        "video_id",
+        "title",
+        "artist",
+        "artist_id",
+        "album",
+        "album_id",
+        "thumb",
+        "duration_seconds",
+        "like_status",
+        "set_video_id",
+    )
+
+    def __init__(
+        self,
+        video_id,
+        title="Unknown",
+        artist="Unknown",
+        thumb=None,
+        like_status="INDIFFERENT",
+        artist_id=None,
+        album=None,
+        album_id=None,
+        duration_seconds=None,
+        set_video_id=None,
+    ):
+        self.video_id = video_id
+        self.title = title or "Unknown"
+        self.artist = _intern(artist or "Unknown")
+        self.artist_id = artist_id
+        self.album = _intern(album)
+        self.album_id = album_id
+        self.thumb = thumb
+        self.duration_seconds = duration_seconds
+        self.like_status = like_status or "INDIFFERENT"
+        self.set_video_id = set_video_id
+
+    @classmethod
+    def from_dict(cls, data):
+        """Normalises a ytmusicapi track dict (or one of our own {videoId, title, artist, thumb} dicts)."""
+        if isinstance(data, Track):
+            return data
+
+        artist = data.get("artist")
+        artist_id = None
+        artists = artist if isinstance(artist, list) else data.get("artists")
+        if isinstance(artists, list) and artists:
+            if not isinstance(artist, str) or not artist:
+                artist = ", ".join(a.get("name", "") for a in artists if a.get("name"))
+            artist_id = artists[0].get("id")
+        elif isinstance(artists, str) and not artist:
+            artist = artists
+
+        thumb = data.get("thumb")
+        if not thumb:
+            thumbs = data.get("thumbnails") or data.get("thumbnail")
+            if isinstance(thumbs, dict):
+                thumbs = thumbs.get("thumbnails")
+            if isinstance(thumbs, list) and thumbs:
+                thumb = thumbs[-1].get("url")
+            elif isinstance(thumbs, str):
+                thumb = thumbs
+
+        album = data.get("album")
+        album_id = None
+        if isinstance(album, dict):
+            album_id = album.get("id")
+            album = album.get("name")
+        elif not isinstance(album, str):
+            album = None
+
+        duration = data.get("duration_seconds")
+        if not isinstance(duration, int):
+            duration = _parse_duration(data.get("duration"))
+
+        return cls(
+            data.get("videoId"),
+            title=data.get("title"),
+            artist=artist if isinstance(artist, str) else None,
+            thumb=thumb,
+            like_status=data.get("likeStatus"),
+            artist_id=artist_id,
+            album=album,
+            album_id=album_id,
+            duration_seconds=duration,
+            set_video_id=data.get("setVideoId"),
+        )
+
+    def __repr__(self):
+        return f"Track({self.video_id!r}, {self.title!r}, {self.artist!r})"
@@ -0,0 +1,224 @@
+import atexit
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from yt_dlp import YoutubeDL
+
+
+def create_cookie_file(headers):
+    """Creates a temporary Netscape format cookie file from headers."""
+    cookie_str = headers.get("Cookie", "")
+    if not cookie_str:
+        return None
+
+    fd, path = tempfile.mkstemp(suffix=".txt", text=True)
+    with os.fdopen(fd, "w") as f:
+        f.write("# Netscape HTTP Cookie File\n")
+        f.write("# This file is generated by Mixtapes\n\n")
+
+        now = int(time.time()) + 3600 * 24 * 365  # 1 year validity
+
+        # Simple parsing of "key=value; key2=value2"
+        parts = cookie_str.split(";")
+        for part in parts:
+            if "=" in part:
+                key, value = part.strip().split("=", 1)
+                # domain flag path secure expiration name value
+                f.write(f".youtube.com\tTRUE\t/\tTRUE\t{now}\t{key}\t{value}\n")
+                f.write(f".google.com\tTRUE\t/\tTRUE\t{now}\t{key}\t{value}\n")
+
+    return path
+
+
+class YoutubeDLPool:
+    """
+    A small pool of warm YoutubeDL instances for the current auth state.
+    Extractors and the JS runtime are initialised once per instance instead of once per track,
+    and the cookie file is written once per login. Safe to use from worker threads.
+
+    Every instance keeps reading and writing the cookie file it was built with until it is
+    closed, so a login change only retires the old file; it is deleted once the last instance
+    built with it has been closed.
+    """
+
+    def __init__(self, base_opts, size=2):
+        self.base_opts = dict(base_opts)
+        self.size = size
+
+        self._cond = threading.Condition()
+        self._auth_key = None
+        self._generation = 0  # Bumped whenever auth or options change
+        self._cookie_file = None
+        self._http_headers = None  # User-Agent/Authorization of the current login
+        self._idle = []
+        self._created = 0
+        self._instance_cookies = {}  # id(ydl) -> cookie file it was built with
+        self._cookie_refs = {}  # cookie file -> live instances built with it
+        self._retired_cookies = set()  # Replaced cookie files still used by some instance
+
+        atexit.register(self.close)
+
+    @contextmanager
+    def acquire(self, auth_key, headers=None):
+        """Checks out a YoutubeDL for auth_key. headers are only read when the login changed."""
+        ydl, generation = self._checkout(auth_key, headers)
+        try:
+            yield ydl
+        finally:
+            self._checkin(ydl, generation)
+
+    def set_options(self, base_opts):
+        """Replaces the base yt-dlp options; warm instances are rebuilt lazily."""
+        with self._cond:
+            self.base_opts = dict(base_opts)
+            self._reset(self._auth_key, None, keep_cookies=True)
+
+    def invalidate(self):
+        """Drops all instances and the cookie jar, e.g. after logout."""
+        with self._cond:
+            self._reset(None, None)
+
+    def close(self):
+        self.invalidate()
+        # Exiting: instances still checked out won't get to use their files anyway
+        with self._cond:
+            for path in list(self._retired_cookies):
+                self._delete_cookie_file(path)
+            self._retired_cookies.clear()
+
+    def _checkout(self, auth_key, headers):
+        with self._cond:
+            if auth_key != self._auth_key:
+                self._reset(auth_key, headers)
+
+            while not self._idle and self._created >= self.size:
+                self._cond.wait()
+                # Auth may have changed while we were waiting
+                if auth_key != self._auth_key:
+                    self._reset(auth_key, headers)
+
+            generation = self._generation
+            if self._idle:
+                ydl = self._idle.pop()
+                return ydl, generation
+
+            # Reserve a slot, then build outside the lock (construction is slow)
+            self._created += 1
+            cookie_file = self._cookie_file
+            if cookie_file:
+                self._cookie_refs[cookie_file] = self._cookie_refs.get(cookie_file, 0) + 1
+            opts = self._build_opts(headers)
+
+        try:
+            ydl = YoutubeDL(opts)
+        except Exception:
+            with self._cond:
+                if generation == self._generation:
+                    self._created -= 1
+                self._release_cookie_file(cookie_file)
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._instance_cookies[id(ydl)] = cookie_file
+        print(f"DEBUG: Warmed new YoutubeDL instance (generation {generation})")
+        return ydl, generation
+
+    def _checkin(self, ydl, generation):
+        with self._cond:
+            if generation == self._generation:
+                self._idle.append(ydl)
+                self._cond.notify()
+                return
+        # Built for an old login/options set: retire it
+        self._close_instance(ydl)
+
+    def _build_opts(self, headers):
+        opts = dict(self.base_opts)
+        if self._cookie_file:
+            opts["cookiefile"] = self._cookie_file
+
+        if headers:
+            # Still pass User-Agent and Authorization if available
+            http_headers = {}
+            if "User-Agent" in headers:
+                http_headers["User-Agent"] = headers["User-Agent"]
+            if "Authorization" in headers:
+                print("DEBUG: Passing Authorization header to yt-dlp")
+                http_headers["Authorization"] = headers["Authorization"]
+            if http_headers:
+                opts["http_headers"] = http_headers
+            self._http_headers = http_headers
+        elif self._http_headers:
+            opts["http_headers"] = self._http_headers
+        return opts
+
+    def _reset(self, auth_key, headers, keep_cookies=False):
+        """Must be called with the lock held."""
+        self._generation += 1
+        stale = self._idle
+        self._idle = []
+        self._created = 0
+
+        # Close idle instances first: close() saves the cookie jar, which must not
+        # recreate a file that has just been retired
+        for ydl in stale:
+            self._close_instance(ydl)
+
+        if not keep_cookies:
+            self._retire_cookie_file()
+            self._http_headers = None
+            self._auth_key = auth_key
+            if headers:
+                self._cookie_file = create_cookie_file(headers)
+                if self._cookie_file:
+                    print(f"DEBUG: Generated cookie file at {self._cookie_file}")
+                else:
+                    print("DEBUG: No cookie file generated (Cookie header missing?)")
+                # Remember auth-only headers for instances built after this reset
+                self._build_opts(headers)
+
+        self._cond.notify_all()
+
+    def _retire_cookie_file(self):
+        """Must be called with the lock held."""
+        path, self._cookie_file = self._cookie_file, None
+        if not path:
+            return
+        if self._cookie_refs.get(path):
+            # Checked-out instances still extract with it; deleted when the last one is closed
+            self._retired_cookies.add(path)
+        else:
+            self._delete_cookie_file(path)
+
+    def _release_cookie_file(self, path):
+        """Must be called with the lock held."""
+        if not path:
+            return
+        refs = self._cookie_refs.get(path, 0) - 1
+        if refs > 0:
+            self._cookie_refs[path] = refs
+            return
+        self._cookie_refs.pop(path, None)
+        if path in self._retired_cookies:
+            self._retired_cookies.discard(path)
+            self._delete_cookie_file(path)
+
+    def _delete_cookie_file(self, path):
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+                print(f"DEBUG: Cleaned up cookie file {path}")
+            except OSError:
+                pass
+
+    def _close_instance(self, ydl):
+        try:
+            ydl.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._release_cookie_file(self._instance_cookies.pop(id(ydl), None))
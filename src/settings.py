@@ -0,0 +1,65 @@
+import os
+import json
+import threading
+
+DEFAULTS = {
+    # Tee streamed audio into a local cache so replays come from disk
+    "audio_cache_enabled": False,
+    "audio_cache_max_mb": 1024,
+    # Stream quality profile, see player.quality.QUALITY_PROFILES
+    "audio_quality": "high",
+}
+
+
+class Settings:
+    """App preferences persisted to data/settings.json."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Settings, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        self.path = os.path.join(os.getcwd(), "data", "settings.json")
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._values = dict(DEFAULTS)
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self._values.update(json.load(f))
+            except Exception as e:
+                print(f"Error loading settings: {e}")
+
+    def get(self, key):
+        with self._lock:
+            return self._values.get(key, DEFAULTS.get(key))
+
+    def set(self, key, value):
+        with self._lock:
+            if self._values.get(key) == value:
+                return
+            self._values[key] = value
+            self._save_locked()
+        for callback in list(self._listeners):
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"Settings listener failed: {e}")
+
+    def connect(self, callback):
+        """Registers callback(key, value), called after a setting changed."""
+        self._listeners.append(callback)
+
+    def _save_locked(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._values, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving settings: {e}")
@@ -130,15 +130,18 @@ class ExpandedPlayer(Gtk.Box):
         self.pos_label.add_css_class("caption")
         self.pos_label.add_css_class("numeric")
 
-        dur_spacer = Gtk.Box()
-        dur_spacer.set_hexpand(True)
-
         self.dur_label = Gtk.Label(label="0:00")
         self.dur_label.add_css_class("caption")
         self.dur_label.add_css_class("numeric")
 
+        # Codec, bitrate and itag of the current stream
+        self.stream_label = Gtk.Label(label=self.player.stream_info)
+        self.stream_label.add_css_class("caption")
+        self.stream_label.add_css_class("dim-label")
+        self.stream_label.set_hexpand(True)
+
         timings_box.append(self.pos_label)
-        timings_box.append(dur_spacer)
+        timings_box.append(self.stream_label)
         timings_box.append(self.dur_label)
         progress_box.append(timings_box)
         main_box.append(progress_box)
@@ -257,6 +260,7 @@ class ExpandedPlayer(Gtk.Box):
         self.player.connect("progression", self.on_progression)
         self.player.connect("state-changed", self.on_state_changed)
         self.player.connect("volume-changed", self.on_volume_changed)
+        self.player.connect("stream-info-changed", self.on_stream_info_changed)
 
         # Initial state sync
         self.on_state_changed(self.player, self.player.get_state_string())
@@ -295,16 +299,14 @@ class ExpandedPlayer(Gtk.Box):
         # Preload neighbor covers and sync queue
         self._sync_carousel_queue()
 
+    def on_stream_info_changed(self, player, info):
+        self.stream_label.set_label(info)
+
     def _get_track_thumb(self, index):
         """Get a thumbnail URL for a track at the given queue index."""
         if index < 0 or index >= len(self.player.queue):
             return None
-        track = self.player.queue[index]
-        thumb = track.get("thumb")
-        if not thumb and "thumbnails" in track:
-            thumbs = track.get("thumbnails", [])
-            if thumbs:
-                thumb = thumbs[-1]["url"]
+        thumb = self.player.queue[index].thumb
         if thumb:
             return thumb.replace("w120-h120", "w640-h640").replace(
                 "sddefault", "maxresdefault"
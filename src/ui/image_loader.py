@@ -0,0 +1,291 @@
+import heapq
+import itertools
+import math
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+from gi.repository import Gdk, GdkPixbuf
+from ui.thumbnail_cache import ThumbnailCache
+
+# Lower values run first
+PRIORITY_VISIBLE = 0
+PRIORITY_BACKGROUND = 10
+
+# Decoded images, downscaled to at most SOURCE_MAX_DIM, shared by every widget size
+SOURCE_BUDGET_BYTES = 96 * 1024 * 1024
+SOURCE_MAX_DIM = 800
+# Paint-ready textures, one per (url, width, height, mode)
+TEXTURE_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+# Size tokens understood by the Google image servers (lh3.googleusercontent.com, yt3.ggpht.com)
+_SIZE_TOKEN = re.compile(r"=w\d+-h\d+")
+_SQUARE_TOKEN = re.compile(r"=s\d+")
+
+
+def sized_url(url, size):
+    """Rewrites the =wNNN-hNNN / =sNNN token of a Google image URL so the server sends size=(w, h)."""
+    if not url or not size:
+        return url
+    host = urlparse(url).netloc
+    if not (host.endswith("googleusercontent.com") or host.endswith("ggpht.com")):
+        return url
+    w, h = size
+    if _SIZE_TOKEN.search(url):
+        return _SIZE_TOKEN.sub(f"=w{w}-h{h}", url, count=1)
+    if _SQUARE_TOKEN.search(url):
+        return _SQUARE_TOKEN.sub(f"=s{max(w, h)}", url, count=1)
+    return url
+
+
+def decode_pixbuf(data, size=None):
+    """
+    Decodes image bytes, letting the decoder itself downsample.
+    With size=(w, h) the result just covers w×h; otherwise it fits within SOURCE_MAX_DIM.
+    """
+    loader = GdkPixbuf.PixbufLoader()
+
+    def on_size_prepared(loader, width, height):
+        if width <= 0 or height <= 0:
+            return
+        if size:
+            scale = max(size[0] / width, size[1] / height)
+        else:
+            scale = SOURCE_MAX_DIM / max(width, height)
+        if scale < 1:
+            loader.set_size(
+                max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))
+            )
+
+    loader.connect("size-prepared", on_size_prepared)
+    loader.write(data)
+    loader.close()
+    pixbuf = loader.get_pixbuf()
+    if pixbuf is None:
+        raise ValueError("could not decode image")
+    return pixbuf
+
+
+class _ByteLRU:
+    """Thread-safe LRU bounded by the total size of its values, with hit/miss counters."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old:
+                self.size -= old[1]
+            self._items[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.budget and len(self._items) > 1:
+                _, (_, freed) = self._items.popitem(last=False)
+                self.size -= freed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ImageCache:
+    """
+    Two-level image cache.
+    Sources are decoded pixbufs keyed by URL and decode size; variants are Gdk.Textures keyed by URL plus
+    target size, so rebinding a recycled row paints straight from memory without rescaling
+    or uploading a new texture.
+    """
+
+    def __init__(self):
+        self.sources = _ByteLRU(SOURCE_BUDGET_BYTES)
+        self.textures = _ByteLRU(TEXTURE_BUDGET_BYTES)
+
+    def get_source(self, key):
+        return self.sources.get(key)
+
+    def put_source(self, key, pixbuf):
+        """Stores a decoded image and returns the (possibly downscaled) copy that was cached."""
+        w = pixbuf.get_width()
+        h = pixbuf.get_height()
+        if w > SOURCE_MAX_DIM or h > SOURCE_MAX_DIM:
+            scale = SOURCE_MAX_DIM / max(w, h)
+            pixbuf = pixbuf.scale_simple(
+                max(1, int(w * scale)),
+                max(1, int(h * scale)),
+                GdkPixbuf.InterpType.BILINEAR,
+            )
+        self.sources.put(key, pixbuf, pixbuf.get_rowstride() * pixbuf.get_height())
+        return pixbuf
+
+    def get_texture(self, key):
+        return self.textures.get(key)
+
+    def put_texture(self, key, pixbuf):
+        """Uploads pixbuf as a texture for key and returns it."""
+        texture = Gdk.Texture.new_for_pixbuf(pixbuf)
+        self.textures.put(key, texture, pixbuf.get_width() * pixbuf.get_height() * 4)
+        return texture
+
+    def stats(self):
+        return {"sources": self.sources.stats(), "textures": self.textures.stats()}
+
+
+IMAGE_CACHE = ImageCache()
+
+
+class ImageRequest:
+    """Handle for one widget's interest in a URL. Cancelled requests never get a callback."""
+
+    __slots__ = ("url", "size", "callback", "cancelled")
+
+    def __init__(self, url, size, callback):
+        self.url = url
+        self.size = size
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class _ImageJob:
+    __slots__ = ("url", "size", "priority", "requests", "state")
+
+    def __init__(self, url, size, priority):
+        self.url = url
+        self.size = size
+        self.priority = priority
+        self.requests = []
+        self.state = "queued"  # queued, running, cancelled
+
+
+class ImageLoader:
+    """
+    Shared, bounded pool for loading cover art.
+
+    Requests for the same URL and size are coalesced into one download and decode. Within a priority,
+    the newest request runs first, so after a fast scroll the rows now on screen load before
+    the ones that were flung past (and those are usually cancelled by unbind anyway).
+    Callbacks run on the worker thread as callback(url, pixbuf, error).
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ImageLoader, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self, workers=4):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}  # (url, size) -> queued or running job
+
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"ImageLoader-{i}")
+            thread.daemon = True
+            thread.start()
+
+    def request(self, url, callback, priority=PRIORITY_BACKGROUND, size=None):
+        """size=(w, h) asks for an image that just covers w×h; None means full size."""
+        req = ImageRequest(url, size, callback)
+        with self._cond:
+            job = self._jobs.get((url, size))
+            if job is None:
+                job = _ImageJob(url, size, priority)
+                self._jobs[(url, size)] = job
+                self._push(job)
+            elif job.state == "queued" and priority < job.priority:
+                job.priority = priority
+                self._push(job)
+            job.requests.append(req)
+        return req
+
+    def promote(self, req, priority=PRIORITY_VISIBLE):
+        """Raises the priority of a pending request, e.g. when its widget became visible."""
+        if req is None or req.cancelled:
+            return
+        with self._cond:
+            job = self._jobs.get((req.url, req.size))
+            if job and job.state == "queued" and priority < job.priority:
+                job.priority = priority
+                self._push(job)
+
+    def _push(self, job):
+        # Negated sequence: newest first within the same priority
+        heapq.heappush(self._heap, (job.priority, -next(self._seq), job))
+        self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = None
+                while job is None:
+                    while not self._heap:
+                        self._cond.wait()
+                    priority, _, candidate = heapq.heappop(self._heap)
+                    # Skip stale entries left behind by priority bumps
+                    if candidate.state != "queued" or candidate.priority != priority:
+                        continue
+                    if all(req.cancelled for req in candidate.requests):
+                        # Every widget that wanted this image was recycled
+                        candidate.state = "cancelled"
+                        key = (candidate.url, candidate.size)
+                        if self._jobs.get(key) is candidate:
+                            del self._jobs[key]
+                        continue
+                    job = candidate
+                job.state = "running"
+
+            pixbuf, error = None, None
+            try:
+                pixbuf = self._load(job.url, job.size)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                if self._jobs.get((job.url, job.size)) is job:
+                    del self._jobs[(job.url, job.size)]
+                requests = list(job.requests)
+
+            for req in requests:
+                if req.cancelled:
+                    continue
+                try:
+                    req.callback(job.url, pixbuf, error)
+                except Exception as e:
+                    print(f"Image callback failed for {job.url}: {e}")
+
+    def _load(self, url, size):
+        pixbuf = IMAGE_CACHE.get_source((url, size))
+        if pixbuf is not None:
+            return pixbuf
+
+        # Ask the server for the size we need, then decode straight to it.
+        # Image bytes come from the disk cache, downloading only on a miss.
+        data = ThumbnailCache().fetch(sized_url(url, size))
+        pixbuf = decode_pixbuf(data, size)
+        return IMAGE_CACHE.put_source((url, size), pixbuf)
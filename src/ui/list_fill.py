@@ -0,0 +1,108 @@
+import time
+from gi.repository import GLib
+
+# Time spent building rows per main loop iteration, leaving the rest of a 60 Hz frame to GTK
+FRAME_BUDGET_MS = 8
+# Rows built between clock checks
+CHECK_EVERY = 16
+
+
+class ListFiller:
+    """
+    Populates a Gio.ListStore in frame-sized chunks.
+
+    Rows are created by make_item(value) and spliced in one chunk per main loop iteration, each
+    chunk as large as fits in FRAME_BUDGET_MS. The first chunk goes in synchronously so the
+    top of the list shows up immediately; the rest follow from a low-priority idle that runs
+    after GTK has drawn the frame. replace() swaps the old rows for the first chunk in a
+    single splice, so the list never flashes empty.
+    """
+
+    def __init__(self, store, budget_ms=FRAME_BUDGET_MS):
+        self.store = store
+        self.budget = budget_ms / 1000
+        self._segments = []  # [values, next position, make_item] still to insert
+        self._callbacks = []
+        self._source_id = None
+
+    @property
+    def busy(self):
+        return bool(self._segments)
+
+    @property
+    def n_items(self):
+        """Rows in the store once pending work is done."""
+        pending = sum(len(values) - pos for values, pos, _ in self._segments)
+        return self.store.get_n_items() + pending
+
+    def replace(self, values, make_item, on_done=None):
+        """Replaces every row of the store with make_item(v) for each value."""
+        self.cancel()
+        self._segments.append([list(values), 0, make_item])
+        if on_done:
+            self._callbacks.append(on_done)
+        self.store.splice(0, self.store.get_n_items(), self._build_chunk())
+        self._schedule()
+
+    def append(self, values, make_item, on_done=None):
+        """Appends make_item(v) for each value, after anything still pending."""
+        values = list(values)
+        if on_done:
+            self._callbacks.append(on_done)
+        if values:
+            self._segments.append([values, 0, make_item])
+        if self._source_id is None:
+            self._step()
+            self._schedule()
+
+    def cancel(self):
+        """Drops pending rows; rows already in the store stay."""
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        self._segments = []
+        self._callbacks = []
+
+    def clear(self):
+        self.cancel()
+        self.store.remove_all()
+
+    def _build_chunk(self):
+        chunk = []
+        deadline = time.monotonic() + self.budget
+        while self._segments:
+            segment = self._segments[0]
+            values, pos, make_item = segment
+            end = min(pos + CHECK_EVERY, len(values))
+            chunk.extend(make_item(v) for v in values[pos:end])
+            segment[1] = end
+            if end >= len(values):
+                self._segments.pop(0)
+            if time.monotonic() >= deadline:
+                break
+        return chunk
+
+    def _schedule(self):
+        if self._segments and self._source_id is None:
+            self._source_id = GLib.idle_add(self._on_idle, priority=GLib.PRIORITY_LOW)
+        elif not self._segments:
+            self._finish()
+
+    def _on_idle(self):
+        if self._step():
+            return True
+        self._source_id = None
+        self._finish()
+        return False
+
+    def _step(self):
+        """Inserts one chunk; returns whether more is pending."""
+        chunk = self._build_chunk()
+        if chunk:
+            self.store.splice(self.store.get_n_items(), 0, chunk)
+        return bool(self._segments)
+
+    def _finish(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
@@ -3,6 +3,8 @@ from gi.repository import GObject
 
 gi.require_version("Gtk", "4.0")
 
+from player.track import Track
+
 
 class SongItem(GObject.Object):
     __gtype_name__ = "SongItem"
@@ -73,25 +75,23 @@ class SongItem(GObject.Object):
 
     def __init__(self, track_data, index):
         super().__init__()
+        self.rebind(track_data, index)
+
+    def rebind(self, track_data, index):
+        """Points this item at another track; used when a list model recycles it."""
         self.track_data = track_data
         self.index = index
 
-        self._title = track_data.get("title", "Unknown")
-        artist_list = track_data.get("artists", [])
-        if isinstance(artist_list, list):
-            self._artist = ", ".join([a.get("name", "") for a in artist_list])
-        else:
-            self._artist = track_data.get("artist", "Unknown")
+        # Normalised once; also what gets handed to the player's queue
+        self.track = Track.from_dict(track_data)
+        track = self.track
 
-        # Album
-        album_data = track_data.get("album")
-        if isinstance(album_data, dict):
-             self._album = album_data.get("name", "")
-        else:
-             self._album = str(album_data or "")
+        self._title = track.title
+        self._artist = track.artist
+        self._album = track.album or ""
 
         # Duration
-        dur_sec = track_data.get("duration_seconds")
+        dur_sec = track.duration_seconds
         if dur_sec:
             m = dur_sec // 60
             s = dur_sec % 60
@@ -99,13 +99,7 @@ class SongItem(GObject.Object):
         else:
             self._duration = track_data.get("duration", "")
 
-        # Thumbnail
-        thumbnails = track_data.get("thumbnails", [])
-        if thumbnails:
-            self._thumbnail_url = thumbnails[-1]["url"]
-        else:
-            self._thumbnail_url = track_data.get("thumb")
-
-        self._video_id = track_data.get("videoId")
-        self._like_status = track_data.get("likeStatus", "INDIFFERENT")
+        self._thumbnail_url = track.thumb
+        self._video_id = track.video_id
+        self._like_status = track.like_status
         self._is_playing = False
@@ -0,0 +1,148 @@
+import sys
+import weakref
+from collections import OrderedDict
+
+from gi.repository import GObject, Gio
+
+# Item objects kept alive per model; about ten screens of rows
+CACHE_SIZE = 256
+# Evicted items kept around for reuse
+POOL_SIZE = 64
+
+
+class TrackListModel(GObject.Object, Gio.ListModel):
+    """
+    A Gio.ListModel over a plain list of track values.
+
+    The list holds whatever the page already has (track dicts); item objects are only built
+    when GTK asks for a position, via make_item(value, position), and kept in a small LRU cache
+    so a scrolling view and its selection see the same object per row. When an item falls out of
+    the cache and nothing but the model still references it, rebind_item(item, value, position)
+    turns it into the item for another row instead of allocating a new one. Memory and
+    construction time therefore follow the rows on screen, not the length of the playlist.
+
+    "Nothing but the model" is checked as item.__grefcount__ == 1 (no GTK widget, filter or
+    selection model holds the GObject) and sys.getrefcount(item) <= 3 (no Python code holds
+    the wrapper beyond the three references _release itself accounts for). GTK and Python hold
+    items through different counts, so both must be checked. An item that fails either check
+    is simply dropped, never reused.
+
+    Items that fell out of the cache while something still holds them stay reachable per
+    position through a weak map, so get_item() hands out the same object again and
+    live_items() reaches every row GTK has, e.g. all rows a filter or sort model pulled.
+
+    Values are only ever replaced through splice()-style calls, which emit one items-changed.
+    """
+
+    __gtype_name__ = "TrackListModel"
+
+    def __init__(self, item_type, make_item, rebind_item=None, cache_size=CACHE_SIZE):
+        super().__init__()
+        self._item_type = item_type
+        self._make_item = make_item
+        self._rebind_item = rebind_item
+        self._cache_size = cache_size
+        self._values = []
+        self._cache = OrderedDict()  # position -> item
+        self._live = weakref.WeakValueDictionary()  # position -> every item still referenced
+        self._pool = []
+
+    # ── Gio.ListModel ─────────────────────────────────────────────────────────
+
+    def do_get_item_type(self):
+        return self._item_type.__gtype__
+
+    def do_get_n_items(self):
+        return len(self._values)
+
+    def do_get_item(self, position):
+        if position >= len(self._values):
+            return None
+        item = self._cache.get(position)
+        if item is not None:
+            self._cache.move_to_end(position)
+            return item
+
+        item = self._live.get(position)
+        if item is None:
+            value = self._values[position]
+            if self._pool:
+                item = self._pool.pop()
+                self._rebind_item(item, value, position)
+            else:
+                item = self._make_item(value, position)
+            self._live[position] = item
+        self._cache[position] = item
+        if len(self._cache) > self._cache_size:
+            old_position, old = self._cache.popitem(last=False)
+            self._release(old_position, old)
+        return item
+
+    def _release(self, position, item):
+        # Reusable only if GTK holds no reference (ours is the only GObject ref) and
+        # nothing in Python kept it either: 'old' in the caller, 'item' here and getrefcount's argument
+        if (
+            self._rebind_item is not None
+            and len(self._pool) < POOL_SIZE
+            and item.__grefcount__ == 1
+            and sys.getrefcount(item) <= 3
+        ):
+            # About to become another row's item
+            self._live.pop(position, None)
+            self._pool.append(item)
+
+    # ── Values ────────────────────────────────────────────────────────────────
+
+    def __len__(self):
+        return len(self._values)
+
+    def get_value(self, position):
+        return self._values[position]
+
+    @property
+    def values(self):
+        """The backing list. Read-only: mutate through splice/append/replace."""
+        return self._values
+
+    def live_items(self):
+        """Items that currently exist, cached or held by GTK, for updating row state without building the rest."""
+        return list(self._live.values())
+
+    def splice(self, position, n_removed, values):
+        values = list(values)
+        n_removed = max(0, min(n_removed, len(self._values) - position))
+        self._values[position : position + n_removed] = values
+        self._shift_cache(position, n_removed, len(values))
+        if n_removed or values:
+            self.items_changed(position, n_removed, len(values))
+
+    def append(self, values):
+        self.splice(len(self._values), 0, values)
+
+    def replace(self, values):
+        self.splice(0, len(self._values), values)
+
+    def remove_all(self):
+        self.splice(0, len(self._values), [])
+
+    def _shift_cache(self, position, n_removed, n_added):
+        live = dict(self._live.items())
+        if not live:
+            return
+        if position > max(live):
+            # Appending past every existing row: nothing moves
+            return
+        delta = n_added - n_removed
+        cache = OrderedDict()
+        for pos, item in self._cache.items():
+            if pos < position:
+                cache[pos] = item
+            elif pos >= position + n_removed:
+                cache[pos + delta] = item
+        # Items of removed rows are dropped; GTK releases its own references
+        self._cache = cache
+        self._live = weakref.WeakValueDictionary(
+            (pos if pos < position else pos + delta, item)
+            for pos, item in live.items()
+            if pos < position or pos >= position + n_removed
+        )
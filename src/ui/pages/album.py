@@ -3,12 +3,21 @@ import threading
 import re
 from ui.pages.base_playlist import BasePlaylistPage
 from ui.models.song import SongItem
+from ui.utils import listen_for_refreshes
 
 
 class AlbumPage(BasePlaylistPage):
     def __init__(self, player, *args, **kwargs):
         super().__init__(player, *args, **kwargs)
         self.sort_row.set_visible(False)  # Albums have fixed order
+        listen_for_refreshes(self, self.client, self._on_cache_refreshed)
+
+    def _on_cache_refreshed(self, endpoint, resource, data):
+        # A stale cached album was shown; re-read it (now fresh) from the cache
+        if endpoint == "get_album" and resource == self.playlist_id:
+            thread = threading.Thread(target=self._fetch_details)
+            thread.daemon = True
+            thread.start()
 
     def load_album(self, album_id, initial_data=None):
         if self.playlist_id != album_id:
@@ -1,7 +1,7 @@
 from gi.repository import Gtk, Adw, GObject, GLib, Pango, Gdk, Gio
 import threading
 from api.client import MusicClient
-from ui.utils import AsyncImage, AsyncPicture, LikeButton
+from ui.utils import AsyncImage, AsyncPicture, LikeButton, listen_for_refreshes
 
 class ArtistPage(Adw.Bin):
     __gsignals__ = {
@@ -16,6 +16,7 @@ class ArtistPage(Adw.Bin):
         self.channel_id = None
         self.artist_name = ""
         self.current_songs = []
+        listen_for_refreshes(self, self.client, self._on_cache_refreshed)
         
         # Main Layout
         self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
@@ -201,6 +202,15 @@ class ArtistPage(Adw.Bin):
         except Exception as e:
             print(f"Error fetching artist: {e}")
 
+    def _on_cache_refreshed(self, endpoint, resource, data):
+        # A stale cached artist was shown; swap in the fresh response
+        if endpoint == "get_artist" and resource == self.channel_id:
+            GObject.idle_add(self._apply_refresh, resource, data)
+
+    def _apply_refresh(self, channel_id, data):
+        if channel_id == self.channel_id:
+            self.update_ui(data)
+
     def update_ui(self, data):
         if not data:
             return
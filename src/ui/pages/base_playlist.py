@@ -4,7 +4,10 @@ import re
 from api.client import MusicClient
 from ui.utils import AsyncImage, LikeButton
 from ui.models.song import SongItem
+from player.track import Track
 from ui.widgets.song_row import SongRowWidget
+from ui.search_index import SearchIndex, FILTER_CHANGES
+from ui.models.track_list import TrackListModel
 
 
 class BasePlaylistPage(Adw.Bin):
@@ -148,13 +151,16 @@ class BasePlaylistPage(Adw.Bin):
         track_section.append(sort_row)
 
         # ListView Setup
-        self.store = Gio.ListStore(item_type=SongItem)
+        # Holds the track dicts; SongItems only exist for rows the view asks for
+        self.store = TrackListModel(SongItem, self._make_song_item, self._rebind_song_item)
         self.filter_model = Gtk.FilterListModel(model=self.store)
+        # Attached only while searching, so browsing never builds an item per row
         self.custom_filter = Gtk.CustomFilter.new(self._filter_func)
-        self.filter_model.set_filter(self.custom_filter)
+        self.filter_model.set_incremental(True)
 
         self.sort_model = Gtk.SortListModel(model=self.filter_model)
-        # We'll set the sorter in subclasses or on sort change
+        # Orders matches by relevance while a query is active; no sorter otherwise
+        self.relevance_sorter = Gtk.CustomSorter.new(self._relevance_sort_func)
         
         self.selection_model = Gtk.SingleSelection(model=self.sort_model)
         self.selection_model.set_autoselect(False)
@@ -162,6 +168,7 @@ class BasePlaylistPage(Adw.Bin):
         factory = Gtk.SignalListItemFactory()
         factory.connect("setup", self._on_factory_setup)
         factory.connect("bind", self._on_factory_bind)
+        factory.connect("unbind", self._on_factory_unbind)
 
         self.songs_view = Gtk.ListView(model=self.selection_model, factory=factory)
         self.songs_view.add_css_class("boxed-list")
@@ -213,6 +220,8 @@ class BasePlaylistPage(Adw.Bin):
         self.original_tracks = []
         self.is_loading_more = False
         self.current_filter_text = ""
+        self.search_index = SearchIndex()
+        self._filter_ranks = None  # Key -> relevance rank for current_filter_text, None when not filtering
         self.is_fully_loaded = False
         self.is_fully_fetched = False
         self._is_background_fetching = False
@@ -229,15 +238,50 @@ class BasePlaylistPage(Adw.Bin):
         item = list_item.get_item()
         widget.bind(item, self)
 
+    def _on_factory_unbind(self, factory, list_item):
+        list_item.get_child().unbind()
+
     def _filter_func(self, item):
-        if not self.current_filter_text:
+        if self._filter_ranks is None:
             return True
-        text = self.current_filter_text.lower()
-        return text in item.title.lower() or text in item.artist.lower()
+        t = item.track_data
+        if self.search_index.is_indexed(t):
+            return self.search_index.key(t) in self._filter_ranks
+        return self.search_index.matches_unindexed(t, self.current_filter_text)
+
+    def _relevance_sort_func(self, a, b):
+        ranks = self._filter_ranks or {}
+        ra = ranks.get(self.search_index.key(a.track_data), len(ranks))
+        rb = ranks.get(self.search_index.key(b.track_data), len(ranks))
+        if ra < rb:
+            return Gtk.Ordering.SMALLER
+        if ra > rb:
+            return Gtk.Ordering.LARGER
+        return Gtk.Ordering.EQUAL
 
     def filter_content(self, text):
         self.current_filter_text = text.strip()
-        self.custom_filter.changed(Gtk.FilterChange.DIFFERENT)
+        self.search_index.search_async(self.current_filter_text, self._on_search_results)
+
+    def _on_search_results(self, ranks, change):
+        self._filter_ranks = ranks
+        if ranks is None:
+            self.filter_model.set_filter(None)
+        elif self.filter_model.get_filter() is None:
+            self.filter_model.set_filter(self.custom_filter)
+        else:
+            self.custom_filter.changed(FILTER_CHANGES[change])
+        if ranks is None:
+            self.sort_model.set_sorter(None)
+        elif self.sort_model.get_sorter() is None:
+            self.sort_model.set_sorter(self.relevance_sorter)
+        else:
+            self.relevance_sorter.changed(Gtk.SorterChange.DIFFERENT)
+
+    def _on_tracks_indexed(self):
+        if self._filter_ranks is not None:
+            self.filter_content(self.current_filter_text)
+        return False
 
     def _on_scroll(self, vadjust):
         val = vadjust.get_value()
@@ -288,61 +332,64 @@ class BasePlaylistPage(Adw.Bin):
             self.cover_img.load_url(thumbnails[-1]["url"])
 
         # Update Store
-        new_items = []
         start_idx = len(self.current_tracks) if append else 0
-        for i, t in enumerate(tracks[start_idx:]):
-            item = SongItem(t, start_idx + i)
-            # Check if playing
-            if self.player.current_video_id == item.video_id:
-                item.is_playing = True
-            new_items.append(item)
-
         if append:
-            self.store.splice(self.store.get_n_items(), 0, new_items)
+            self.store.append(tracks[start_idx:])
             self.current_tracks.extend(tracks[start_idx:])
         else:
-            self.store.splice(0, self.store.get_n_items(), new_items)
+            self.search_index.clear()
+            self.store.replace(tracks)
             self.current_tracks = list(tracks)
+        self.search_index.add(tracks[start_idx:], self._on_tracks_indexed)
 
     def _update_playing_indicator(self, *args):
         current_id = self.player.current_video_id
-        for i in range(self.store.get_n_items()):
-            item = self.store.get_item(i)
+        # Rows without an item yet pick the state up in _make_song_item
+        for item in self.store.live_items():
             is_playing = (item.video_id == current_id)
             if item.is_playing != is_playing:
                 item.is_playing = is_playing
 
+    def _make_song_item(self, track_data, position):
+        item = SongItem(track_data, position)
+        item.is_playing = self.player.current_video_id == item.video_id
+        return item
+
+    def _rebind_song_item(self, item, track_data, position):
+        item.rebind(track_data, position)
+        item.is_playing = self.player.current_video_id == item.video_id
+
     def on_song_activated(self, list_view, position):
         item = self.sort_model.get_item(position)
         if not item: return
         
         # Get tracks in current order (sorted & filtered)
-        tracks_to_queue = []
-        for i in range(self.sort_model.get_n_items()):
-             tracks_to_queue.append(self.sort_model.get_item(i).track_data)
-        
+        tracks_to_queue = self._visible_tracks()
+
         is_inf = self._is_infinite()
         self.player.set_queue(tracks_to_queue, position, source_id=self.playlist_id, is_infinite=is_inf)
 
+    def _visible_tracks(self):
+        if self._filter_ranks is None:
+            # Unfiltered: read the backing list instead of building an item per row
+            return [Track.from_dict(t) for t in self.store.values]
+        return [self.sort_model.get_item(i).track for i in range(self.sort_model.get_n_items())]
+
     def _is_infinite(self):
         return False
 
     def on_play_clicked(self, btn):
         if self.sort_model.get_n_items() == 0: return
         
-        tracks_to_queue = []
-        for i in range(self.sort_model.get_n_items()):
-             tracks_to_queue.append(self.sort_model.get_item(i).track_data)
-             
+        tracks_to_queue = self._visible_tracks()
+
         self.player.set_queue(tracks_to_queue, 0, source_id=self.playlist_id, is_infinite=self._is_infinite())
 
     def on_shuffle_clicked(self, btn):
         if self.sort_model.get_n_items() == 0: return
         
-        tracks_to_queue = []
-        for i in range(self.sort_model.get_n_items()):
-             tracks_to_queue.append(self.sort_model.get_item(i).track_data)
-             
+        tracks_to_queue = self._visible_tracks()
+
         self.player.set_queue(tracks_to_queue, -1, shuffle=True, source_id=self.playlist_id, is_infinite=self._is_infinite())
 
     def on_sort_changed(self, dropdown, pspec):
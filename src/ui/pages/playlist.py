@@ -2,10 +2,36 @@ import threading
 import re
 import os
 import tempfile
+import time
 from gi.repository import Gtk, Adw, GObject, GLib, Pango, Gdk, Gio, GdkPixbuf
 from api.client import MusicClient
-from ui.utils import AsyncImage, LikeButton
+from ui.utils import AsyncImage, LikeButton, listen_for_refreshes
 from ui.crop_dialog import ImageCropDialog
+from ui.search_index import SearchIndex, FILTER_CHANGES, normalize
+from ui.models.track_list import TrackListModel
+
+# A continuation page that fails this many times in a row is given up on
+MAX_PAGE_RETRIES = 3
+# Seconds before the first automatic retry, doubled per failure
+PAGE_RETRY_DELAY = 2
+
+
+def _sort_key(t):
+    """(title, first artist, album) of a track dict, normalised for sorting."""
+    artists = t.get("artists")
+    artist = artists[0].get("name", "") if isinstance(artists, list) and artists else ""
+    album = t.get("album")
+    if isinstance(album, dict):
+        album = album.get("name")
+    return normalize(t.get("title", "")), normalize(artist), normalize(album or "")
+
+
+# Sort dropdown index -> key built from a cached _sort_key() tuple
+_SORT_ORDERS = {
+    1: lambda k: k[0],
+    2: lambda k: (k[1], k[0]),
+    3: lambda k: (k[2], k[0]),
+}
 
 # ── GObject Models ────────────────────────────────────────────────────────────
 
@@ -24,6 +50,9 @@ class TrackItem(GObject.Object):
         super().__init__()
         self.data = data
 
+    def rebind(self, data: dict):
+        self.data = data
+
 
 # ── Page ──────────────────────────────────────────────────────────────────────
 
@@ -39,6 +68,7 @@ class PlaylistPage(Adw.Bin):
         self.connect("map", self._on_map)
         self.connect("unmap", self._on_unmap)
         self.client = MusicClient()
+        listen_for_refreshes(self, self.client, self._on_cache_refreshed)
         self.playlist_id = None
         self.playlist_title_text = ""
         self.playlist_description_text = ""
@@ -184,13 +214,25 @@ class PlaylistPage(Adw.Bin):
         self.header_store = Gio.ListStore(item_type=HeaderItem)
         self.header_store.append(HeaderItem())
 
-        self.track_store = Gio.ListStore(item_type=TrackItem)
+        # Holds the track dicts; TrackItems only exist for rows the view asks for
+        self.track_store = TrackListModel(
+            TrackItem,
+            lambda t, _pos: TrackItem(t),
+            lambda item, t, _pos: item.rebind(t),
+        )
         self.track_filter = Gtk.CustomFilter.new(self._track_filter_func, None)
-        self.filter_model = Gtk.FilterListModel.new(self.track_store, self.track_filter)
+        # The filter is only attached while searching; without one the model is passed through
+        # untouched instead of building an item per row to test it
+        self.filter_model = Gtk.FilterListModel.new(self.track_store, None)
+        # Refilter in slices across frames instead of all rows in one go
+        self.filter_model.set_incremental(True)
+        # Orders matches by relevance while a query is active; no sorter otherwise
+        self.relevance_sorter = Gtk.CustomSorter.new(self._relevance_sort_func, None)
+        self.sort_model = Gtk.SortListModel.new(self.filter_model, None)
 
         self.master_store = Gio.ListStore(item_type=Gio.ListModel)
         self.master_store.append(self.header_store)
-        self.master_store.append(self.filter_model)
+        self.master_store.append(self.sort_model)
 
         self.flatten_model = Gtk.FlattenListModel.new(self.master_store)
         self.selection_model = Gtk.SingleSelection.new(self.flatten_model)
@@ -242,6 +284,21 @@ class PlaylistPage(Adw.Bin):
         self.load_more_spinner.set_visible(False)
         self.main_box.append(self.load_more_spinner)
 
+        # Shown instead of the spinner once a page keeps failing
+        self.load_more_error = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.load_more_error.set_halign(Gtk.Align.CENTER)
+        self.load_more_error.set_margin_top(12)
+        self.load_more_error.set_margin_bottom(12)
+        error_label = Gtk.Label(label="Couldn't load more songs")
+        error_label.add_css_class("dim-label")
+        self.load_more_error.append(error_label)
+        retry_btn = Gtk.Button(label="Retry")
+        retry_btn.add_css_class("pill")
+        retry_btn.connect("clicked", self._on_page_retry_clicked)
+        self.load_more_error.append(retry_btn)
+        self.load_more_error.set_visible(False)
+        self.main_box.append(self.load_more_error)
+
         self.stack = Adw.ViewStack()
         loading_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
         loading_box.set_valign(Gtk.Align.CENTER)
@@ -259,8 +316,17 @@ class PlaylistPage(Adw.Bin):
 
         self.current_tracks = []
         self.current_limit = 50
+        self._continuation = None  # Token for the next page of a paged playlist
+        self._page_failures = 0  # Consecutive failures fetching the _continuation page
+        self._page_failed = False  # Gave up on the token; only the Retry button reloads
         self.is_loading_more = False
         self.current_filter_text = ""
+        self.search_index = SearchIndex()
+        self._filter_ranks = None  # Key -> relevance rank for current_filter_text, None when not filtering
+        # id(track) -> (track, _sort_key(track)), filled by the sort worker. Holding the track
+        # keeps its id from being reused by another dict while the entry exists
+        self._sort_keys = {}
+        self._sort_serial = 0  # Bumped per reorder so only the latest sort is applied
 
     # ── Factory callbacks ─────────────────────────────────────────────────────
 
@@ -375,6 +441,7 @@ class PlaylistPage(Adw.Bin):
         row = bin_widget._lv_track_ui
         row.set_title("")
         row.set_subtitle("")
+        row._lv_img.cancel_load()
         row._lv_img.set_from_icon_name("media-optical-symbolic")
         row._lv_img.url = None
         row._lv_dur_lbl.set_label("")
@@ -389,21 +456,56 @@ class PlaylistPage(Adw.Bin):
     # ── Filter ────────────────────────────────────────────────────────────────
 
     def _track_filter_func(self, item, _user_data):
-        if not self.current_filter_text:
+        if self._filter_ranks is None:
             return True
         t = item.data
-        title = t.get("title", "").lower()
-        artist = ", ".join(a.get("name", "") for a in t.get("artists", [])).lower()
-        return self.current_filter_text in title or self.current_filter_text in artist
+        if self.search_index.is_indexed(t):
+            return self.search_index.key(t) in self._filter_ranks
+        return self.search_index.matches_unindexed(t, self.current_filter_text)
+
+    def _relevance_sort_func(self, a, b, _user_data):
+        ranks = self._filter_ranks or {}
+        # Rows matched before their entry was indexed go last
+        ra = ranks.get(self.search_index.key(a.data), len(ranks))
+        rb = ranks.get(self.search_index.key(b.data), len(ranks))
+        if ra < rb:
+            return Gtk.Ordering.SMALLER
+        if ra > rb:
+            return Gtk.Ordering.LARGER
+        return Gtk.Ordering.EQUAL
 
     def filter_content(self, text):
-        self.current_filter_text = text.lower().strip()
-        self.track_filter.changed(Gtk.FilterChange.DIFFERENT)
+        self.current_filter_text = text.strip()
+        self.search_index.search_async(self.current_filter_text, self._on_search_results)
+
+    def _on_search_results(self, ranks, change):
+        self._filter_ranks = ranks
+        if ranks is None:
+            self.filter_model.set_filter(None)
+        elif self.filter_model.get_filter() is None:
+            self.filter_model.set_filter(self.track_filter)
+        else:
+            self.track_filter.changed(FILTER_CHANGES[change])
+        if ranks is None:
+            self.sort_model.set_sorter(None)
+        elif self.sort_model.get_sorter() is None:
+            self.sort_model.set_sorter(self.relevance_sorter)
+        else:
+            self.relevance_sorter.changed(Gtk.SorterChange.DIFFERENT)
+
+    def _index_tracks(self, tracks):
+        self.search_index.add(tracks, self._on_tracks_indexed)
+
+    def _on_tracks_indexed(self):
+        # Rows that matched only through the slow path are now in the index
+        if self._filter_ranks is not None:
+            self.filter_content(self.current_filter_text)
+        return False
 
     # ── Store helpers ─────────────────────────────────────────────────────────
 
-    def _add_track_row(self, t):
-        self.track_store.append(TrackItem(t))
+    def _add_track_rows(self, tracks):
+        self.track_store.append(tracks)
 
     def _clear_track_store(self):
         self.track_store.remove_all()
@@ -429,7 +531,8 @@ class PlaylistPage(Adw.Bin):
                 self.load_more()
 
     def load_more(self):
-        if getattr(self, "is_fully_fetched", False) and hasattr(
+        streaming = getattr(self, "_is_background_fetching", False)
+        if (getattr(self, "is_fully_fetched", False) or streaming) and hasattr(
             self, "original_tracks"
         ):
             if len(self.current_tracks) < len(self.original_tracks):
@@ -444,16 +547,38 @@ class PlaylistPage(Adw.Bin):
                 if self.sort_dropdown.get_selected() != 0:
                     self.reorder_playlist(self.sort_dropdown.get_selected())
                 else:
-                    for t in new_tracks:
-                        self._add_track_row(t)
+                    self._add_track_rows(new_tracks)
 
                 self.load_more_spinner.set_visible(False)
                 self.is_loading_more = False
                 return
 
+            if streaming:
+                # The shared stream delivers the next page; _on_stream_page resumes from here
+                self.is_loading_more = True
+                self.load_more_spinner.set_visible(True)
+                return
+
         if getattr(self, "is_fully_loaded", False):
             return
 
+        if self._is_paged():
+            if self._page_failed:
+                return
+            # Only the next page is requested; earlier pages are never re-fetched
+            if not self._continuation:
+                self.is_fully_loaded = True
+                return
+            self.is_loading_more = True
+            self.load_more_spinner.set_visible(True)
+            thread = threading.Thread(
+                target=self._fetch_next_page,
+                args=(self.playlist_id, self._continuation),
+            )
+            thread.daemon = True
+            thread.start()
+            return
+
         self.is_loading_more = True
         self.load_more_spinner.set_visible(True)
         self.current_limit = len(self.current_tracks) + 50
@@ -482,9 +607,17 @@ class PlaylistPage(Adw.Bin):
             self.playlist_id = playlist_id
             self.playlist_title_text = ""
             self.current_limit = 50
+            self._continuation = None
+            self._reset_page_failures()
             self.emit("header-title-changed", "")
+            self.original_tracks = []
+            self.is_fully_fetched = False
+            self._is_background_fetching = False
+            self._pending_queue_append = False
             self.current_tracks = []
             self._clear_track_store()
+            self.search_index.clear()
+            self._sort_keys = {}
 
         if initial_data:
             self.playlist_title_text = initial_data.get("title", "")
@@ -541,6 +674,70 @@ class PlaylistPage(Adw.Bin):
         thread.daemon = True
         thread.start()
 
+    def _on_cache_refreshed(self, endpoint, resource, data):
+        # A stale cached playlist was shown; reload it (now fresh) from the cache
+        if (
+            endpoint == "get_playlist"
+            and self.playlist_id
+            and resource == MusicClient._resource_id(self.playlist_id)
+        ):
+            GObject.idle_add(self._reload_after_refresh, self.playlist_id)
+
+    def _reload_after_refresh(self, playlist_id):
+        if playlist_id != self.playlist_id:
+            return False
+        if self.is_loading_more or getattr(self, "_is_background_fetching", False):
+            # Pages are still arriving from the network and are fresh anyway
+            return False
+        print(f"Reloading refreshed playlist {playlist_id}")
+        self._reload_from_first_page(playlist_id)
+        return False
+
+    def _reload_from_first_page(self, playlist_id):
+        """Fetches the first page again; the rows shown are replaced once it arrives."""
+        self.current_limit = 50
+        self._continuation = None
+        self.original_tracks = []
+        self._sort_keys = {}
+        self.is_fully_fetched = False
+        self._pending_queue_append = False
+        self._reset_page_failures()
+        thread = threading.Thread(
+            target=self._fetch_playlist_details, args=(playlist_id,)
+        )
+        thread.daemon = True
+        thread.start()
+
+    # ── Page failures ─────────────────────────────────────────────────────────
+
+    def _on_page_failed(self, playlist_id):
+        self._page_failures += 1
+        if self._page_failures < MAX_PAGE_RETRIES:
+            delay = PAGE_RETRY_DELAY * 2 ** (self._page_failures - 1)
+            print(f"Next page failed ({self._page_failures}/{MAX_PAGE_RETRIES}), retrying in {delay}s")
+            GLib.timeout_add_seconds(delay, self._retry_page, playlist_id)
+            return
+        # The token has most likely expired; stop loading automatically with it
+        print("Next page keeps failing, giving up on the continuation")
+        self._continuation = None
+        self._page_failed = True
+        self.load_more_error.set_visible(True)
+
+    def _retry_page(self, playlist_id):
+        if playlist_id == self.playlist_id and not self.is_loading_more and not self._page_failed:
+            self.load_more()
+        return False
+
+    def _reset_page_failures(self):
+        self._page_failures = 0
+        self._page_failed = False
+        self.load_more_error.set_visible(False)
+
+    def _on_page_retry_clicked(self, btn):
+        # A fresh first page brings a fresh continuation token
+        if self.playlist_id:
+            self._reload_from_first_page(self.playlist_id)
+
     # ── Fetch ─────────────────────────────────────────────────────────────────
 
     def _fetch_playlist_details(self, playlist_id, is_incremental=False):
@@ -558,7 +755,7 @@ class PlaylistPage(Adw.Bin):
             album_type = None
 
             if playlist_id == "LM":
-                data = self.client.get_liked_songs(limit=self.current_limit)
+                data = self.client.get_playlist_page("LM") or {}
                 title = "Your Likes"
                 description = "Your liked songs from YouTube Music."
                 tracks = data.get("tracks", []) if isinstance(data, dict) else data
@@ -635,12 +832,8 @@ class PlaylistPage(Adw.Bin):
                     return
             else:
                 try:
-                    print(
-                        f"Fetching playlist: {playlist_id} (Limit: {self.current_limit})"
-                    )
-                    data = self.client.get_playlist(
-                        playlist_id, limit=self.current_limit
-                    )
+                    print(f"Fetching playlist: {playlist_id} (first page)")
+                    data = self.client.get_playlist_page(playlist_id)
                     title = data.get("title", "Unknown Playlist")
                     description = data.get("description", "")
                     tracks = data.get("tracks", [])
@@ -753,6 +946,11 @@ class PlaylistPage(Adw.Bin):
                 meta2_parts.append(duration_str)
             meta2 = " • ".join(meta2_parts)
 
+            if not is_incremental and playlist_id == self.playlist_id:
+                self._continuation = (
+                    data.get("continuation") if isinstance(data, dict) else None
+                )
+
             GObject.idle_add(
                 self.update_ui,
                 title,
@@ -780,6 +978,57 @@ class PlaylistPage(Adw.Bin):
             self.is_loading_more = False
             GObject.idle_add(self.load_more_spinner.set_visible, False)
 
+    def _is_paged(self):
+        """Playlists and liked songs are paged by continuation; albums are fetched whole."""
+        return bool(self.playlist_id) and not (
+            self.playlist_id.startswith("MPRE") or self.playlist_id.startswith("OLAK")
+        )
+
+    def _fetch_next_page(self, playlist_id, continuation):
+        try:
+            page = self.client.get_playlist_page(playlist_id, continuation=continuation)
+            GObject.idle_add(
+                self._append_page, playlist_id, page["tracks"], page["continuation"]
+            )
+        except Exception as e:
+            print(f"Error fetching next playlist page: {e}")
+            GObject.idle_add(self._append_page, playlist_id, [], continuation, True)
+
+    def _append_page(self, playlist_id, tracks, continuation, failed=False):
+        self.load_more_spinner.set_visible(False)
+        self.is_loading_more = False
+        if playlist_id != self.playlist_id:
+            return
+        if failed:
+            self._on_page_failed(playlist_id)
+            return
+        self._page_failures = 0
+        if getattr(self, "_is_background_fetching", False):
+            # A full stream started meanwhile and already carries this page
+            self.load_more()
+            return
+
+        self._continuation = continuation
+        if not continuation:
+            print("No continuation left. Playlist fully loaded.")
+            self.is_fully_loaded = True
+        if not tracks:
+            return
+
+        print(f"Appending page of {len(tracks)} tracks")
+        self._index_tracks(tracks)
+        self.current_tracks.extend(tracks)
+        if hasattr(self, "original_tracks"):
+            self.original_tracks.extend(tracks)
+
+        if self.sort_dropdown.get_selected() != 0:
+            self.reorder_playlist(self.sort_dropdown.get_selected())
+        else:
+            self._add_track_rows(tracks)
+
+        if len(self.current_tracks) == len(getattr(self, "original_tracks", [])):
+            self.is_fully_fetched = not continuation
+
     # ── Update UI ─────────────────────────────────────────────────────────────
 
     def update_ui(
@@ -845,6 +1094,7 @@ class PlaylistPage(Adw.Bin):
                 return
 
             print(f"Appending {len(new_tracks)} new tracks (Total: {len(tracks)})")
+            self._index_tracks(new_tracks)
             self.current_tracks.extend(new_tracks)
             if hasattr(self, "original_tracks"):
                 self.original_tracks.extend(new_tracks)
@@ -852,8 +1102,7 @@ class PlaylistPage(Adw.Bin):
             if self.sort_dropdown.get_selected() != 0:
                 self.reorder_playlist(self.sort_dropdown.get_selected())
             else:
-                for t in new_tracks:
-                    self._add_track_row(t)
+                self._add_track_rows(new_tracks)
 
             self.load_more_spinner.set_visible(False)
             self.is_loading_more = False
@@ -868,7 +1117,9 @@ class PlaylistPage(Adw.Bin):
                 self.is_fully_loaded = True
         else:
             self.is_fully_loaded = False
-            if total_tracks is not None and len(tracks) >= total_tracks:
+            if (total_tracks is not None and len(tracks) >= total_tracks) or (
+                self._is_paged() and not self._continuation
+            ):
                 self.is_fully_loaded = True
                 self.is_fully_fetched = True
                 self.client.set_cached_playlist_tracks(self.playlist_id, tracks)
@@ -877,10 +1128,9 @@ class PlaylistPage(Adw.Bin):
             if not hasattr(self, "original_tracks") or not self.original_tracks:
                 self.original_tracks = list(tracks)
             self.sort_dropdown.set_selected(0)
+            self._index_tracks(tracks)
 
-            self._clear_track_store()
-            for t in tracks:
-                self._add_track_row(t)
+            self.track_store.replace(tracks)
 
         if len(self.current_tracks) > 0 and len(self.current_tracks) == len(
             getattr(self, "original_tracks", [])
@@ -890,21 +1140,21 @@ class PlaylistPage(Adw.Bin):
     # ── Background fetch ──────────────────────────────────────────────────────
 
     def _start_background_full_fetch(self):
-        if getattr(self, "is_fully_fetched", False):
+        if getattr(self, "is_fully_fetched", False) or getattr(
+            self, "_is_background_fetching", False
+        ):
             return
-        print(f"Starting background fetch for full playlist: {self.playlist_id}")
+        playlist_id = self.playlist_id
+        print(f"Streaming full playlist in the background: {playlist_id}")
 
         def fetch_job():
             try:
-                data = self.client.get_playlist(self.playlist_id, limit=5000)
-                tracks = data.get("tracks", [])
-                if tracks:
-                    print(f"Background fetch complete. Fetched {len(tracks)} tracks.")
-                    self.original_tracks = tracks
-                    self.client.set_cached_playlist_tracks(self.playlist_id, tracks)
-                    GObject.idle_add(self._on_background_fetch_complete)
+                for offset, tracks in self.client.iter_playlist_pages(playlist_id):
+                    GObject.idle_add(self._on_stream_page, playlist_id, offset, tracks)
+                GObject.idle_add(self._on_background_fetch_complete, playlist_id)
             except Exception as e:
                 print(f"Error in background fetch: {e}")
+                GObject.idle_add(self._on_background_fetch_complete, playlist_id, True)
 
         self._is_background_fetching = True
         self._pending_queue_append = False
@@ -912,21 +1162,77 @@ class PlaylistPage(Adw.Bin):
         thread.daemon = True
         thread.start()
 
-    def _on_background_fetch_complete(self):
-        self.is_fully_fetched = True
+    def _on_stream_page(self, playlist_id, offset, tracks):
+        if playlist_id != self.playlist_id:
+            return
+        # Pages replay from the start of the playlist; keep only what we don't have yet
+        known = len(self.original_tracks)
+        if offset > known:
+            return
+        new_tracks = tracks[known - offset :]
+        if not new_tracks:
+            return
+
+        self.original_tracks.extend(new_tracks)
+        self._index_tracks(new_tracks)
+        self._extend_pending_queue()
+
+        if self.is_loading_more:
+            # The list was waiting at the bottom for this page
+            self.is_loading_more = False
+            self.load_more_spinner.set_visible(False)
+            self.load_more()
+
+    def _on_background_fetch_complete(self, playlist_id, failed=False):
+        if playlist_id != self.playlist_id:
+            return
         self._is_background_fetching = False
+        if failed:
+            # Keep what arrived; continuation paging would now duplicate rows
+            self._continuation = None
+        else:
+            print(f"Background fetch complete. Fetched {len(self.original_tracks)} tracks.")
+        self.is_fully_fetched = True
 
         if self.sort_dropdown.get_selected() != 0:
             self.current_tracks = list(self.original_tracks)
             self.reorder_playlist(self.sort_dropdown.get_selected())
 
-        if getattr(self, "_pending_queue_append", False):
-            print("Background fetch complete, extending player queue.")
-            start_index = len(self.current_tracks)
-            new_tracks = self.original_tracks[start_index:]
-            if new_tracks:
-                self.player.extend_queue(new_tracks)
+        self._extend_pending_queue()
+        self._pending_queue_append = False
+
+        if self.is_loading_more:
+            self.is_loading_more = False
+            self.load_more_spinner.set_visible(False)
+            self.load_more()
+
+    def _follow_stream_into_queue(self, queued_count):
+        """
+        Keeps growing a queue started from this page while the rest of the playlist streams in.
+        Streamed pages arrive in playlist order, so only a queue built in that order is followed;
+        a sorted queue keeps just the tracks it was started with.
+        """
+        if not getattr(self, "_is_background_fetching", False):
+            return
+        if self.sort_dropdown.get_selected() != 0:
+            print("Queue was built from a sorted view, not following the playlist stream")
+            return
+        self._pending_queue_append = True
+        self._queue_extended_to = queued_count
+        self._extend_pending_queue()
+
+    def _extend_pending_queue(self):
+        if not getattr(self, "_pending_queue_append", False):
+            return
+        if self.player.queue_source_id != self.playlist_id:
+            # Something else is playing now
             self._pending_queue_append = False
+            return
+        new_tracks = self.original_tracks[self._queue_extended_to :]
+        if new_tracks:
+            print(f"Extending player queue with {len(new_tracks)} streamed tracks.")
+            self._queue_extended_to += len(new_tracks)
+            self.player.extend_queue(new_tracks)
 
     # ── Song activation ───────────────────────────────────────────────────────
 
@@ -955,8 +1261,7 @@ class PlaylistPage(Adw.Bin):
             source_id=self.playlist_id,
             is_infinite=self._is_inf(),
         )
-        if getattr(self, "_is_background_fetching", False):
-            self._pending_queue_append = True
+        self._follow_stream_into_queue(len(tracks_to_queue))
 
     # ── Sort ──────────────────────────────────────────────────────────────────
 
@@ -967,35 +1272,43 @@ class PlaylistPage(Adw.Bin):
         if not self.current_tracks:
             return
 
+        self._sort_serial += 1
+        serial = self._sort_serial
+
         if sort_type == 0:
             if hasattr(self, "original_tracks"):
-                self.current_tracks = list(self.original_tracks)
-            else:
-                return
-        elif sort_type == 1:
-            self.current_tracks.sort(key=lambda x: x.get("title", "").lower())
-        elif sort_type == 2:
-            self.current_tracks.sort(
-                key=lambda x: (
-                    x.get("artists", [{}])[0].get("name", "").lower()
-                    if x.get("artists")
-                    else "",
-                    x.get("title", "").lower(),
-                )
-            )
-        elif sort_type == 3:
-            self.current_tracks.sort(
-                key=lambda x: (
-                    x.get("album", {}).get("name", "").lower()
-                    if isinstance(x.get("album"), dict)
-                    else str(x.get("album") or "").lower(),
-                    x.get("title", "").lower(),
-                )
-            )
+                self._apply_sorted_tracks(serial, self.playlist_id, list(self.original_tracks))
+            return
+
+        order = _SORT_ORDERS.get(sort_type)
+        if order is None:
+            return
+        tracks = list(self.current_tracks)
+        playlist_id = self.playlist_id
+        sort_keys = self._sort_keys
+
+        def sort_job():
+            # Keys are built once per track and reused by every later sort of this playlist
+            keys = {}
+            for t in tracks:
+                entry = sort_keys.get(id(t))
+                if entry is None or entry[0] is not t:
+                    entry = sort_keys[id(t)] = (t, _sort_key(t))
+                keys[id(t)] = entry[1]
+            # list.sort is stable: equal keys keep their current relative order
+            tracks.sort(key=lambda t: order(keys[id(t)]))
+            GLib.idle_add(self._apply_sorted_tracks, serial, playlist_id, tracks)
+
+        thread = threading.Thread(target=sort_job)
+        thread.daemon = True
+        thread.start()
 
-        self._clear_track_store()
-        for t in self.current_tracks:
-            self._add_track_row(t)
+    def _apply_sorted_tracks(self, serial, playlist_id, tracks):
+        if serial != self._sort_serial or playlist_id != self.playlist_id:
+            return False
+        self.current_tracks = tracks
+        self.track_store.replace(tracks)
+        return False
 
     # ── Right-click ───────────────────────────────────────────────────────────
 
@@ -1026,9 +1339,19 @@ class PlaylistPage(Adw.Bin):
                     if hasattr(root, "open_artist"):
                         root.open_artist(aid, name)
 
+        def download_action(action, param):
+            self.player.downloads.enqueue(
+                data.get("id"), data.get("title"), data.get("artist"), data.get("thumb")
+            )
+
+        def remove_download_action(action, param):
+            self.player.downloads.remove(data.get("id"))
+
         for name, cb in [
             ("copy_link", copy_link_action),
             ("goto_artist", goto_artist_action),
+            ("download", download_action),
+            ("remove_download", remove_download_action),
         ]:
             a = Gio.SimpleAction.new(name, None)
             a.connect("activate", cb)
@@ -1037,6 +1360,10 @@ class PlaylistPage(Adw.Bin):
         menu_model = Gio.Menu()
         if data.get("id"):
             menu_model.append("Copy Link", "row.copy_link")
+            if self.player.downloads.get(data["id"]):
+                menu_model.append("Remove Download", "row.remove_download")
+            else:
+                menu_model.append("Download", "row.download")
         if (
             full_track_data
             and "artists" in full_track_data
@@ -1075,15 +1402,15 @@ class PlaylistPage(Adw.Bin):
         print(
             f"\033[94m[DEBUG-PLAYLIST] on_play_clicked. playlist_id={self.playlist_id}\033[0m"
         )
+        tracks = self._best_queue()
         self.player.set_queue(
-            self._best_queue(),
+            tracks,
             0,
             shuffle=False,
             source_id=self.playlist_id,
             is_infinite=self._is_inf(),
         )
-        if getattr(self, "_is_background_fetching", False):
-            self._pending_queue_append = True
+        self._follow_stream_into_queue(len(tracks))
 
     def on_shuffle_clicked(self, btn):
         if not self.current_tracks:
@@ -1091,15 +1418,15 @@ class PlaylistPage(Adw.Bin):
         print(
             f"\033[94m[DEBUG-PLAYLIST] on_shuffle_clicked. playlist_id={self.playlist_id}\033[0m"
         )
+        tracks = self._best_queue()
         self.player.set_queue(
-            self._best_queue(),
+            tracks,
             -1,
             shuffle=True,
             source_id=self.playlist_id,
             is_infinite=self._is_inf(),
         )
-        if getattr(self, "_is_background_fetching", False):
-            self._pending_queue_append = True
+        self._follow_stream_into_queue(len(tracks))
 
     def _best_queue(self):
         if (
@@ -1304,14 +1631,14 @@ class PlaylistPage(Adw.Bin):
         if getattr(self, "is_fully_fetched", False):
             return
         print("Fetching remaining tracks for queue...")
+        playlist_id = self.playlist_id
+        existing_count = len(self.current_tracks)
 
         def fetch_job():
             try:
-                existing_count = len(self.current_tracks)
-                data = self.client.get_playlist(self.playlist_id, limit=5000)
-                tracks = data.get("tracks", [])
-                if len(tracks) > existing_count:
-                    new_raw = tracks[existing_count:]
+                # Shares the page walk with the list view instead of fetching the playlist again
+                for offset, tracks in self.client.iter_playlist_pages(playlist_id):
+                    new_raw = tracks[max(0, existing_count - offset) :]
                     normalized = []
                     for t in new_raw:
                         artist = ", ".join(
@@ -1329,8 +1656,6 @@ class PlaylistPage(Adw.Bin):
                         )
                     if normalized:
                         GObject.idle_add(self.player.extend_queue, normalized)
-                else:
-                    print("DEBUG: No new tracks found.")
             except Exception as e:
                 print(f"Error fetching remaining tracks: {e}")
 
@@ -1,6 +1,7 @@
 from gi.repository import Gtk, Adw, GObject, GLib, Pango, Gio, Gdk
 import threading
 from api.client import MusicClient
+from ui.utils import listen_for_refreshes
 
 class SearchPage(Adw.Bin):
     def __init__(self, player, open_playlist_callback, *args, **kwargs):
@@ -8,6 +9,7 @@ class SearchPage(Adw.Bin):
         self.player = player
         self.client = MusicClient()
         self.open_playlist_callback = open_playlist_callback
+        listen_for_refreshes(self, self.client, self._on_cache_refreshed)
         
         # Layout
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
@@ -117,6 +119,10 @@ class SearchPage(Adw.Bin):
         except Exception as e:
             print(f"Error fetching explore data: {e}")
 
+    def _on_cache_refreshed(self, endpoint, resource, data):
+        if endpoint == "get_explore":
+            GObject.idle_add(self.update_explore_ui, data)
+
     def update_explore_ui(self, data):
         if not data:
             return
@@ -4,6 +4,8 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, GObject, Pango, Gdk, Gio
 
+from ui.list_fill import ListFiller
+
 
 class QueueItem(GObject.Object):
     __gtype_name__ = "QueueItem"
@@ -83,18 +85,8 @@ class QueueRowWidget(Gtk.Box):
         track = item.track
 
         # Update Text
-        self.title_lbl.set_label(track.get("title", "Unknown"))
-
-        artist_txt = track.get("artist")
-        if isinstance(artist_txt, list):
-            artist_txt = ", ".join([a.get("name", "") for a in artist_txt])
-        elif not artist_txt and "artists" in track:
-            artist_txt = ", ".join(
-                [a.get("name", "") for a in track.get("artists", [])]
-            )
-        if not artist_txt:
-            artist_txt = "Unknown"
-        self.artist_lbl.set_label(artist_txt)
+        self.title_lbl.set_label(track.title)
+        self.artist_lbl.set_label(track.artist)
 
         # Update Indicator
         if item.is_playing:
@@ -169,6 +161,8 @@ class QueuePopover(Gtk.Popover):
 
         # ListView Setup
         self.store = Gio.ListStore(item_type=QueueItem)
+        self.filler = ListFiller(self.store)
+        self._populated_version = None  # PlayQueue.version the rows were built from
         self.selection_model = Gtk.SingleSelection(model=self.store)
         self.selection_model.set_autoselect(False)
         self.selection_model.connect("selection-changed", self._on_selection_changed)
@@ -207,15 +201,12 @@ class QueuePopover(Gtk.Popover):
             self.shuffle_btn.remove_css_class("accent")
 
     def _populate(self):
-        queue = self.player.queue
-        current_idx = self.player.current_queue_index
-
-        items = []
-        for i, track in enumerate(queue):
-            items.append(QueueItem(track, i, i == current_idx))
+        def make_item(entry):
+            i, track = entry
+            return QueueItem(track, i, i == self.player.current_queue_index)
 
-        # Efficient update using splice
-        self.store.splice(0, self.store.get_n_items(), items)
+        self._populated_version = self.player.queue.version
+        self.filler.replace(enumerate(self.player.queue), make_item)
 
     def _on_factory_setup(self, factory, list_item):
         widget = QueueRowWidget()
@@ -245,8 +236,8 @@ class QueuePopover(Gtk.Popover):
     def _on_player_update(self, *args):
         self._update_shuffle_state()
 
-        # Only full rebuild if queue changed structurally
-        if self.store.get_n_items() != len(self.player.queue):
+        # Only full rebuild if queue changed structurally (the length alone misses reorders)
+        if self._populated_version != self.player.queue.version:
             self._populate()
         else:
             self._update_item_states()
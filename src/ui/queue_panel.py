@@ -4,6 +4,8 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, GObject, Pango, Gdk, Gio, GLib
 
+from ui.list_fill import ListFiller
+
 
 class QueueItem(GObject.Object):
     __gtype_name__ = "QueueItem"
@@ -104,18 +106,8 @@ class QueueRowWidget(Gtk.Box):
             return
 
         track = item.track
-        self.title_lbl.set_label(track.get("title", "Unknown"))
-
-        artist_txt = track.get("artist")
-        if isinstance(artist_txt, list):
-            artist_txt = ", ".join([a.get("name", "") for a in artist_txt])
-        elif not artist_txt and "artists" in track:
-            artist_txt = ", ".join(
-                [a.get("name", "") for a in track.get("artists", [])]
-            )
-        if not artist_txt:
-            artist_txt = "Unknown"
-        self.artist_lbl.set_label(artist_txt)
+        self.title_lbl.set_label(track.title)
+        self.artist_lbl.set_label(track.artist)
 
         if item.is_playing:
             self.add_css_class("playing")
@@ -187,6 +179,8 @@ class QueuePanel(Gtk.Box):
 
         # ListView Setup
         self.store = Gio.ListStore(item_type=QueueItem)
+        self.filler = ListFiller(self.store)
+        self._populated_version = None  # PlayQueue.version the rows were built from
         self.selection_model = Gtk.SingleSelection(model=self.store)
         self.selection_model.set_autoselect(False)
         self.selection_model.connect("selection-changed", self._on_selection_changed)
@@ -215,8 +209,8 @@ class QueuePanel(Gtk.Box):
         self._update_repeat_state()
 
     def _on_map(self, *args):
-        # Refresh list when sidebar becomes visible - but only if count changed
-        if self.store.get_n_items() != len(self.player.queue):
+        # Refresh list when sidebar becomes visible - but only if the queue changed
+        if self._populated_version != self.player.queue.version:
             self._populate()
         else:
             self._update_item_states()
@@ -271,24 +265,29 @@ class QueuePanel(Gtk.Box):
         self._programmatic_update = True
         try:
             queue = self.player.queue
-            current_idx = self.player.current_queue_index
 
-            items = []
-            for i, track in enumerate(queue):
-                items.append(QueueItem(track, i, i == current_idx))
+            def make_item(entry):
+                i, track = entry
+                return QueueItem(track, i, i == self.player.current_queue_index)
 
-            self.store.splice(0, self.store.get_n_items(), items)
-            self._last_queue_len = len(queue)
+            self.filler.replace(enumerate(queue), make_item, self._on_populated)
+            self._populated_version = queue.version
+        finally:
+            self._programmatic_update = False
 
-            # Restore selection to current index
-            if current_idx >= 0 and current_idx < len(items):
+    def _on_populated(self):
+        # Restore selection to current index once its row exists
+        current_idx = self.player.current_queue_index
+        self._programmatic_update = True
+        try:
+            if current_idx >= 0 and current_idx < self.store.get_n_items():
                 self.selection_model.set_selected(current_idx)
-
-            if self.get_mapped():
-                GLib.idle_add(self._scroll_to_current)
         finally:
             self._programmatic_update = False
 
+        if self.get_mapped():
+            GLib.idle_add(self._scroll_to_current)
+
     def _on_factory_setup(self, factory, list_item):
         widget = QueueRowWidget()
         list_item.set_child(widget)
@@ -324,10 +323,8 @@ class QueuePanel(Gtk.Box):
 
         state = args[0] if len(args) == 1 else None
 
-        # If queue length changed OR structural update requested, we MUST repopulate
-        if state == "queue-updated" or self.store.get_n_items() != len(
-            self.player.queue
-        ):
+        # If the queue changed (including same-length reorders) or a rebuild was requested, repopulate
+        if state == "queue-updated" or self._populated_version != self.player.queue.version:
             self._populate()
         else:
             # Otherwise, just update indicators (very efficient!)
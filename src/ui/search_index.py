@@ -0,0 +1,566 @@
+import re
+import threading
+import unicodedata
+from gi.repository import GLib, Gtk
+
+from player.track import Track
+
+# search_async() change -> how a Gtk.CustomFilter has to re-evaluate its rows
+FILTER_CHANGES = {
+    "narrower": Gtk.FilterChange.MORE_STRICT,
+    "wider": Gtk.FilterChange.LESS_STRICT,
+    "different": Gtk.FilterChange.DIFFERENT,
+}
+
+# Searchable text fields, in SearchEntry.fields order, with their weight in the ranking
+FIELDS = ("title", "artist", "album")
+FIELD_WEIGHTS = (1.0, 0.85, 0.7)
+# Query prefixes -> field name
+FIELD_ALIASES = {
+    "title": "title",
+    "t": "title",
+    "artist": "artist",
+    "by": "artist",
+    "a": "artist",
+    "album": "album",
+    "al": "album",
+}
+DURATION_ALIASES = ("dur", "duration", "len", "length")
+# dur:4m without an operator matches this many seconds either way
+DURATION_SLACK = 15
+# Tokens or entries scored between checks for a newer query
+CANCEL_CHECK_EVERY = 256
+# Best score a typo match can reach; hits at or above it make fuzzy matching pointless
+FUZZY_MAX_SCORE = 0.5
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+_DURATION_RE = re.compile(r"^(>=|<=|>|<|=)?(.+)$")
+_UNIT_RE = re.compile(r"(\d+(?:\.\d+)?)([hms])")
+
+
+def normalize(text):
+    """Casefolds and strips accents, so 'Beyoncé' and 'BEYONCE' compare equal."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text)
+
+
+def bigrams(token):
+    return {token[i : i + 2] for i in range(len(token) - 1)}
+
+
+def parse_duration(text):
+    """'5m', '1h2m', '90s', '3:30' or a bare number of minutes -> seconds, or None."""
+    text = text.strip()
+    try:
+        if ":" in text:
+            seconds = 0
+            for part in text.split(":"):
+                seconds = seconds * 60 + int(part)
+            return seconds
+        if text.replace(".", "", 1).isdigit():
+            return float(text) * 60
+    except ValueError:
+        return None
+    units = _UNIT_RE.findall(text)
+    if not units or "".join(n + u for n, u in units) != text:
+        return None
+    scale = {"h": 3600, "m": 60, "s": 1}
+    return sum(float(n) * scale[u] for n, u in units)
+
+
+class Query:
+    """
+    A parsed filter query.
+
+    terms are (word, fields, phrase) tuples that must all match: fields is a tuple of FIELDS
+    indices, phrase marks a quoted string matched verbatim. durations are (low, high) bounds
+    in seconds, either of which may be None.
+    """
+
+    __slots__ = ("terms", "durations")
+
+    def __init__(self, terms, durations):
+        self.terms = terms
+        self.durations = durations
+
+    def __bool__(self):
+        return bool(self.terms or self.durations)
+
+
+def parse_query(text):
+    """
+    Parses filter text such as 'artist:queen "killer queen" dur:>5m bohemain'.
+
+    Supported prefixes are title:, artist: (by:), album: and dur: with an optional >, <, >=, <=
+    or = operator, or a lo-hi range. Bare words search every field; unknown prefixes are
+    treated as plain text.
+    """
+    terms = []
+    durations = []
+    all_fields = tuple(range(len(FIELDS)))
+    for match in _QUERY_RE.finditer(text or ""):
+        prefix, quoted, word = match.groups()
+        value = quoted if quoted is not None else word
+        if prefix:
+            name = prefix.lower()
+            if name in DURATION_ALIASES and quoted is None:
+                bounds = _parse_duration_filter(value)
+                if bounds:
+                    durations.append(bounds)
+                continue
+            field = FIELD_ALIASES.get(name)
+            if field is None:
+                # e.g. "re:zero" is a title, not a field
+                value = match.group(0)
+                fields = all_fields
+            else:
+                fields = (FIELDS.index(field),)
+        else:
+            fields = all_fields
+
+        value = normalize(value)
+        if quoted is not None:
+            value = " ".join(value.split())
+            if value:
+                terms.append((value, fields, True))
+        else:
+            for token in tokenize(value):
+                terms.append((token, fields, False))
+    return Query(terms, durations)
+
+
+def _parse_duration_filter(value):
+    match = _DURATION_RE.match(value)
+    if not match:
+        return None
+    op, rest = match.groups()
+    if not op and "-" in rest:
+        lo, _, hi = rest.partition("-")
+        lo, hi = parse_duration(lo), parse_duration(hi)
+        if lo is None or hi is None:
+            return None
+        return lo, hi
+    seconds = parse_duration(rest)
+    if seconds is None:
+        return None
+    if op in (">", ">="):
+        return seconds, None
+    if op in ("<", "<="):
+        return None, seconds
+    return seconds - DURATION_SLACK, seconds + DURATION_SLACK
+
+
+def fuzzy_limit(word):
+    """Edits tolerated in a query word: none for short words, one from 4 chars, two from 8."""
+    if len(word) >= 8:
+        return 2
+    if len(word) >= 4:
+        return 1
+    return 0
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions),
+    or limit + 1 as soon as it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        ca = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cb = b[j - 1]
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def token_score(word, token, limit):
+    """How well one query word matches one field token, 0 for no match."""
+    if token == word:
+        return 1.0
+    if token.startswith(word):
+        return 0.85
+    if word in token:
+        return 0.6
+    if not limit:
+        return 0.0
+    # Cheap rejection before the distance: too many characters that don't occur at all
+    if len(set(word).difference(token)) > limit:
+        return 0.0
+    d = edit_distance(word, token, limit)
+    if d <= limit:
+        return 0.5 - 0.15 * (d - 1)
+    if len(token) > len(word):
+        # Typo in a word that is still being typed
+        d = edit_distance(word, token[: len(word)], limit)
+        if d <= limit:
+            return 0.4 - 0.15 * (d - 1)
+    return 0.0
+
+
+def candidate_tokens(word, limit, grams):
+    """
+    Tokens that can score for word under limit, from the bigram -> tokens index, or None when
+    the word is too short to narrow anything. An edit (or transposition) touches at most three
+    of the word's bigrams, so every hit keeps at least len(bigrams) - 3 * limit of them.
+    """
+    word_grams = bigrams(word)
+    need = len(word_grams) - 3 * limit
+    if need <= 0:
+        return None
+    counts = {}
+    for g in word_grams:
+        for tok in grams.get(g, ()):
+            counts[tok] = counts.get(tok, 0) + 1
+    return [tok for tok, n in counts.items() if n >= need]
+
+
+class SearchEntry:
+    __slots__ = ("track", "seq", "fields", "tokens", "duration")
+
+    def __init__(self, track, seq=0):
+        t = Track.from_dict(track)
+        self.track = track  # Keeps id(track) valid for as long as the entry exists
+        self.seq = seq  # Arrival order, breaks ranking ties
+        self.fields = (normalize(t.title), normalize(t.artist), normalize(t.album))
+        self.tokens = tuple(tuple(set(tokenize(f))) for f in self.fields)
+        self.duration = t.duration_seconds
+
+    def score(self, query):
+        """Relevance of this entry for query, 0 when it doesn't match. Used for unindexed rows."""
+        if not self.duration_ok(query.durations):
+            return 0.0
+        total = 0.0
+        for word, fields, phrase in query.terms:
+            best = 0.0
+            for f in fields:
+                if phrase:
+                    s = 1.0 if word in self.fields[f] else 0.0
+                else:
+                    limit = fuzzy_limit(word)
+                    s = max((token_score(word, tok, limit) for tok in self.tokens[f]), default=0.0)
+                best = max(best, s * FIELD_WEIGHTS[f])
+            if not best:
+                return 0.0
+            total += best
+        return total
+
+    def duration_ok(self, durations):
+        if not durations:
+            return True
+        if self.duration is None:
+            return False
+        for lo, hi in durations:
+            if lo is not None and self.duration < lo:
+                return False
+            if hi is not None and self.duration > hi:
+                return False
+        return True
+
+
+class _Superseded(Exception):
+    """A newer query was started while this one was still ranking."""
+
+
+class _Snapshot:
+    """
+    One published state of the index. add() builds a new snapshot instead of mutating the
+    current one, so a query ranks against the snapshot it started with and holds no lock.
+    """
+
+    __slots__ = ("entries", "vocab", "grams", "word_cache")
+
+    def __init__(self, entries=None, vocab=None, grams=None):
+        self.entries = entries or {}  # id(track) -> SearchEntry
+        self.vocab = vocab or tuple({} for _ in FIELDS)  # per field: token -> tuple of keys
+        self.grams = grams or {}  # bigram -> tuple of tokens, over every field
+        self.word_cache = {}  # (word, field) -> {key: score}, filled by queries
+
+    def extend(self, built):
+        """Returns a new snapshot with the built entries added."""
+        entries = dict(self.entries)
+        vocab = tuple(dict(v) for v in self.vocab)
+        added = tuple({} for _ in FIELDS)  # per field: token -> new keys
+        for entry in built:
+            key = id(entry.track)
+            if key in entries:
+                continue
+            entries[key] = entry
+            for f, tokens in enumerate(entry.tokens):
+                for tok in tokens:
+                    added[f].setdefault(tok, []).append(key)
+
+        new_grams = {}
+        for f, tokens in enumerate(added):
+            for tok, keys in tokens.items():
+                if not any(tok in v for v in vocab):
+                    for g in bigrams(tok):
+                        new_grams.setdefault(g, []).append(tok)
+                vocab[f][tok] = vocab[f].get(tok, ()) + tuple(keys)
+
+        grams = dict(self.grams)
+        for g, tokens in new_grams.items():
+            grams[g] = grams.get(g, ()) + tuple(set(tokens))
+        return _Snapshot(entries, vocab, grams)
+
+
+class SearchIndex:
+    """
+    Per-page search index over a playlist's tracks.
+
+    Entries hold casefolded, accent-stripped title/artist/album fields plus the duration and are
+    built off the main thread as tracks arrive. Queries (see parse_query) are also evaluated in
+    a worker: the first query word is scored against the page's vocabulary of distinct field
+    tokens (exact > prefix > substring > within a few typos), narrowed by a bigram index, so the
+    cost follows the number of distinct words, not the number of rows. Further words only look
+    at the rows still matching. Results come back as a rank per matching track, best first.
+    Tracks are keyed by identity, so pages look up their own row objects directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Guards publishing _snapshot and _generation
+        self._write_lock = threading.Lock()  # Serializes add() workers
+        self._snapshot = _Snapshot()
+        self._generation = 0  # Bumped by clear() so late batches are dropped
+        self._serial = 0  # Bumped per search so only the latest result is delivered
+        self._applied = None  # Keys of the last delivered result
+        self._stale = False  # Entries were added since the last delivered result
+        self._unindexed_query = (None, None)  # (text, parsed query) for matches_unindexed
+
+    def key(self, track):
+        return id(track)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = _Snapshot()
+            self._generation += 1
+            self._stale = True
+
+    def add(self, tracks, on_done=None):
+        """Indexes tracks in a worker thread; on_done() then runs on the main loop."""
+        with self._lock:
+            generation = self._generation
+            entries = self._snapshot.entries
+        todo = [t for t in tracks if id(t) not in entries]
+        first_seq = len(entries)
+        if not todo:
+            return
+
+        def job():
+            built = [SearchEntry(t, first_seq + i) for i, t in enumerate(todo)]
+            with self._write_lock:
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    base = self._snapshot
+                # Copying happens outside _lock; only other add() workers wait for it
+                snapshot = base.extend(built)
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    self._snapshot = snapshot
+                    self._stale = True
+            if on_done:
+                GLib.idle_add(on_done)
+
+        thread = threading.Thread(target=job)
+        thread.daemon = True
+        thread.start()
+
+    def search_async(self, text, callback):
+        """
+        Runs a query in a worker thread, then calls callback(ranks, change) on the main loop.
+        ranks maps the key of every matching track to its position by relevance (None when the
+        query is empty); change says how the match set relates to the previously delivered one:
+        "narrower", "wider" or "different". Superseded queries stop early and deliver nothing.
+        """
+        self._serial += 1
+        serial = self._serial
+        query = parse_query(text)
+        if not query:
+            self._deliver(serial, None, callback)
+            return
+
+        def job():
+            try:
+                ranks = self._rank(query, serial)
+            except _Superseded:
+                return
+            except Exception as e:
+                print(f"Error searching playlist: {e}")
+                return
+            GLib.idle_add(self._deliver, serial, ranks, callback)
+
+        thread = threading.Thread(target=job)
+        thread.daemon = True
+        thread.start()
+
+    def _deliver(self, serial, ranks, callback):
+        if serial != self._serial:
+            return False
+        keys = set(ranks) if ranks is not None else None
+        prev = self._applied
+        if keys is None:
+            change = "wider"
+        elif prev is None:
+            change = "different" if self._stale else "narrower"
+        elif self._stale:
+            change = "different"
+        elif keys <= prev:
+            change = "narrower"
+        elif keys >= prev:
+            change = "wider"
+        else:
+            change = "different"
+        self._applied = keys
+        self._stale = False
+        callback(ranks, change)
+        return False
+
+    def _check(self, serial, i):
+        if not i % CANCEL_CHECK_EVERY and serial != self._serial:
+            raise _Superseded()
+
+    def _rank(self, query, serial):
+        with self._lock:
+            snapshot = self._snapshot
+        entries = snapshot.entries
+        scores = None
+        # Most selective terms first, so later terms only look at the rows that are left
+        for word, fields, phrase in sorted(query.terms, key=lambda t: -len(t[0])):
+            if phrase:
+                keys = entries if scores is None else scores
+                matches = self._match_phrase(word, fields, snapshot, keys, serial)
+            elif scores is not None and self._narrow_first(word, fields, snapshot, scores):
+                matches = self._match_rows(word, fields, snapshot, scores, serial)
+            else:
+                matches = self._match_word(word, fields, snapshot, serial)
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {k: s + matches[k] for k, s in scores.items() if k in matches}
+            if not scores:
+                return {}
+        if scores is None:
+            # Only duration filters
+            scores = dict.fromkeys(entries, 0.0)
+        if query.durations:
+            scores = {k: s for k, s in scores.items() if entries[k].duration_ok(query.durations)}
+        self._check(serial, 0)
+        order = sorted(scores, key=lambda k: (-scores[k], entries[k].seq))
+        return {k: i for i, k in enumerate(order)}
+
+    def _narrow_first(self, word, fields, snapshot, keys):
+        """Whether scoring the remaining rows beats scanning the vocabulary for word."""
+        if all((word, f) in snapshot.word_cache for f in fields):
+            return False
+        return len(keys) < sum(len(snapshot.vocab[f]) for f in fields)
+
+    def _match_word(self, word, fields, snapshot, serial):
+        """Scores word against the vocabulary of fields, narrowed by the bigram index."""
+        todo = [f for f in fields if (word, f) not in snapshot.word_cache]
+        if todo:
+            limit = fuzzy_limit(word)
+            tokens = candidate_tokens(word, limit, snapshot.grams)
+            if tokens is None:
+                tokens = set().union(*(snapshot.vocab[f] for f in todo))
+            found = {f: {} for f in todo}
+            for i, tok in enumerate(tokens):
+                self._check(serial, i)
+                s = token_score(word, tok, limit)
+                if not s:
+                    continue
+                for f in todo:
+                    keys = snapshot.vocab[f].get(tok)
+                    if not keys:
+                        continue
+                    fs = s * FIELD_WEIGHTS[f]
+                    field_found = found[f]
+                    for k in keys:
+                        if fs > field_found.get(k, 0.0):
+                            field_found[k] = fs
+            # Only complete scans are cached
+            for f in todo:
+                snapshot.word_cache[(word, f)] = found[f]
+
+        result = {}
+        for f in fields:
+            for k, s in snapshot.word_cache[(word, f)].items():
+                if s > result.get(k, 0.0):
+                    result[k] = s
+        return result
+
+    def _match_rows(self, word, fields, snapshot, keys, serial):
+        """
+        Scores word against the tokens of the given rows only. Exact, prefix and substring hits
+        come first; the edit distance only runs for rows where a typo match could still win.
+        """
+        limit = fuzzy_limit(word)
+        result = {}
+        fuzzy = []
+        for i, k in enumerate(keys):
+            self._check(serial, i)
+            entry = snapshot.entries[k]
+            best = 0.0
+            for f in fields:
+                for tok in entry.tokens[f]:
+                    if word in tok:
+                        best = max(best, token_score(word, tok, 0) * FIELD_WEIGHTS[f])
+            if best:
+                result[k] = best
+            if limit and best < FUZZY_MAX_SCORE:
+                fuzzy.append(k)
+
+        for i, k in enumerate(fuzzy):
+            self._check(serial, i)
+            entry = snapshot.entries[k]
+            best = result.get(k, 0.0)
+            for f in fields:
+                for tok in entry.tokens[f]:
+                    if word not in tok:
+                        best = max(best, token_score(word, tok, limit) * FIELD_WEIGHTS[f])
+            if best:
+                result[k] = best
+        return result
+
+    def _match_phrase(self, phrase, fields, snapshot, keys, serial):
+        result = {}
+        for i, k in enumerate(keys):
+            self._check(serial, i)
+            entry = snapshot.entries[k]
+            for f in fields:
+                if phrase in entry.fields[f]:
+                    s = FIELD_WEIGHTS[f]
+                    if s > result.get(k, 0.0):
+                        result[k] = s
+        return result
+
+    def is_indexed(self, track):
+        return id(track) in self._snapshot.entries
+
+    def matches_unindexed(self, track, text):
+        """Direct check for a row whose entry is still being built. Runs on the main thread, lock-free."""
+        cached_text, query = self._unindexed_query
+        if cached_text != text:
+            query = parse_query(text)
+            self._unindexed_query = (text, query)
+        return not query or SearchEntry(track).score(query) > 0
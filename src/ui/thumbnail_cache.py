@@ -0,0 +1,186 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Upper bound for all thumbnail files on disk
+MAX_DISK_BYTES = 200 * 1024 * 1024
+# Cached thumbnails are used without asking the server for this long
+REVALIDATE_AFTER = 7 * 24 * 3600
+REQUEST_TIMEOUT = 15
+
+
+class ThumbnailCache:
+    """
+    Content-addressed on-disk cache for cover art.
+    Files are stored by the sha256 of their bytes, so the many size/URL variants that resolve
+    to the same image share one file. Old entries are revalidated with ETag/Last-Modified,
+    and the least recently used files are evicted once the size budget is exceeded.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ThumbnailCache, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        self.root = os.path.join(os.getcwd(), "data", "thumbnails")
+        os.makedirs(self.root, exist_ok=True)
+        self.max_bytes = MAX_DISK_BYTES
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self.root, "index.db"), check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS urls_digest ON urls (digest)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS blobs_lru ON blobs (accessed_at)")
+        self._conn.commit()
+
+    def fetch(self, url):
+        """Returns the image bytes for url, from disk when possible. Blocking; call from a worker."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, etag, last_modified, checked_at FROM urls WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+        data = None
+        if row:
+            digest, etag, last_modified, checked_at = row
+            data = self._read_blob(digest)
+            if data is not None:
+                if time.time() - checked_at < REVALIDATE_AFTER:
+                    self._touch(digest)
+                    return data
+                return self._revalidate(url, digest, etag, last_modified, data)
+
+        return self._download(url)
+
+    def _download(self, url, headers=None):
+        request = urllib.request.Request(url, headers=headers or {})
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            data = response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        self._store(url, data, etag, last_modified)
+        return data
+
+    def _revalidate(self, url, digest, etag, last_modified, data):
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            return self._download(url, headers)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                print(f"Thumbnail revalidation failed for {url}: {e}")
+                return data
+        except Exception as e:
+            # Offline: the copy we have is better than nothing
+            print(f"Thumbnail revalidation failed for {url}: {e}")
+            return data
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE urls SET checked_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+        self._touch(digest)
+        return data
+
+    def _store(self, url, data, etag, last_modified):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        now = time.time()
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?)",
+                    (url, digest, etag, last_modified, now),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+                    (digest, len(data), now),
+                )
+                self._conn.commit()
+                self._evict_locked()
+            except sqlite3.Error as e:
+                print(f"Thumbnail cache write failed: {e}")
+
+    def _read_blob(self, digest):
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _touch(self, digest):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE blobs SET accessed_at = ? WHERE digest = ?", (time.time(), digest)
+            )
+            self._conn.commit()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _evict_locked(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT digest, size FROM blobs ORDER BY accessed_at ASC"
+        ).fetchall()
+        evicted = 0
+        for digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            total -= size
+            evicted += 1
+        self._conn.commit()
+        print(f"Thumbnail cache: evicted {evicted} files")
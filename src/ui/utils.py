@@ -1,34 +1,11 @@
 import threading
-import urllib.request
-from collections import OrderedDict
 from gi.repository import Gtk, Gdk, GdkPixbuf, GLib
-
-# Bounded LRU Cache to prevent memory leaks (max 100 images)
-IMG_CACHE = OrderedDict()
-MAX_CACHE_SIZE = 100
-
-
-def cache_pixbuf(url, pixbuf):
-    if not url or not pixbuf:
-        return
-    if url in IMG_CACHE:
-        IMG_CACHE.move_to_end(url)
-        return
-
-    # Scale down very large images before caching to save massive amounts of RAM
-    # 800px is more than enough for any UI element in this app
-    w = pixbuf.get_width()
-    h = pixbuf.get_height()
-    max_dim = 800
-    if w > max_dim or h > max_dim:
-        scale = max_dim / max(w, h)
-        pixbuf = pixbuf.scale_simple(
-            int(w * scale), int(h * scale), GdkPixbuf.InterpType.BILINEAR
-        )
-
-    IMG_CACHE[url] = pixbuf
-    if len(IMG_CACHE) > MAX_CACHE_SIZE:
-        IMG_CACHE.popitem(last=False)
+from ui.image_loader import (
+    ImageLoader,
+    IMAGE_CACHE,
+    PRIORITY_VISIBLE,
+    PRIORITY_BACKGROUND,
+)
 
 
 class AsyncImage(Gtk.Image):
@@ -56,89 +33,95 @@ class AsyncImage(Gtk.Image):
         self.set_from_icon_name("image-missing-symbolic")  # Placeholder
         self.url = url
         self.circular = circular
+        self._request = None
+        self.connect("map", self._on_map)
 
         if url:
             self.load_url(url)
 
-    # ... (load_url, _fetch_image same) ...
-
     def load_url(self, url, **kwargs):
+        self.cancel_load()
         self.url = url
         if not url:
             self.set_from_icon_name("image-missing-symbolic")
             return
 
-        cached_pixbuf = IMG_CACHE.get(url)
-        if cached_pixbuf:
-            IMG_CACHE.move_to_end(url)
+        # Rebinding a recycled row: the scaled texture is usually still around
+        texture = IMAGE_CACHE.get_texture(self._variant_key(url))
+        if texture:
+            self._apply_texture(texture, url)
+            return
 
-        thread = threading.Thread(
-            target=self._fetch_image, args=(url, kwargs.get("fallbacks"), cached_pixbuf)
+        self._fallbacks = kwargs.get("fallbacks")
+        priority = PRIORITY_VISIBLE if self.get_mapped() else PRIORITY_BACKGROUND
+        # Decode (and download) at the size this widget paints, not at full resolution
+        self._request = ImageLoader().request(
+            url,
+            self._on_image_loaded,
+            priority,
+            size=(self.target_w, self.target_h),
         )
-        thread.daemon = True
-        thread.start()
-
-    def _fetch_image(self, url, fallbacks=None, cached_pixbuf=None):
-        try:
-            pixbuf = cached_pixbuf
-            if not pixbuf:
-                # Download image data
-                with urllib.request.urlopen(url) as response:
-                    data = response.read()
-
-                loader = GdkPixbuf.PixbufLoader()
-                loader.write(data)
-                loader.close()
-                pixbuf = loader.get_pixbuf()
 
-            if pixbuf:
-                # Cache the original full-res (scaled to max 800) pixbuf
-                cache_pixbuf(url, pixbuf)
+    def _variant_key(self, url):
+        return (url, self.target_w, self.target_h, "cover")
 
-                # Now perform the widget-specific scaling and cropping in the background thread
-                tw = self.target_w
-                th = self.target_h
+    def cancel_load(self):
+        """Drops the pending load, e.g. when a recycled list row is unbound."""
+        request = getattr(self, "_request", None)
+        if request:
+            request.cancel()
+            self._request = None
 
-                w = pixbuf.get_width()
-                h = pixbuf.get_height()
-
-                # Calculate scale to fill the target size (cover)
-                scale = max(tw / w, th / h)
-                new_w = int(w * scale)
-                new_h = int(h * scale)
-
-                # Scale properly
-                scaled = pixbuf.scale_simple(
-                    new_w, new_h, GdkPixbuf.InterpType.BILINEAR
-                )
-
-                # Center crop to target dimensions
-                final_pixbuf = scaled
-                if new_w > tw or new_h > th:
-                    offset_x = max(0, (new_w - tw) // 2)
-                    offset_y = max(0, (new_h - th) // 2)
-                    cw = min(tw, new_w - offset_x)
-                    ch = min(th, new_h - offset_y)
-                    if cw > 0 and ch > 0:
-                        try:
-                            final_pixbuf = scaled.new_subpixbuf(
-                                offset_x, offset_y, cw, ch
-                            )
-                        except Exception as e:
-                            print(f"Pixbuf crop error: {e}")
-
-                # Apply on main thread
-                GLib.idle_add(self._apply_pixbuf, final_pixbuf, url)
+    def _on_map(self, widget):
+        ImageLoader().promote(getattr(self, "_request", None))
 
-        except Exception as e:
-            print(f"Failed to load image {url}: {e}")
+    def _on_image_loaded(self, url, pixbuf, error):
+        # Runs on an ImageLoader worker thread
+        if error or not pixbuf:
+            print(f"Failed to load image {url}: {error}")
+            fallbacks = getattr(self, "_fallbacks", None)
             if fallbacks and self.url == url:
                 next_url = fallbacks.pop(0)
-                self.url = next_url  # Update current URL to match the fallback
                 print(f"Trying fallback: {next_url}")
-                self._fetch_image(next_url, fallbacks)
+                GLib.idle_add(lambda: self.load_url(next_url, fallbacks=fallbacks))
+            return
+
+        try:
+            # Perform the widget-specific scaling and cropping off the main thread
+            tw = self.target_w
+            th = self.target_h
+
+            w = pixbuf.get_width()
+            h = pixbuf.get_height()
+
+            # Calculate scale to fill the target size (cover)
+            scale = max(tw / w, th / h)
+            new_w = int(w * scale)
+            new_h = int(h * scale)
+
+            # Scale properly
+            scaled = pixbuf.scale_simple(new_w, new_h, GdkPixbuf.InterpType.BILINEAR)
+
+            # Center crop to target dimensions
+            final_pixbuf = scaled
+            if new_w > tw or new_h > th:
+                offset_x = max(0, (new_w - tw) // 2)
+                offset_y = max(0, (new_h - th) // 2)
+                cw = min(tw, new_w - offset_x)
+                ch = min(th, new_h - offset_y)
+                if cw > 0 and ch > 0:
+                    try:
+                        final_pixbuf = scaled.new_subpixbuf(offset_x, offset_y, cw, ch)
+                    except Exception as e:
+                        print(f"Pixbuf crop error: {e}")
+
+            texture = IMAGE_CACHE.put_texture(self._variant_key(url), final_pixbuf)
+            # Apply on main thread
+            GLib.idle_add(self._apply_texture, texture, url)
+        except Exception as e:
+            print(f"Failed to load image {url}: {e}")
 
-    def _apply_pixbuf(self, pixbuf, url=None):
+    def _apply_texture(self, texture, url=None):
         # Race condition check: only apply if the URL hasn't changed since request
         if url and self.url != url:
             return
@@ -146,7 +129,7 @@ class AsyncImage(Gtk.Image):
         if self.circular:
             self.add_css_class("circular")
 
-        self.set_from_pixbuf(pixbuf)
+        self.set_from_paintable(texture)
 
     def set_from_file(self, file):
         """Optimistically set image from a local file object (GFile)"""
@@ -156,6 +139,7 @@ class AsyncImage(Gtk.Image):
             pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
                 path, self.target_w, self.target_h, True
             )
+            self.cancel_load()
             self.set_from_pixbuf(pixbuf)
             # Nullify URL so subsequent async loads don't overwrite this immediately
             self.url = f"file://{path}"
@@ -163,6 +147,15 @@ class AsyncImage(Gtk.Image):
             print(f"Error setting from file: {e}")
 
 
+def listen_for_refreshes(widget, client, callback):
+    """
+    Keeps callback registered as a client refresh listener only while widget is realized,
+    so pages that were navigated away from stop receiving background refreshes.
+    """
+    widget.connect("realize", lambda *_: client.add_refresh_listener(callback))
+    widget.connect("unrealize", lambda *_: client.remove_refresh_listener(callback))
+
+
 def subprocess_pixbuf(pixbuf, x, y, w, h):
     # bindings helper
     return pixbuf.new_subpixbuf(x, y, w, h)
@@ -175,76 +168,72 @@ class AsyncPicture(Gtk.Picture):
         self.set_content_fit(Gtk.ContentFit.COVER)
         self.crop_to_square = crop_to_square
         self.url = url
+        self._request = None
+        self.connect("map", self._on_map)
         if url:
             self.load_url(url)
 
     def load_url(self, url, **kwargs):
+        self.cancel_load()
         self.url = url
         if not url:
             self.set_paintable(None)
             return
 
-        cached_pixbuf = IMG_CACHE.get(url)
-        if cached_pixbuf:
-            IMG_CACHE.move_to_end(url)
+        texture = IMAGE_CACHE.get_texture(self._variant_key(url))
+        if texture:
+            self._apply_texture(texture, url)
+            return
 
-        thread = threading.Thread(
-            target=self._fetch_image, args=(url, kwargs.get("fallbacks"), cached_pixbuf)
-        )
-        thread.daemon = True
-        thread.start()
+        self._fallbacks = kwargs.get("fallbacks")
+        priority = PRIORITY_VISIBLE if self.get_mapped() else PRIORITY_BACKGROUND
+        self._request = ImageLoader().request(url, self._on_image_loaded, priority)
 
-    def _fetch_image(self, url, fallbacks=None, cached_pixbuf=None):
-        try:
-            pixbuf = cached_pixbuf
-            if not pixbuf:
-                with urllib.request.urlopen(url) as response:
-                    data = response.read()
-
-                loader = GdkPixbuf.PixbufLoader()
-                loader.write(data)
-                loader.close()
-                pixbuf = loader.get_pixbuf()
-
-            if pixbuf:
-                # Force center-crop to a 1:1 square in the worker thread
-                if self.crop_to_square:
-                    w = pixbuf.get_width()
-                    h = pixbuf.get_height()
-                    if w != h:
-                        size = min(w, h)
-                        offset_x = (w - size) // 2
-                        offset_y = (h - size) // 2
-                        pixbuf = pixbuf.new_subpixbuf(offset_x, offset_y, size, size)
-
-                # Scale down if still too large
-                w = pixbuf.get_width()
-                h = pixbuf.get_height()
-                max_dim = 800
-                if w > max_dim or h > max_dim:
-                    scale = max_dim / max(w, h)
-                    pixbuf = pixbuf.scale_simple(
-                        int(w * scale), int(h * scale), GdkPixbuf.InterpType.BILINEAR
-                    )
+    def _variant_key(self, url):
+        # Gtk.Picture scales on the GPU, so one texture serves every allocation
+        return (url, 0, 0, "square" if self.crop_to_square else "full")
 
-                cache_pixbuf(url, pixbuf)
-                GLib.idle_add(self._apply_pixbuf, pixbuf, url)
+    def cancel_load(self):
+        request = getattr(self, "_request", None)
+        if request:
+            request.cancel()
+            self._request = None
 
-        except Exception as e:
-            print(f"AsyncPicture error {url}: {e}")
+    def _on_map(self, widget):
+        ImageLoader().promote(getattr(self, "_request", None))
+
+    def _on_image_loaded(self, url, pixbuf, error):
+        # Runs on an ImageLoader worker thread
+        if error or not pixbuf:
+            print(f"AsyncPicture error {url}: {error}")
+            fallbacks = getattr(self, "_fallbacks", None)
             if fallbacks and self.url == url:
                 next_url = fallbacks.pop(0)
-                self.url = next_url
                 print(f"Trying fallback: {next_url}")
-                self._fetch_image(next_url, fallbacks)
+                GLib.idle_add(lambda: self.load_url(next_url, fallbacks=fallbacks))
+            return
+
+        try:
+            # Force center-crop to a 1:1 square in the worker thread
+            if self.crop_to_square:
+                w = pixbuf.get_width()
+                h = pixbuf.get_height()
+                if w != h:
+                    size = min(w, h)
+                    offset_x = (w - size) // 2
+                    offset_y = (h - size) // 2
+                    pixbuf = pixbuf.new_subpixbuf(offset_x, offset_y, size, size)
+
+            texture = IMAGE_CACHE.put_texture(self._variant_key(url), pixbuf)
+            GLib.idle_add(self._apply_texture, texture, url)
+        except Exception as e:
+            print(f"AsyncPicture error {url}: {e}")
 
-    def _apply_pixbuf(self, pixbuf, url=None):
+    def _apply_texture(self, texture, url=None):
         # Race condition check
         if url and self.url != url:
             return
 
-        # Convert to Texture and paint
-        texture = Gdk.Texture.new_for_pixbuf(pixbuf)
         self.set_paintable(texture)
 
 
@@ -63,6 +63,12 @@ class SongRowWidget(Gtk.Box):
         else:
             self.row.remove_css_class("playing")
 
+    def unbind(self):
+        # The row is being recycled; don't finish loading a cover nobody will see
+        self.img.cancel_load()
+        # Let the list model recycle the item too
+        self.model_item = None
+
     def on_right_click(self, gesture, n_press, x, y):
         if not self.model_item:
             return
@@ -99,9 +105,29 @@ class SongRowWidget(Gtk.Box):
         action_goto.connect("activate", goto_artist_action)
         group.add_action(action_goto)
 
+        def download_action(action, param):
+            self.player.downloads.enqueue(
+                item.video_id, item.title, item.artist, item.thumbnail_url
+            )
+
+        def remove_download_action(action, param):
+            self.player.downloads.remove(item.video_id)
+
+        action_download = Gio.SimpleAction.new("download", None)
+        action_download.connect("activate", download_action)
+        group.add_action(action_download)
+
+        action_remove = Gio.SimpleAction.new("remove_download", None)
+        action_remove.connect("activate", remove_download_action)
+        group.add_action(action_remove)
+
         menu_model = Gio.Menu()
         if item.video_id:
             menu_model.append("Copy Link", "row.copy_link")
+            if self.player.downloads.get(item.video_id):
+                menu_model.append("Remove Download", "row.remove_download")
+            else:
+                menu_model.append("Download", "row.download")
 
         artists = item.track_data.get("artists", [])
         if artists and artists[0].get("id"):
@@ -4,6 +4,8 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
 from gi.repository import Gtk, Gdk, Adw, GObject, Gio
+from settings import Settings
+from player.quality import QUALITY_PROFILES
 
 
 class MainWindow(Adw.ApplicationWindow):
@@ -355,6 +357,39 @@ class MainWindow(Adw.ApplicationWindow):
         row.add_suffix(logout_btn)
         group.add(row)
 
+        playback_group = Adw.PreferencesGroup()
+        playback_group.set_title("Playback")
+        page.add(playback_group)
+
+        settings = Settings()
+        cache_row = Adw.SwitchRow()
+        cache_row.set_title("Cache Played Tracks")
+        cache_row.set_subtitle(
+            "Keep a copy of streamed songs on disk so replays use almost no network"
+        )
+        cache_row.set_active(settings.get("audio_cache_enabled"))
+        cache_row.connect(
+            "notify::active",
+            lambda r, _p: settings.set("audio_cache_enabled", r.get_active()),
+        )
+        playback_group.add(cache_row)
+
+        profile_names = list(QUALITY_PROFILES)
+        quality_row = Adw.ComboRow()
+        quality_row.set_title("Streaming Quality")
+        quality_row.set_subtitle("Lower quality starts faster and uses less data")
+        quality_row.set_model(
+            Gtk.StringList.new([QUALITY_PROFILES[n]["label"] for n in profile_names])
+        )
+        current = settings.get("audio_quality")
+        if current in profile_names:
+            quality_row.set_selected(profile_names.index(current))
+        quality_row.connect(
+            "notify::selected",
+            lambda r, _p: settings.set("audio_quality", profile_names[r.get_selected()]),
+        )
+        playback_group.add(quality_row)
+
         prefs.present(self)
 
     def on_logout_clicked(self, btn, prefs_window):
@@ -669,13 +704,9 @@ class MainWindow(Adw.ApplicationWindow):
         album_id = None
         album_name = "Album"
 
-        if track and "album" in track and track["album"]:
-            album = track["album"]
-            if isinstance(album, dict):
-                album_id = album.get("id")
-                album_name = album.get("name", album_name)
-            elif isinstance(album, str):
-                album_name = album
+        if track and track.album:
+            album_id = track.album_id
+            album_name = track.album
 
         if not album_id:
             # Fall back to fetching watch playlist to see if it belongs to an album